@@ -8,7 +8,10 @@ and aspect strength scoring.
 """
 
 import logging
+import math
+import numpy as np
 from calculations import normalize_angle
+from orb_profiles import (ASPECT_NAMES, ASPECT_ANGLES, ASPECT_CODES, get_orb_table, orb_table_from_dict)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,6 +27,23 @@ ASPECTS = {
     "opposition": 180
 }
 
+# Aspect importance weights used by strength scoring
+ASPECT_WEIGHTS = {
+    "conjunction": 1.0,
+    "opposition": 0.9,
+    "trine": 0.8,
+    "square": 0.8,
+    "sextile": 0.6,
+    "quincunx": 0.4,
+    "semi-square": 0.3,
+    "semi-sextile": 0.2
+}
+DEFAULT_ASPECT_WEIGHT = 0.5
+
+# Weights in ASPECT_NAMES order for lookup by aspect code
+ASPECT_WEIGHT_TABLE = np.array([ASPECT_WEIGHTS.get(name, DEFAULT_ASPECT_WEIGHT) for name in ASPECT_NAMES])
+
+# Orbs of the default "modern" profile in orb_profiles.py
 ASPECT_ORBS = {
     "conjunction": 8,
     "semi-sextile": 2,
@@ -35,6 +55,24 @@ ASPECT_ORBS = {
     "opposition": 8
 }
 
+# Bodies that take part in T-squares and cross-chart patterns
+PATTERN_BODIES = ["sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn",
+                  "uranus", "neptune", "pluto", "north_node", "south_node"]
+
+# The lunar nodes are always exactly opposed, so their axis is no pattern base
+NODE_AXIS = frozenset(["north_node", "south_node"])
+
+# Element of each sign number modulo 4
+SIGN_ELEMENTS = ["Fire", "Earth", "Air", "Water"]
+
+# One row per aspect found by cross_aspects; body1/body2 index the two
+# longitude arrays and aspect indexes ASPECT_NAMES
+CROSS_ASPECT_DTYPE = np.dtype([
+    ("body1", np.int32), ("body2", np.int32), ("aspect", np.int8),
+    ("angle", np.float64), ("orb", np.float64), ("max_orb", np.float64),
+    ("strength", np.float64), ("weight", np.float64)
+])
+
 def angle_difference(a, b):
     """Calculate the smallest angular distance between two points."""
     try:
@@ -50,26 +88,172 @@ def angle_difference(a, b):
         logger.error(f"Error calculating angle difference between {a} and {b}: {e}")
         raise
 
-def compute_aspects(bodies, aspect_orbs=None, include_points=None):
+def separation_matrix(lons_a, lons_b):
+    """
+    Smallest angular distance between every pair of longitudes.
+
+    Args:
+        lons_a: Array of longitudes (..., n)
+        lons_b: Array of longitudes (..., m)
+
+    Returns:
+        ndarray: Separations in degrees (..., n, m), each in [0, 180]
+    """
+    diff = np.abs(lons_a[..., :, None] - lons_b[..., None, :]) % 360
+    return np.where(diff > 180, 360 - diff, diff)
+
+def match_aspects(separation, orbs):
+    """
+    Resolve the first aspect (in ASPECT_NAMES order) within orb for every separation.
+
+    Args:
+        separation: Separations from separation_matrix (..., n, m)
+        orbs: Orb table broadcastable to (..., n, m, aspects); orbs <= 0 are disabled
+
+    Returns:
+        tuple: (codes, deviations) where codes is -1 for pairs with no aspect
+    """
+    deviation = np.abs(separation[..., None] - ASPECT_ANGLES)
+    within = (deviation <= orbs) & (orbs > 0)
+    codes = np.where(within.any(axis=-1), within.argmax(axis=-1), -1)
+    deviations = np.take_along_axis(deviation, np.maximum(codes, 0)[..., None], axis=-1)[..., 0]
+    return codes, deviations
+
+def cross_aspects(lons_a, lons_b, orbs, aspects=None, weights=None):
+    """
+    Find every aspect between two sets of longitudes (synastry, transits).
+
+    Each pair gets the first aspect (in ASPECT_NAMES order) within its orb.
+
+    Args:
+        lons_a: Longitudes of the first chart (n,)
+        lons_b: Longitudes of the second chart (m,)
+        orbs: Orbs broadcastable to (n, m, aspects), e.g. CompiledOrbTable.pair_orbs
+            or one orb vector; orbs <= 0 are disabled
+        aspects: Aspect names to look for (default: every aspect with an orb)
+        weights: Weight per aspect name for the "weight" field (missing names weigh 0)
+
+    Returns:
+        ndarray: CROSS_ASPECT_DTYPE rows ordered by (body1, body2); strength
+        fades linearly from 1 when exact to 0 at the orb limit
+    """
+    lons_a = np.asarray(lons_a, dtype=float)
+    lons_b = np.asarray(lons_b, dtype=float)
+    orbs = np.asarray(orbs, dtype=float)
+    if aspects is not None:
+        unknown = set(aspects) - set(ASPECT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown aspects: {', '.join(sorted(unknown))}")
+        orbs = np.where(np.isin(ASPECT_NAMES, list(aspects)), orbs, 0.0)
+
+    separation = separation_matrix(lons_a, lons_b)
+    codes, deviations = match_aspects(separation, orbs)
+    rows, cols = np.nonzero(codes >= 0)
+    matched = codes[rows, cols]
+    max_orbs = np.broadcast_to(orbs, codes.shape + ASPECT_ANGLES.shape)[rows, cols, matched]
+
+    result = np.empty(len(rows), dtype=CROSS_ASPECT_DTYPE)
+    result["body1"] = rows
+    result["body2"] = cols
+    result["aspect"] = matched
+    result["angle"] = separation[rows, cols]
+    result["orb"] = deviations[rows, cols]
+    result["max_orb"] = max_orbs
+    result["strength"] = 1 - result["orb"] / max_orbs
+    if weights:
+        weight_table = np.array([weights.get(name, 0) for name in ASPECT_NAMES], dtype=float)
+        result["weight"] = weight_table[matched]
+    else:
+        result["weight"] = 0.0
+    return result
+
+def separation_rate(lons_a, lons_b, speeds_a, speeds_b, pairs=None):
+    """
+    Rate at which the separation of every pair is changing.
+
+    Args:
+        lons_a, lons_b: Longitudes (..., n) and (..., m)
+        speeds_a, speeds_b: Longitudinal speeds in degrees/day (NaN when unknown)
+        pairs: Optional (rows, cols) index arrays, e.g. of matched aspects;
+            only those pairs of 1-D inputs are computed
+
+    Returns:
+        ndarray: d(separation)/dt in degrees/day (..., n, m), or one rate per
+        pair when pairs is given
+    """
+    if pairs is not None:
+        rows, cols = pairs
+        signed = (lons_b[cols] - lons_a[rows] + 180) % 360 - 180
+        return np.sign(signed) * (speeds_b[cols] - speeds_a[rows])
+    signed = (lons_b[..., None, :] - lons_a[..., :, None] + 180) % 360 - 180
+    return np.sign(signed) * (speeds_b[..., None, :] - speeds_a[..., :, None])
+
+def orb_motion(offset, sep_rate):
+    """
+    Orb rate of change and linear estimate of the time to exactness.
+
+    Args:
+        offset: Separation minus the exact aspect angle
+        sep_rate: Separation rate from separation_rate()
+
+    Returns:
+        tuple: (orb_rate, exact_in_days); negative orb_rate means applying, and
+        exact_in_days is negative for separating aspects (days since exact)
+    """
+    orb_rate = np.sign(offset) * sep_rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact_in_days = np.where(orb_rate != 0, -np.abs(offset) / orb_rate, np.nan)
+    return orb_rate, exact_in_days
+
+def motion_label(orb_rate):
+    """Label an orb rate as 'applying', 'separating' or None when unknown/stationary."""
+    if orb_rate < 0:
+        return "applying"
+    if orb_rate > 0:
+        return "separating"
+    return None
+
+def estimate_exact_days(orb, orb_rate):
+    """Scalar form of orb_motion's estimate; None when the rate is zero or unknown."""
+    if not orb_rate or math.isnan(orb_rate):
+        return None
+    return -orb / orb_rate
+
+def body_speeds(bodies, names):
+    """Collect speed_deg_per_day for the named bodies (NaN where missing)."""
+    speeds = []
+    for name in names:
+        speed = bodies[name].get("speed_deg_per_day")
+        speeds.append(speed if isinstance(speed, (int, float)) else np.nan)
+    return np.array(speeds, dtype=float)
+
+def compute_aspects(bodies, aspect_orbs=None, include_points=None, orb_profile="modern"):
     """
     Calculate aspects between all bodies in the chart.
     
     Args:
         bodies: Dictionary of celestial bodies with positions
-        aspect_orbs: Custom orb dictionary (optional)
+        aspect_orbs: Custom orb dictionary (optional, overrides orb_profile);
+            an orb of 0 or less disables that aspect, as exact orb-0 matches
+            used to be dropped for their undefined strength anyway
         include_points: List of additional points to include (e.g., nodes, chiron)
+        orb_profile: Registered orb profile name or OrbProfile (default "modern")
     
     Returns:
-        list: List of aspect dictionaries
+        list: List of aspect dictionaries. Each carries "motion" ("applying",
+        "separating" or None when body speeds are unknown) and "exact_in_days",
+        the linear estimate of days until exact (negative once separating).
     """
     try:
         if not bodies or not isinstance(bodies, dict):
             raise ValueError("Bodies must be a non-empty dictionary")
         
         if aspect_orbs is None:
-            aspect_orbs = ASPECT_ORBS
+            orb_table = get_orb_table(orb_profile)
         elif not isinstance(aspect_orbs, dict):
             raise ValueError("Aspect orbs must be a dictionary")
+        else:
+            orb_table = orb_table_from_dict(aspect_orbs)
         
         aspects = []
         names = list(bodies.keys())
@@ -85,43 +269,52 @@ def compute_aspects(bodies, aspect_orbs=None, include_points=None):
                 raise ValueError("include_points must be a list")
             names = [name for name in names if name in include_points]
         
+        # Drop bodies without a usable longitude
+        valid_names = []
+        for name in names:
+            if isinstance(bodies[name]["ecliptic_longitude_deg"], (int, float)):
+                valid_names.append(name)
+            else:
+                logger.warning(f"Invalid longitude value for {name}")
+        names = valid_names
+        
         if len(names) < 2:
             logger.warning("Less than 2 bodies available for aspect calculation")
             return aspects
         
-        for i in range(len(names)):
-            for j in range(i+1, len(names)):
-                try:
-                    n1 = names[i]
-                    n2 = names[j]
-                    lon1 = bodies[n1]["ecliptic_longitude_deg"]
-                    lon2 = bodies[n2]["ecliptic_longitude_deg"]
-                    
-                    if not isinstance(lon1, (int, float)) or not isinstance(lon2, (int, float)):
-                        logger.warning(f"Invalid longitude values for {n1} or {n2}")
-                        continue
-                    
-                    diff = angle_difference(lon1, lon2)
-                    
-                    for asp, angle in ASPECTS.items():
-                        orb = aspect_orbs.get(asp, 5)
-                        if abs(diff - angle) <= orb:
-                            try:
-                                strength = calculate_aspect_strength(abs(diff - angle), orb, asp)
-                                aspects.append({
-                                    "between": [n1, n2],
-                                    "aspect": asp,
-                                    "angle": diff,
-                                    "orb": abs(diff - angle),
-                                    "strength": strength
-                                })
-                            except Exception as e:
-                                logger.warning(f"Error calculating strength for {asp} between {n1} and {n2}: {e}")
-                                continue
-                            break
-                except Exception as e:
-                    logger.warning(f"Error processing aspect between {names[i]} and {names[j]}: {e}")
-                    continue
+        # One vectorized pass over the full aspect matrix
+        lons = np.array([bodies[name]["ecliptic_longitude_deg"] for name in names], dtype=float)
+        separation = separation_matrix(lons, lons)
+        orbs = orb_table.pair_orbs(names, names)
+        codes, deviations = match_aspects(separation, orbs)
+        
+        upper = np.triu(np.ones(codes.shape, dtype=bool), k=1)
+        rows, cols = np.nonzero(upper & (codes >= 0))
+        matched_codes = codes[rows, cols]
+        max_orbs = orbs[rows, cols, matched_codes]
+        
+        # Applying/separating from body speeds in the same pass
+        speeds = body_speeds(bodies, names)
+        sep_rate = separation_rate(lons, lons, speeds, speeds, (rows, cols))
+        matched_sep = separation[rows, cols]
+        orb_rates, exact_in = orb_motion(matched_sep - ASPECT_ANGLES[matched_codes], sep_rate)
+        
+        matched_orbs = deviations[rows, cols]
+        strengths = aspect_strengths(matched_orbs, max_orbs, matched_codes)
+        
+        for i, j, code, diff, orb, strength, orb_rate, days in zip(
+                rows.tolist(), cols.tolist(), matched_codes.tolist(), matched_sep.tolist(),
+                matched_orbs.tolist(), strengths.tolist(),
+                orb_rates.tolist(), exact_in.tolist()):
+            aspects.append({
+                "between": [names[i], names[j]],
+                "aspect": ASPECT_NAMES[code],
+                "angle": diff,
+                "orb": orb,
+                "strength": strength,
+                "motion": motion_label(orb_rate),
+                "exact_in_days": None if math.isnan(days) else days
+            })
         
         logger.info(f"Successfully calculated {len(aspects)} aspects")
         return aspects
@@ -158,19 +351,7 @@ def calculate_aspect_strength(actual_orb, max_orb, aspect_type):
     # Base strength from orb tightness
     orb_strength = 1 - (actual_orb / max_orb)
     
-    # Aspect importance weights
-    aspect_weights = {
-        "conjunction": 1.0,
-        "opposition": 0.9,
-        "trine": 0.8,
-        "square": 0.8,
-        "sextile": 0.6,
-        "quincunx": 0.4,
-        "semi-square": 0.3,
-        "semi-sextile": 0.2
-    }
-    
-    aspect_weight = aspect_weights.get(aspect_type, 0.5)
+    aspect_weight = ASPECT_WEIGHTS.get(aspect_type, DEFAULT_ASPECT_WEIGHT)
     
     strength = orb_strength * aspect_weight
     
@@ -182,6 +363,52 @@ def calculate_aspect_strength(actual_orb, max_orb, aspect_type):
     
     return round(strength, 3)
 
+def aspect_strengths(actual_orbs, max_orbs, codes):
+    """
+    Vectorized calculate_aspect_strength over arrays of matched aspects.
+    
+    Validation happens once for the whole batch; results are identical to
+    calling calculate_aspect_strength on every element.
+    
+    Args:
+        actual_orbs: Orbs from exact (any shape)
+        max_orbs: Maximum allowed orbs, broadcastable to actual_orbs
+        codes: Aspect codes indexing ASPECT_NAMES (other values use the default weight)
+    
+    Returns:
+        ndarray: Strength scores (0-1) rounded to 3 decimals
+    """
+    actual_orbs = np.asarray(actual_orbs)
+    max_orbs = np.asarray(max_orbs)
+    codes = np.asarray(codes)
+    
+    if not (np.issubdtype(actual_orbs.dtype, np.number) and np.issubdtype(max_orbs.dtype, np.number)):
+        raise ValueError("Orb values must be numeric")
+    
+    if not np.issubdtype(codes.dtype, np.integer):
+        raise ValueError("Aspect codes must be integers")
+    
+    if np.any(max_orbs <= 0):
+        raise ValueError("Max orb must be positive")
+    
+    known = (codes >= 0) & (codes < len(ASPECT_WEIGHT_TABLE))
+    weights = np.where(known, ASPECT_WEIGHT_TABLE[np.where(known, codes, 0)], DEFAULT_ASPECT_WEIGHT)
+    
+    strengths = np.clip((1 - np.abs(actual_orbs) / max_orbs) * weights, 0, 1)
+    return _round3(strengths)
+
+def _round3(values):
+    """Round to 3 decimals exactly like Python's round() on each element."""
+    rounded = np.round(values, 3)
+    
+    # np.round scales by 1000 first, which can tip values sitting next to a
+    # half-way point the other way; defer those few to Python's round()
+    fraction = np.abs((values * 1000) % 1 - 0.5)
+    ties = np.nonzero(fraction < 1e-6)
+    if ties[0].size:
+        rounded[ties] = [round(v, 3) for v in values[ties].tolist()]
+    return rounded
+
 def detect_aspect_patterns(aspects, bodies):
     """
     Detect major aspect patterns: T-squares, Grand Trines, Grand Crosses, Yods.
@@ -284,14 +511,187 @@ def build_aspect_graph(aspects):
         logger.error(f"Error building aspect graph: {e}")
         return {}
 
+def aspect_code_matrix(longitudes, orbs):
+    """
+    First aspect between every pair of points in one set (e.g. two charts' union).
+
+    Args:
+        longitudes: Longitudes of the points (n,)
+        orbs: Orbs broadcastable to (n, n, aspects), e.g. CompiledOrbTable.pair_orbs
+
+    Returns:
+        ndarray: (n, n) ASPECT_NAMES codes, -1 where there is none and on the diagonal
+    """
+    lons = np.asarray(longitudes, dtype=float)
+    codes, _ = match_aspects(separation_matrix(lons, lons), orbs)
+    np.fill_diagonal(codes, -1)
+    return codes
+
+def _upper_pairs(adjacency):
+    """(i, j) index arrays of the edges with i < j in a symmetric adjacency matrix"""
+    rows, cols = np.nonzero(adjacency)
+    upper = rows < cols
+    return rows[upper], cols[upper]
+
+def find_pattern_indices(codes, names=None):
+    """
+    Locate T-squares, Grand Trines, Grand Crosses and Yods in an aspect code matrix.
+
+    Each aspect type is a boolean adjacency matrix; patterns are found by
+    intersecting rows of those matrices, so no Python loop runs over points.
+
+    Args:
+        codes: Symmetric (n, n) code matrix from aspect_code_matrix
+        names: Point names; oppositions between a north and a south node
+            (NODE_AXIS) then form no T-squares or Grand Crosses, as in
+            detect_t_squares and is_grand_cross
+
+    Returns:
+        dict: Point index arrays per pattern: t_squares (focal, opposition ends),
+        grand_trines (ascending points), grand_crosses (two opposed pairs) and
+        yods (focal, sextile ends)
+    """
+    points = np.arange(len(codes))
+    opposition = codes == ASPECT_CODES["opposition"]
+    if names is not None:
+        nodes = np.array([name in NODE_AXIS for name in names], dtype=bool)
+        kinds = np.array(names, dtype=object)
+        opposition &= ~(nodes[:, None] & nodes[None, :] & (kinds[:, None] != kinds[None, :]))
+    square = codes == ASPECT_CODES["square"]
+    trine = codes == ASPECT_CODES["trine"]
+    quincunx = codes == ASPECT_CODES["quincunx"]
+    sextile = codes == ASPECT_CODES["sextile"]
+
+    # T-square: a point squaring both ends of an opposition
+    opp1, opp2 = _upper_pairs(opposition)
+    pair, focal = np.nonzero(square[opp1] & square[opp2])
+    t_squares = np.column_stack([focal, opp1[pair], opp2[pair]])
+
+    # Grand Trine: a point after both ends of a trine and trine to each
+    trine1, trine2 = _upper_pairs(trine)
+    pair, third = np.nonzero(trine[trine1] & trine[trine2] & (points > trine2[:, None]))
+    grand_trines = np.column_stack([trine1[pair], trine2[pair], third])
+
+    # Grand Cross: two oppositions whose ends all square each other
+    square1, square2 = square[opp1], square[opp2]
+    first, second = _upper_pairs(square1[:, opp1] & square1[:, opp2] & square2[:, opp1] & square2[:, opp2])
+    grand_crosses = np.column_stack([opp1[first], opp2[first], opp1[second], opp2[second]])
+
+    # Yod: a point quincunx to both ends of a sextile
+    base1, base2 = _upper_pairs(sextile)
+    pair, focal = np.nonzero(quincunx[base1] & quincunx[base2])
+    yods = np.column_stack([focal, base1[pair], base2[pair]])
+
+    return {"t_squares": t_squares, "grand_trines": grand_trines,
+            "grand_crosses": grand_crosses, "yods": yods}
+
+def cross_chart_pattern_indices(charts, orb_profile="synastry", bodies=PATTERN_BODIES):
+    """
+    Index form of detect_cross_chart_patterns, cheap enough for bulk scans.
+
+    Args:
+        charts: One (body names, longitudes) pair per chart
+        orb_profile: Registered orb profile name, OrbProfile or compiled table
+        bodies: Bodies that take part (None for every point)
+
+    Returns:
+        tuple: (names, longitudes, owners, patterns) where owners holds the chart
+        index of every point and patterns maps each pattern type to rows of
+        point indices, as from find_pattern_indices, drawing on two charts or more
+    """
+    names, lons, owners = [], [], []
+    for owner, (chart_names, chart_lons) in enumerate(charts):
+        for name, lon in zip(chart_names, chart_lons):
+            if bodies is None or name in bodies:
+                names.append(name)
+                lons.append(lon)
+                owners.append(owner)
+    owners = np.array(owners, dtype=np.intp)
+
+    codes = aspect_code_matrix(lons, get_orb_table(orb_profile).pair_orbs(names, names))
+    patterns = {}
+    for key, rows in find_pattern_indices(codes, names).items():
+        chart_rows = owners[rows]
+        patterns[key] = rows[chart_rows.min(axis=1) != chart_rows.max(axis=1)]
+    return names, lons, owners, patterns
+
+def detect_cross_chart_patterns(charts, labels=None, orb_profile="synastry", bodies=PATTERN_BODIES):
+    """
+    Detect patterns completed across charts, such as combined T-squares.
+
+    The points of all charts form one labeled graph with edges inside each
+    chart and between charts; only patterns drawing points from at least two
+    charts are kept.
+
+    Args:
+        charts: One (body names, longitudes) pair per chart
+        labels: Chart labels for the result (default "chart1", "chart2", ...)
+        orb_profile: Registered orb profile name, OrbProfile or compiled table
+        bodies: Bodies that take part (None for every point)
+
+    Returns:
+        dict: t_squares, grand_trines, grand_crosses and yods lists; each point
+        is a (label, body) pair and "charts" lists the labels involved
+    """
+    try:
+        if len(charts) < 2:
+            raise ValueError("Need at least two charts")
+        labels = list(labels) if labels is not None else [f"chart{i}" for i in range(1, len(charts) + 1)]
+        if len(labels) != len(charts):
+            raise ValueError("Need one label per chart")
+        
+        names, lons, owners, indices = cross_chart_pattern_indices(charts, orb_profile, bodies)
+        patterns = {key: rows.tolist() for key, rows in indices.items()}
+        owners = owners.tolist()
+        
+        def point(index):
+            return (labels[owners[index]], names[index])
+        
+        def involved(row):
+            return [labels[owner] for owner in sorted({owners[index] for index in row})]
+        
+        return {
+            "t_squares": [{
+                "type": "T-square",
+                "focal_planet": point(focal),
+                "opposition": [point(opp1), point(opp2)],
+                "charts": involved([focal, opp1, opp2]),
+                "strength": calculate_pattern_strength(names[focal], [names[opp1], names[opp2]], None)
+            } for focal, opp1, opp2 in patterns["t_squares"]],
+            "grand_trines": [{
+                "type": "Grand Trine",
+                "planets": [point(index) for index in row],
+                "charts": involved(row),
+                "element": trine_element([lons[index] for index in row]),
+                "strength": calculate_grand_trine_strength([names[index] for index in row], None)
+            } for row in patterns["grand_trines"]],
+            "grand_crosses": [{
+                "type": "Grand Cross",
+                "planets": [point(index) for index in row],
+                "charts": involved(row),
+                "cardinality": cross_cardinality([lons[index] for index in row]),
+                "strength": calculate_cross_strength([names[index] for index in row], None)
+            } for row in patterns["grand_crosses"]],
+            "yods": [{
+                "type": "Yod",
+                "focal_planet": point(focal),
+                "base_planets": [point(base1), point(base2)],
+                "charts": involved([focal, base1, base2]),
+                "strength": calculate_yod_strength(names[focal], [names[base1], names[base2]], None)
+            } for focal, base1, base2 in patterns["yods"]]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error detecting cross-chart patterns: {e}")
+        raise
+
 def detect_t_squares(graph, bodies):
     """Detect T-square patterns (two squares with an opposition)."""
     t_squares = []
     reported_configs = set()  # Track already-reported configurations
     
     # Only consider main planets and nodes for patterns
-    valid_bodies = ["sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", 
-                   "uranus", "neptune", "pluto", "north_node", "south_node"]
+    valid_bodies = PATTERN_BODIES
     
     # Filter graph to only include valid bodies
     filtered_graph = {}
@@ -305,7 +705,7 @@ def detect_t_squares(graph, bodies):
     oppositions = []
     for body, connections in filtered_graph.items():
         for conn in connections:
-            if conn["aspect"] == "opposition":
+            if conn["aspect"] == "opposition" and {body, conn["to"]} != NODE_AXIS:
                 oppositions.append((body, conn["to"]))
     
     # For each opposition, look for squares to both ends
@@ -374,7 +774,7 @@ def is_grand_cross(graph, planets):
         for p2 in planets[i+1:]:
             if has_aspect_between(graph, p1, p2, "square"):
                 square_count += 1
-            elif has_aspect_between(graph, p1, p2, "opposition"):
+            elif has_aspect_between(graph, p1, p2, "opposition") and {p1, p2} != NODE_AXIS:
                 opposition_count += 1
     
     # Grand Cross needs exactly 4 squares and 2 oppositions
@@ -484,9 +884,17 @@ def get_trine_element(longitude):
     else:
         return "Air/Water"
 
+def trine_element(longitudes):
+    """Most common sign element (sign number % 4) among a Grand Trine's longitudes."""
+    elements = [SIGN_ELEMENTS[int(lon % 360 // 30) % 4] for lon in longitudes]
+    return max(SIGN_ELEMENTS, key=elements.count)
+
 def get_cross_cardinality(planets, bodies):
     """Get the cardinality of a Grand Cross."""
-    longitudes = [bodies[p]["ecliptic_longitude_deg"] for p in planets]
+    return cross_cardinality([bodies[p]["ecliptic_longitude_deg"] for p in planets])
+
+def cross_cardinality(longitudes):
+    """Most common modality among a Grand Cross's longitudes."""
     # Check if they're in cardinal, fixed, or mutable signs
     mod_counts = {"cardinal": 0, "fixed": 0, "mutable": 0}
     
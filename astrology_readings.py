@@ -8,12 +8,19 @@ Includes transit calculations, daily horoscopes, and lunar phase interpretations
 import swisseph as swe
 from datetime import datetime, timedelta
 import math
+import numpy as np
 import sys
 import os
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from aspects import cross_aspects, separation_rate, orb_motion, body_speeds, motion_label, estimate_exact_days
+from orb_profiles import ASPECT_NAMES, ASPECT_ANGLES, get_orb_table
+
+# Bump whenever generated readings change so cached readings are recomputed
+READING_ENGINE_VERSION = '1'
+
 class AstrologyReadings:
     """Professional astrology readings and daily horoscopes"""
     
@@ -228,7 +235,7 @@ class AstrologyReadings:
                 return "aries"
     
     @staticmethod
-    def calculate_transits(natal_chart: dict, target_date: str = None) -> dict:
+    def calculate_transits(natal_chart: dict, target_date: str = None, orb_profile: str = 'wide') -> dict:
         """Calculate transits for a specific date compared to natal chart"""
         if target_date is None:
             target_date = datetime.now().strftime("%Y-%m-%d")
@@ -253,45 +260,44 @@ class AstrologyReadings:
         natal_bodies = natal_chart['bodies']
         current_bodies = current_chart['bodies']
         
-        aspect_orbs = {
-            'conjunction': 8, 'opposition': 8, 'trine': 8,
-            'square': 8, 'sextile': 6, 'quincunx': 3
-        }
-        
-        target_angles = {
-            'conjunction': 0, 'opposition': 180, 'trine': 120,
-            'square': 90, 'sextile': 60, 'quincunx': 150
-        }
-        
-        for natal_planet, natal_pos in natal_bodies.items():
-            for current_planet, current_pos in current_bodies.items():
-                angle = abs(natal_pos['ecliptic_longitude_deg'] - current_pos['ecliptic_longitude_deg'])
-                angle = min(angle, 360 - angle)
-                
-                for aspect_name, orb in aspect_orbs.items():
-                    target_angle = target_angles[aspect_name]
-                    orb_diff = abs(angle - target_angle)
-                    
-                    if orb_diff <= orb:
-                        strength = max(0, 1 - (orb_diff / orb))
-                        
-                        transit_aspect = {
-                            'natal_planet': natal_planet,
-                            'transiting_planet': current_planet,
-                            'aspect': aspect_name,
-                            'angle': angle,
-                            'orb': orb_diff,
-                            'strength': strength,
-                            'interpretation': AstrologyReadings.get_transit_interpretation(
-                                natal_planet, current_planet, aspect_name, strength
-                            )
-                        }
-                        
-                        transits['aspects'].append(transit_aspect)
-                        
-                        # Identify major transits (strong aspects to personal planets)
-                        if strength > 0.7 and natal_planet in ['sun', 'moon', 'mercury', 'venus', 'mars', 'ascendant']:
-                            transits['major_transits'].append(transit_aspect)
+        # Every natal/transit aspect from the shared kernel, orbs from the compiled table
+        natal_names = list(natal_bodies)
+        current_names = list(current_bodies)
+        natal_lons = np.array([natal_bodies[name]['ecliptic_longitude_deg'] for name in natal_names], dtype=float)
+        current_lons = np.array([current_bodies[name]['ecliptic_longitude_deg'] for name in current_names],
+                                dtype=float)
+        hits = cross_aspects(natal_lons, current_lons,
+                             get_orb_table(orb_profile).pair_orbs(natal_names, current_names),
+                             aspects=['conjunction', 'opposition', 'trine', 'square', 'sextile', 'quincunx'])
+        
+        # Applying/separating for the matched pairs only; natal positions are fixed
+        sep_rates = separation_rate(natal_lons, current_lons, np.zeros(len(natal_lons)),
+                                    body_speeds(current_bodies, current_names), (hits['body1'], hits['body2']))
+        orb_rates, _ = orb_motion(hits['angle'] - ASPECT_ANGLES[hits['aspect']], sep_rates)
+        
+        for body1, body2, code, angle, orb_diff, strength, orb_rate in zip(
+                hits['body1'].tolist(), hits['body2'].tolist(), hits['aspect'].tolist(),
+                hits['angle'].tolist(), hits['orb'].tolist(), hits['strength'].tolist(), orb_rates.tolist()):
+            natal_planet, current_planet, aspect_name = natal_names[body1], current_names[body2], ASPECT_NAMES[code]
+            transit_aspect = {
+                'natal_planet': natal_planet,
+                'transiting_planet': current_planet,
+                'aspect': aspect_name,
+                'angle': angle,
+                'orb': orb_diff,
+                'strength': strength,
+                'motion': motion_label(orb_rate),
+                'exact_in_days': estimate_exact_days(orb_diff, orb_rate),
+                'interpretation': AstrologyReadings.get_transit_interpretation(
+                    natal_planet, current_planet, aspect_name, strength
+                )
+            }
+            
+            transits['aspects'].append(transit_aspect)
+            
+            # Identify major transits (strong aspects to personal planets)
+            if strength > 0.7 and natal_planet in ['sun', 'moon', 'mercury', 'venus', 'mars', 'ascendant']:
+                transits['major_transits'].append(transit_aspect)
         
         # Sort by strength
         transits['aspects'].sort(key=lambda x: x['strength'], reverse=True)
@@ -432,11 +438,23 @@ class AstrologyReadings:
             return 'full_moon'  # Default fallback
     
     @staticmethod
-    def generate_comprehensive_reading(natal_chart: dict, target_date: str = None) -> dict:
-        """Generate a comprehensive astrology reading including transits and horoscope"""
+    def generate_comprehensive_reading(natal_chart: dict, target_date: str = None,
+                                       chart_id: int = None, db=None, cache_ttl: float = None) -> dict:
+        """
+        Generate a comprehensive astrology reading including transits and horoscope.
+        
+        When a saved chart_id and an AstrologyDatabase are given, the reading is
+        served from the database's reading cache and computed only on a miss.
+        """
         if target_date is None:
             target_date = datetime.now().strftime("%Y-%m-%d")
         
+        use_cache = chart_id is not None and db is not None
+        if use_cache:
+            cached = db.get_cached_reading(chart_id, 'comprehensive', target_date, READING_ENGINE_VERSION)
+            if cached is not None:
+                return cached
+        
         # Get birth data
         birth_data = natal_chart['birth']
         
@@ -463,6 +481,10 @@ class AstrologyReadings:
             'overall_theme': AstrologyReadings.get_overall_theme(transits, horoscope)
         }
         
+        if use_cache:
+            db.cache_reading(chart_id, 'comprehensive', target_date, READING_ENGINE_VERSION,
+                             reading, ttl=cache_ttl)
+        
         return reading
     
     @staticmethod
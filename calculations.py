@@ -73,10 +73,9 @@ def get_planet_longitudes(ts, eph, observer, t):
         }
         result = {}
         
-        # Calculate positions for retrograde detection
+        # Calculate positions for retrograde detection and daily speed
         try:
-            t_plus_day = ts.utc(t.utc_datetime().year, t.utc_datetime().month, t.utc_datetime().day + 1,
-                               t.utc_datetime().hour, t.utc_datetime().minute, t.utc_datetime().second)
+            t_plus_day = ts.tt_jd(t.tt + 1.0)
         except Exception as e:
             logger.warning(f"Could not calculate t_plus_day for retrograde detection: {e}")
             # Use current time as fallback
@@ -102,16 +101,19 @@ def get_planet_longitudes(ts, eph, observer, t):
                         diff += 360
                         
                     is_retrograde = bool(diff < 0)
+                    speed = diff if t_plus_day is not t else None
                 except Exception as e:
                     logger.warning(f"Could not calculate retrograde for {name}: {e}")
                     is_retrograde = False  # Default to not retrograde if calculation fails
+                    speed = None
                 
                 sign, deg = deg_to_sign_deg(lon)
                 result[name] = {
                     "ecliptic_longitude_deg": normalize_angle(lon),
                     "sign": sign,
                     "degree_in_sign": deg,
-                    "retrograde": is_retrograde
+                    "retrograde": is_retrograde,
+                    "speed_deg_per_day": speed
                 }
             except Exception as e:
                 logger.error(f"Error calculating position for {name}: {e}")
@@ -149,13 +151,15 @@ def get_nodes_chiron(ts, eph, observer, t, include_chiron=True):
         try:
             node_result = swe.calc(jd, swe.MEAN_NODE)
             north_node_lon = normalize_angle(node_result[0][0])
+            node_speed = node_result[0][3]  # Returned alongside the position (FLG_SPEED)
             sign, deg = deg_to_sign_deg(north_node_lon)
             
             result["north_node"] = {
                 "ecliptic_longitude_deg": north_node_lon,
                 "sign": sign,
                 "degree_in_sign": deg,
-                "retrograde": False  # Nodes are always retrograde in mean calculation
+                "retrograde": False,  # Nodes are always retrograde in mean calculation
+                "speed_deg_per_day": node_speed
             }
             
             # South Node is opposite North Node
@@ -166,7 +170,8 @@ def get_nodes_chiron(ts, eph, observer, t, include_chiron=True):
                 "ecliptic_longitude_deg": south_node_lon,
                 "sign": sign,
                 "degree_in_sign": deg,
-                "retrograde": False
+                "retrograde": False,
+                "speed_deg_per_day": node_speed
             }
             logger.info("Successfully calculated North and South Nodes")
         except Exception as e:
@@ -178,6 +183,7 @@ def get_nodes_chiron(ts, eph, observer, t, include_chiron=True):
             try:
                 chiron_result = swe.calc(jd, swe.CHIRON)
                 chiron_lon = normalize_angle(chiron_result[0][0])
+                chiron_speed = chiron_result[0][3]
                 sign, deg = deg_to_sign_deg(chiron_lon)
                 
                 # Check Chiron retrograde
@@ -202,7 +208,8 @@ def get_nodes_chiron(ts, eph, observer, t, include_chiron=True):
                     "ecliptic_longitude_deg": chiron_lon,
                     "sign": sign,
                     "degree_in_sign": deg,
-                    "retrograde": is_retrograde
+                    "retrograde": is_retrograde,
+                    "speed_deg_per_day": chiron_speed
                 }
                 logger.info("Successfully calculated Chiron")
                 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+compatibility_profile.py
+
+Per-chart facts used by compatibility scoring, derived once per chart.
+A profile holds body longitudes as an array, signs and elements as small
+integer codes and the house cusps, so compatibility analyses index arrays
+instead of walking chart dictionaries and comparing sign strings. Profiles
+serialize to plain dicts for storage next to their chart.
+"""
+
+import numpy as np
+
+# Bump when the stored layout or derivation changes
+PROFILE_VERSION = 1
+
+SIGN_NAMES = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+]
+SIGN_CODES = {name.lower(): code for code, name in enumerate(SIGN_NAMES)}
+
+# Element code of a sign is sign code % 4 (Aries fire, Taurus earth, ...)
+ELEMENT_NAMES = ["fire", "earth", "air", "water"]
+ELEMENT_CODES = {name: code for code, name in enumerate(ELEMENT_NAMES)}
+
+NO_SIGN = -1
+
+class CompatibilityProfile:
+    """Array view of one chart for compatibility scoring"""
+
+    __slots__ = ('names', 'index', 'longitudes', 'signs', 'elements', 'house_cusps', 'points')
+
+    def __init__(self, names, longitudes, signs, house_cusps):
+        """
+        Args:
+            names: Body names in chart order
+            longitudes: Ecliptic longitude per body
+            signs: Sign code per body (NO_SIGN when unknown)
+            house_cusps: Longitudes of houses 1-12 (NaN when missing)
+        """
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.signs = np.asarray(signs, dtype=np.int8)
+        self.elements = np.where(self.signs >= 0, self.signs % 4, NO_SIGN).astype(np.int8)
+        self.house_cusps = np.asarray(house_cusps, dtype=np.float64)
+        if len(self.longitudes) != len(self.names) or len(self.signs) != len(self.names):
+            raise ValueError("Need one longitude and sign per body")
+        if self.house_cusps.shape != (12,):
+            raise ValueError("Need exactly 12 house cusps")
+
+        # Bodies followed by the 7th-house cusp: every point compared across charts
+        self.points = np.append(self.longitudes, self.house_cusps[6])
+
+    @classmethod
+    def from_chart(cls, chart):
+        """Build a profile from a chart dict with bodies and houses"""
+        bodies = chart['bodies']
+        names = list(bodies)
+        longitudes = [bodies[name]['ecliptic_longitude_deg'] for name in names]
+        signs = [SIGN_CODES.get(str(bodies[name].get('sign', '')).lower(), NO_SIGN) for name in names]
+
+        houses = chart.get('houses') or {}
+        cusps = [houses.get(f'house_{i}', {}).get('ecliptic_longitude_deg', np.nan) for i in range(1, 13)]
+        return cls(names, longitudes, signs, cusps)
+
+    def to_dict(self):
+        """Plain dict for JSON storage"""
+        return {
+            'version': PROFILE_VERSION,
+            'names': list(self.names),
+            'longitudes': self.longitudes.tolist(),
+            'signs': self.signs.tolist(),
+            'house_cusps': [None if np.isnan(cusp) else cusp for cusp in self.house_cusps.tolist()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a profile stored with to_dict"""
+        if data.get('version') != PROFILE_VERSION:
+            raise ValueError(f"Unsupported compatibility profile version {data.get('version')}")
+        cusps = [np.nan if cusp is None else cusp for cusp in data['house_cusps']]
+        return cls(data['names'], data['longitudes'], data['signs'], cusps)
+
+    @property
+    def point_names(self):
+        """Names of the points: the bodies, then 'house_7'"""
+        return self.names + ('house_7',)
+
+    @property
+    def body_count(self):
+        """Number of bodies (points beyond this are house cusps)"""
+        return len(self.names)
+
+    def sign(self, body):
+        """Sign code of a body (KeyError when the chart lacks it)"""
+        return int(self.signs[self.index[body]])
+
+    def sign_name(self, body):
+        """Sign name of a body"""
+        code = self.sign(body)
+        return SIGN_NAMES[code] if code != NO_SIGN else None
+
+    def count_in_element(self, bodies, element):
+        """How many of the given bodies (when present) are in an element"""
+        code = ELEMENT_CODES[element]
+        return sum(1 for body in bodies if body in self.index and self.elements[self.index[body]] == code)
+
+    def __repr__(self):
+        return f"CompatibilityProfile({len(self.names)} bodies)"
+
+def compatibility_profile(chart):
+    """Return chart unchanged if it is already a profile, else build one"""
+    if isinstance(chart, CompatibilityProfile):
+        return chart
+    return CompatibilityProfile.from_chart(chart)
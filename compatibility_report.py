@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+compatibility_report.py
+
+Rendering of compatibility results, kept apart from the scoring in
+enhanced_compatibility_clean. A renderer takes the structured result of
+EnhancedCompatibilityCalculator.compatibility_result and writes markdown,
+JSON or HTML piece by piece to any text stream, or collects the pieces in
+a list joined once. Line templates are bound format methods built at import.
+"""
+
+import html
+import json
+
+REPORT_FORMATS = ('markdown', 'json', 'html')
+REPORT_EXTENSIONS = {'markdown': '.md', 'json': '.json', 'html': '.html'}
+
+COMPOSITE_MEANINGS = [
+    ('sun', 'Composite Sun', 'Relationship identity and purpose'),
+    ('moon', 'Composite Moon', 'Emotional foundation of the relationship'),
+    ('venus', 'Composite Venus', 'How love and harmony are expressed'),
+    ('mars', 'Composite Mars', 'Shared drive and passion'),
+]
+
+# Shared presentation decisions (both markdown and HTML use these)
+
+def twin_flame_level(spiritual):
+    """Twin flame label from the number of indicators"""
+    count = len(spiritual['twin_flame_indicators'])
+    return '⚡ STRONG' if count >= 2 else '⚡ MODERATE' if count == 1 else '💫 MINIMAL'
+
+def soulmate_level(spiritual):
+    """Soulmate label from the number of indicators"""
+    count = len(spiritual['soulmate_indicators'])
+    return '💕 STRONG' if count >= 3 else '💕 MODERATE' if count >= 1 else '💫 MINIMAL'
+
+def aspect_symbol(score):
+    """Marker for harmonious, challenging and neutral aspects"""
+    return "✨" if score > 0 else "⚡" if score < 0 else "➖"
+
+def strengths(scores):
+    """(title, advice) pairs for the relationship's strong areas"""
+    items = []
+    if scores['spiritual_score'] >= 70:
+        items.append(('Deep Spiritual Connection',
+                      'Nurture shared spiritual practices and intuitive understanding'))
+    if scores['destiny_score'] >= 60:
+        items.append(('Fated Connection', 'Trust the timing and purpose of your meeting'))
+    if scores['synastry_score'] >= 60:
+        items.append(('Natural Harmony', 'Build on your easy flow and mutual understanding'))
+    return items
+
+def growth_areas(result):
+    """(title, advice) pairs for the relationship's growth areas"""
+    items = []
+    if result['highlights']['challenging_count'] >= 3:
+        items.append(('Embrace Tension',
+                      'Use challenging aspects as opportunities for deeper understanding'))
+    if result['destiny']['score'] < 15:
+        items.append(('Create Shared Purpose', 'Consciously build meaning and direction together'))
+    if len(result['spiritual']['soulmate_indicators']) < 2:
+        items.append(('Cultivate Harmony', 'Practice patience and develop flowing communication'))
+    return items
+
+def _pattern_point(point):
+    """Point as "Name's Body" from a (chart name, body) pair"""
+    name, body = point
+    return f"{name}'s {body.replace('_', ' ').title()}"
+
+def pattern_lines(patterns):
+    """One line of text per cross-chart pattern"""
+    point = _pattern_point
+    lines = []
+    for pattern in patterns['t_squares']:
+        end1, end2 = pattern['opposition']
+        lines.append(f"T-square: {point(pattern['focal_planet'])} squares "
+                     f"{point(end1)} - {point(end2)} opposition")
+    for pattern in patterns['grand_trines']:
+        lines.append(f"Grand Trine ({pattern['element']}): "
+                     f"{', '.join(point(p) for p in pattern['planets'])}")
+    for pattern in patterns['grand_crosses']:
+        lines.append(f"Grand Cross ({pattern['cardinality']}): "
+                     f"{', '.join(point(p) for p in pattern['planets'])}")
+    for pattern in patterns['yods']:
+        base1, base2 = pattern['base_planets']
+        lines.append(f"Yod: {point(pattern['focal_planet'])} points at "
+                     f"{point(base1)} - {point(base2)} sextile")
+    return lines
+
+def long_term_potential(overall_score):
+    """(icon, title, text) for the long-term outlook"""
+    if overall_score >= 75:
+        return ('✨', 'Exceptional Potential',
+                'This relationship has the ingredients for profound, lasting love and mutual growth. '
+                'The cosmic alignment supports a deeply meaningful connection.')
+    elif overall_score >= 60:
+        return ('💫', 'Strong Potential',
+                'With conscious effort and mutual understanding, this relationship can develop into '
+                'something beautiful and lasting. The foundation is solid.')
+    elif overall_score >= 45:
+        return ('🌱', 'Moderate Potential',
+                'This relationship requires patience and communication but can grow into something '
+                'meaningful. Focus on understanding differences.')
+    return ('⚠️', 'Challenging Potential',
+            'This relationship faces significant obstacles but may offer important lessons. '
+            'Requires exceptional commitment and self-awareness.')
+
+# Markdown templates
+
+_MD_HEADER = """
+# 🔮 Enhanced Relationship Compatibility Report
+## {name1} & {name2}
+
+---
+
+## 📊 COMPATIBILITY SCORES
+
+### **Overall Score: {overall_score:.1f}/100** \n\
+**Grade: {grade} - {interpretation}**
+
+| Category | Score | Weight |
+|----------|-------|--------|
+| **Synastry Harmony** | {synastry_score:.1f}/100 | 40% |
+| **Destiny Connection** | {destiny_score:.1f}/100 | 30% |
+| **Spiritual Bond** | {spiritual_score:.1f}/100 | 30% |
+
+**Synastry Breakdown:** {total_aspects} total aspects ({harmonious_count} harmonious, {challenging_count} challenging)
+**Raw Score:** {positive:.1f} positive, {negative:.1f} negative
+
+---
+
+## 🌟 DESTINY & FATED CONNECTIONS
+
+### **Were You Destined to Meet? {destined}**
+**Destiny Score: {score}/{max_score}**
+
+**Node Connections (Life Path Alignment):**
+""".format
+_MD_NODE = "- {planet} {aspect} North Node (orb: {orb:.1f}°) - {significance}\n".format
+_MD_HOUSE = "- {planet} in 7th House {aspect} (orb: {orb:.1f}°) - {significance}\n".format
+_MD_FORTUNE = "- {planet} {aspect} Part of Fortune (orb: {orb:.1f}°) - {significance}\n".format
+_MD_SPIRITUAL = """
+
+---
+
+## 🔥 SPIRITUAL CONNECTION ANALYSIS
+
+### **Twin Flame Indicators: {level}**
+**Twin Flame Score: {score}/180**
+
+""".format
+_MD_TWIN = "- {connection} {aspect} (orb: {orb:.1f}°) - {intensity} intensity\n".format
+_MD_SOULMATE_HEADER = "\n### **Soulmate Indicators: {}**\n".format
+_MD_SOULMATE = "- {connection} {aspect} (orb: {orb:.1f}°) - {harmony} harmony\n".format
+_MD_PAST_LIFE = "- {connection} {aspect} (orb: {orb:.1f}°) - {karma} karma\n".format
+_MD_ELEMENT = "- {connection} - {significance}\n".format
+_MD_LIFE_PATH = "- {alignment} - {significance}\n".format
+_MD_STRONGEST = "- {} **{} {} {}** (orb: {:.1f}°, score: {:+.1f})\n".format
+_MD_HARMONIOUS = "- {} {} {} - Flowing energy (score: {:+.1f})\n".format
+_MD_CHALLENGING = "- {} {} {} - Tension for growth (score: {:+.1f})\n".format
+_MD_LINE = "- {}\n".format
+_MD_COMPOSITE = "- **{}:** {} - {}\n".format
+_MD_ADVICE = "- **{}** - {}\n".format
+_MD_POTENTIAL = "{} **{}** - {}\n".format
+_MD_FOOTER = """
+
+---
+
+## 🎯 FINAL VERDICT
+
+**{name1} & {name2}:** {interpretation}
+
+Your compatibility score of **{overall_score:.1f}/100** indicates {description}.
+
+{recommendation}
+
+---
+
+*Generated with advanced synastry calculations and spiritual compatibility analysis*
+*Calculation Method: Enhanced Swiss Ephemeris + Spiritual Indicators*
+""".format
+
+def render_markdown(result, write):
+    """Write the markdown report piece by piece with write(text)"""
+    name1, name2 = result['names']
+    scores = result['scores']
+    destiny = result['destiny']
+    spiritual = result['spiritual']
+    highlights = result['highlights']
+
+    write(_MD_HEADER(
+        name1=name1, name2=name2, overall_score=scores['overall_score'], grade=scores['grade'],
+        interpretation=scores['interpretation'], synastry_score=scores['synastry_score'],
+        destiny_score=scores['destiny_score'], spiritual_score=scores['spiritual_score'],
+        total_aspects=highlights['total_aspects'], harmonious_count=highlights['harmonious_count'],
+        challenging_count=highlights['challenging_count'],
+        positive=scores['synastry_details']['positive'], negative=scores['synastry_details']['negative'],
+        destined='✅ YES' if destiny['score'] >= 20 else '❌ NO',
+        score=destiny['score'], max_score=destiny['max_score']
+    ))
+    for connection in destiny['node_connections']:
+        write(_MD_NODE(**connection))
+    write("\n**7th House Synastry (Relationship Destiny):**\n")
+    for connection in destiny['7th_house_synastry']:
+        write(_MD_HOUSE(**connection))
+    write("\n**Part of Fortune Connections:**\n")
+    for connection in destiny['part_of_fortune_connections']:
+        write(_MD_FORTUNE(**connection))
+
+    write(_MD_SPIRITUAL(level=twin_flame_level(spiritual),
+                        score=len(spiritual['twin_flame_indicators']) * 18))
+    for indicator in spiritual['twin_flame_indicators']:
+        write(_MD_TWIN(**indicator))
+    write(_MD_SOULMATE_HEADER(soulmate_level(spiritual)))
+    for indicator in spiritual['soulmate_indicators']:
+        write(_MD_SOULMATE(**indicator))
+    write("\n**Past Life Connections:**\n")
+    for connection in spiritual['past_life_connections']:
+        write(_MD_PAST_LIFE(**connection))
+    write("\n**Elemental Harmony:**\n")
+    for harmony in spiritual['elemental_harmony']:
+        write(_MD_ELEMENT(**harmony))
+    write("\n**Life Path Alignment:**\n")
+    for alignment in spiritual['life_path_alignment']:
+        write(_MD_LIFE_PATH(**alignment))
+
+    write("\n\n---\n\n## 💫 SYNASTRY HIGHLIGHTS\n\n### **Top 5 Strongest Aspects:**\n")
+    for aspect in highlights['strongest']:
+        planet1, planet2 = aspect['planets']
+        write(_MD_STRONGEST(aspect_symbol(aspect['score']), planet1.capitalize(), aspect['aspect'],
+                            planet2.capitalize(), aspect['orb'], aspect['score']))
+    write("\n### **Harmonious Aspects (Supportive):**\n")
+    for aspect in highlights['harmonious']:
+        planet1, planet2 = aspect['planets']
+        write(_MD_HARMONIOUS(planet1.capitalize(), aspect['aspect'], planet2.capitalize(), aspect['score']))
+    write("\n### **Challenging Aspects (Growth Areas):**\n")
+    for aspect in highlights['challenging']:
+        planet1, planet2 = aspect['planets']
+        write(_MD_CHALLENGING(planet1.capitalize(), aspect['aspect'], planet2.capitalize(), aspect['score']))
+    if not highlights['challenging']:
+        write("- No significant challenging aspects detected\n")
+    write("\n### **Cross-Chart Patterns:**\n")
+    for line in pattern_lines(result['patterns']) or ['No cross-chart patterns detected']:
+        write(_MD_LINE(line))
+
+    write("\n\n---\n\n## 🌈 COMPOSITE CHART INSIGHTS\n\n**Relationship Essence:**\n")
+    for body, title, meaning in COMPOSITE_MEANINGS:
+        if body in result['composite']:
+            write(_MD_COMPOSITE(title, result['composite'][body]['sign'], meaning))
+
+    write("\n\n---\n\n## 💖 RELATIONSHIP RECOMMENDATIONS\n\n### **Strengths to Nurture:**\n")
+    for title, advice in strengths(scores):
+        write(_MD_ADVICE(title, advice))
+    write("\n### **Areas for Growth:**\n")
+    for title, advice in growth_areas(result):
+        write(_MD_ADVICE(title, advice))
+    write("\n\n### **Long-Term Potential:**\n")
+    write(_MD_POTENTIAL(*long_term_potential(scores['overall_score'])))
+
+    write(_MD_FOOTER(name1=name1, name2=name2, interpretation=scores['interpretation'],
+                     overall_score=scores['overall_score'], **result['verdict']))
+
+def render_json(result, write):
+    """Write the structured result as one JSON document"""
+    write(json.dumps(result, ensure_ascii=False))
+    write("\n")
+
+# HTML templates (every inserted value is escaped first)
+
+_HTML_HEADER = """<article class="compatibility-report">
+<h1>Enhanced Relationship Compatibility Report</h1>
+<h2>{name1} &amp; {name2}</h2>
+<section class="scores">
+<h2>Compatibility Scores</h2>
+<p class="overall"><strong>Overall Score: {overall_score:.1f}/100</strong> &mdash; Grade {grade}: {interpretation}</p>
+<table>
+<tr><th>Category</th><th>Score</th><th>Weight</th></tr>
+<tr><td>Synastry Harmony</td><td>{synastry_score:.1f}/100</td><td>40%</td></tr>
+<tr><td>Destiny Connection</td><td>{destiny_score:.1f}/100</td><td>30%</td></tr>
+<tr><td>Spiritual Bond</td><td>{spiritual_score:.1f}/100</td><td>30%</td></tr>
+</table>
+<p>{total_aspects} synastry aspects ({harmonious_count} harmonious, {challenging_count} challenging); raw score {positive:.1f} positive, {negative:.1f} negative</p>
+</section>
+""".format
+_HTML_SECTION = '<section class="{}">\n<h2>{}</h2>\n'.format
+_HTML_SECTION_END = "</section>\n"
+_HTML_HEADING = "<h3>{}</h3>\n".format
+_HTML_PARAGRAPH = "<p>{}</p>\n".format
+_HTML_ITEM = "<li>{}</li>\n".format
+_HTML_ADVICE = "<li><strong>{}</strong> &mdash; {}</li>\n".format
+_HTML_FOOTER = """<section class="verdict">
+<h2>Final Verdict</h2>
+<p><strong>{name1} &amp; {name2}:</strong> {interpretation}</p>
+<p>Your compatibility score of <strong>{overall_score:.1f}/100</strong> indicates {description}.</p>
+<p>{recommendation}</p>
+</section>
+</article>
+""".format
+
+def _html_list(write, heading, lines):
+    """A heading and a bulleted list of already formatted, unescaped lines"""
+    write(_HTML_HEADING(html.escape(heading)))
+    write("<ul>\n")
+    for line in lines:
+        write(_HTML_ITEM(html.escape(line)))
+    write("</ul>\n")
+
+def _aspect_line(aspect, suffix):
+    """One harmonious/challenging aspect as text"""
+    planet1, planet2 = aspect['planets']
+    return f"{planet1.capitalize()} {aspect['aspect']} {planet2.capitalize()} - {suffix} (score: {aspect['score']:+.1f})"
+
+def render_html(result, write):
+    """Write the report as an HTML fragment"""
+    escape = html.escape
+    name1, name2 = (escape(name) for name in result['names'])
+    scores = result['scores']
+    destiny = result['destiny']
+    spiritual = result['spiritual']
+    highlights = result['highlights']
+
+    write(_HTML_HEADER(
+        name1=name1, name2=name2, overall_score=scores['overall_score'], grade=escape(scores['grade']),
+        interpretation=escape(scores['interpretation']), synastry_score=scores['synastry_score'],
+        destiny_score=scores['destiny_score'], spiritual_score=scores['spiritual_score'],
+        total_aspects=highlights['total_aspects'], harmonious_count=highlights['harmonious_count'],
+        challenging_count=highlights['challenging_count'],
+        positive=scores['synastry_details']['positive'], negative=scores['synastry_details']['negative']
+    ))
+
+    write(_HTML_SECTION('destiny', 'Destiny &amp; Fated Connections'))
+    write(_HTML_PARAGRAPH(escape(f"Were you destined to meet? {'YES' if destiny['score'] >= 20 else 'NO'} "
+                                 f"(destiny score {destiny['score']}/{destiny['max_score']})")))
+    _html_list(write, 'Node Connections (Life Path Alignment)',
+               (f"{c['planet']} {c['aspect']} North Node (orb: {c['orb']:.1f}°) - {c['significance']}"
+                for c in destiny['node_connections']))
+    _html_list(write, '7th House Synastry (Relationship Destiny)',
+               (f"{c['planet']} in 7th House {c['aspect']} (orb: {c['orb']:.1f}°) - {c['significance']}"
+                for c in destiny['7th_house_synastry']))
+    _html_list(write, 'Part of Fortune Connections',
+               (f"{c['planet']} {c['aspect']} Part of Fortune (orb: {c['orb']:.1f}°) - {c['significance']}"
+                for c in destiny['part_of_fortune_connections']))
+    write(_HTML_SECTION_END)
+
+    write(_HTML_SECTION('spiritual', 'Spiritual Connection Analysis'))
+    _html_list(write, f"Twin Flame Indicators: {twin_flame_level(spiritual)} "
+                      f"(score {len(spiritual['twin_flame_indicators']) * 18}/180)",
+               (f"{i['connection']} {i['aspect']} (orb: {i['orb']:.1f}°) - {i['intensity']} intensity"
+                for i in spiritual['twin_flame_indicators']))
+    _html_list(write, f"Soulmate Indicators: {soulmate_level(spiritual)}",
+               (f"{i['connection']} {i['aspect']} (orb: {i['orb']:.1f}°) - {i['harmony']} harmony"
+                for i in spiritual['soulmate_indicators']))
+    _html_list(write, 'Past Life Connections',
+               (f"{c['connection']} {c['aspect']} (orb: {c['orb']:.1f}°) - {c['karma']} karma"
+                for c in spiritual['past_life_connections']))
+    _html_list(write, 'Elemental Harmony',
+               (f"{h['connection']} - {h['significance']}" for h in spiritual['elemental_harmony']))
+    _html_list(write, 'Life Path Alignment',
+               (f"{a['alignment']} - {a['significance']}" for a in spiritual['life_path_alignment']))
+    write(_HTML_SECTION_END)
+
+    write(_HTML_SECTION('synastry', 'Synastry Highlights'))
+    _html_list(write, 'Top 5 Strongest Aspects',
+               (f"{aspect_symbol(a['score'])} {a['planets'][0].capitalize()} {a['aspect']} "
+                f"{a['planets'][1].capitalize()} (orb: {a['orb']:.1f}°, score: {a['score']:+.1f})"
+                for a in highlights['strongest']))
+    _html_list(write, 'Harmonious Aspects (Supportive)',
+               (_aspect_line(a, 'Flowing energy') for a in highlights['harmonious']))
+    _html_list(write, 'Challenging Aspects (Growth Areas)',
+               [_aspect_line(a, 'Tension for growth') for a in highlights['challenging']]
+               or ['No significant challenging aspects detected'])
+    _html_list(write, 'Cross-Chart Patterns',
+               pattern_lines(result['patterns']) or ['No cross-chart patterns detected'])
+    write(_HTML_SECTION_END)
+
+    write(_HTML_SECTION('composite', 'Composite Chart Insights'))
+    _html_list(write, 'Relationship Essence',
+               (f"{title}: {result['composite'][body]['sign']} - {meaning}"
+                for body, title, meaning in COMPOSITE_MEANINGS if body in result['composite']))
+    write(_HTML_SECTION_END)
+
+    write(_HTML_SECTION('recommendations', 'Relationship Recommendations'))
+    for heading, items in (('Strengths to Nurture', strengths(scores)),
+                           ('Areas for Growth', growth_areas(result))):
+        write(_HTML_HEADING(heading))
+        write("<ul>\n")
+        for title, advice in items:
+            write(_HTML_ADVICE(escape(title), escape(advice)))
+        write("</ul>\n")
+    icon, title, text = long_term_potential(scores['overall_score'])
+    write(_HTML_HEADING('Long-Term Potential'))
+    write(_HTML_PARAGRAPH(f"{icon} <strong>{escape(title)}</strong> &mdash; {escape(text)}"))
+    write(_HTML_SECTION_END)
+
+    write(_HTML_FOOTER(name1=name1, name2=name2, interpretation=escape(scores['interpretation']),
+                       overall_score=scores['overall_score'],
+                       description=escape(result['verdict']['description']),
+                       recommendation=escape(result['verdict']['recommendation'])))
+
+RENDERERS = {
+    'markdown': render_markdown,
+    'json': render_json,
+    'html': render_html,
+}
+
+def render_report(result, stream=None, fmt='markdown'):
+    """
+    Render a compatibility result.
+
+    Args:
+        result: Output of EnhancedCompatibilityCalculator.compatibility_result
+        stream: Text stream to write to; when None the pieces are collected
+            in a list and joined once
+        fmt: One of REPORT_FORMATS
+
+    Returns:
+        str: The report when no stream is given, else None
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown report format '{fmt}' (choose from {', '.join(REPORT_FORMATS)})")
+    if stream is not None:
+        RENDERERS[fmt](result, stream.write)
+        return None
+    parts = []
+    RENDERERS[fmt](result, parts.append)
+    return ''.join(parts)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+compatibility_search.py
+
+One-to-many compatibility search.
+Scores a query chart against a stream of candidate charts (a list or an
+AstrologyDatabase read page by page), keeps only the best k in a bounded heap
+and spreads the scoring over a process pool. Database candidates are read as
+their stored compatibility profiles, so no chart JSON is decoded while
+ranking. Full markdown reports are generated for the winners only.
+
+For large pools cascade_rank puts a vectorized prescreen in front: only the
+separations of the luminaries, Venus and Mars are scored for every
+candidate, and the full analysis runs on a shortlist.
+"""
+
+import heapq
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+import numpy as np
+
+from compatibility_profile import CompatibilityProfile, compatibility_profile
+from enhanced_compatibility_clean import EnhancedCompatibilityCalculator
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 50
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CHUNK_SIZE = 64
+
+# Cascade prescreen: separations involving these bodies are scored for every
+# candidate; aspects within CASCADE_TIGHT_ORB earn a bonus and synastry
+# weights count as in the overall score (0.4 * 60 / 400 per point)
+CASCADE_BODIES = ('sun', 'moon', 'venus', 'mars')
+CASCADE_SHORTLIST_FACTOR = 50
+CASCADE_TIGHT_ORB = 3.0
+CASCADE_TIGHT_BONUS = 5.0
+CASCADE_SYNASTRY_SCALE = 0.06
+
+def iter_candidates(candidate_source, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Normalize a candidate source into (id, name, chart) tuples.
+
+    Args:
+        candidate_source: AstrologyDatabase (streamed with
+            iter_compatibility_profiles), or an iterable of chart records
+            (dicts with chart_data and optional id/name), (id, chart) pairs,
+            (id, name, chart or profile) triples or bare charts
+        page_size: Database page size
+
+    Yields:
+        tuple: (candidate id, name, chart dict or CompatibilityProfile)
+    """
+    if hasattr(candidate_source, 'iter_compatibility_profiles'):
+        yield from candidate_source.iter_compatibility_profiles(page_size=page_size)
+        return
+
+    for position, item in enumerate(candidate_source):
+        if isinstance(item, tuple) and len(item) == 3:
+            yield item
+        elif isinstance(item, tuple):
+            key, chart = item
+            yield key, chart.get('birth', {}).get('name', str(key)), chart
+        elif 'chart_data' in item:
+            key = item.get('id', position)
+            yield key, item.get('name', str(key)), item['chart_data']
+        else:
+            yield position, item.get('birth', {}).get('name', str(position)), item
+
+# Per-process state set up once by the pool initializer
+_worker_calculator = None
+_worker_query = None
+_worker_patterns = False
+
+def _init_worker(query_chart, orb_profile, patterns=False):
+    """Pool initializer: build the calculator and the query chart's profile"""
+    global _worker_calculator, _worker_query, _worker_patterns
+    _worker_calculator = EnhancedCompatibilityCalculator(orb_profile)
+    _worker_query = compatibility_profile(query_chart)
+    _worker_patterns = patterns
+
+def _score_chunk(chunk):
+    """Score (seq, id, name, chart) items against the worker's query chart"""
+    results = []
+    skipped = 0
+    for seq, key, name, chart in chunk:
+        try:
+            scores = _worker_calculator.score_compatibility(_worker_query, chart)
+            if _worker_patterns:
+                scores['cross_patterns'] = _worker_calculator.cross_pattern_counts(_worker_query, chart)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Skipping candidate {key}: {e}")
+            skipped += 1
+            continue
+        results.append((scores['overall_score'], seq, key, name, scores))
+    return results, skipped
+
+def _push(heap, k, item, chart=None):
+    """Keep the k best (score, earliest seq) items in a min-heap"""
+    score, seq, key, name, scores = item
+    entry = (score, -seq, key, name, scores, chart)
+    if len(heap) < k:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+def rank_matches(query_chart, candidate_source, k=DEFAULT_TOP_K, workers=None,
+                 page_size=DEFAULT_PAGE_SIZE, chunk_size=DEFAULT_CHUNK_SIZE,
+                 orb_profile='synastry', exclude_ids=None, reports=False,
+                 query_name='Person A', patterns=False):
+    """
+    Find the k candidates most compatible with a query chart.
+
+    Only the numeric scores from calculate_compatibility_score are computed
+    per candidate; memory stays bounded by k plus the chunks in flight.
+
+    Args:
+        query_chart: Chart dict with bodies and houses
+        candidate_source: AstrologyDatabase or iterable (see iter_candidates)
+        k: Number of matches to return
+        workers: Worker processes (default: CPU count; 1 scores in-process)
+        page_size: Database page size when streaming candidates
+        chunk_size: Candidates sent to a worker per task
+        orb_profile: Orb profile for the calculator
+        exclude_ids: Candidate ids to skip (e.g. the query's own id)
+        reports: Also generate the full markdown report for each match
+        query_name: Name used for the query person in reports
+        patterns: Also count the cross-chart patterns (combined T-squares,
+            Grand Trines, ...) of every candidate into scores['cross_patterns']
+
+    Returns:
+        list: Dicts with rank, id, name, score, grade and scores (and report),
+        best first; ties keep candidate order
+    """
+    if k < 1:
+        raise ValueError("k must be positive")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+
+    workers = workers or os.cpu_count() or 1
+    exclude = set(exclude_ids or ())
+    candidates = ((seq, key, name, chart) for seq, (key, name, chart)
+                  in enumerate(iter_candidates(candidate_source, page_size))
+                  if key not in exclude)
+    chunks = iter(lambda: list(islice(candidates, chunk_size)), [])
+
+    heap = []
+    skipped = 0
+
+    def collect(chunk, results, chunk_skipped):
+        nonlocal skipped
+        skipped += chunk_skipped
+        # Winners keep their chart only when a report will be written
+        charts = {item[0]: item[3] for item in chunk} if reports else {}
+        for item in results:
+            _push(heap, k, item, charts.get(item[1]))
+
+    if workers == 1:
+        _init_worker(query_chart, orb_profile, patterns)
+        for chunk in chunks:
+            collect(chunk, *_score_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(query_chart, orb_profile, patterns)) as pool:
+            # Bounded number of chunks in flight so the source is streamed
+            pending = {}
+            for chunk in chunks:
+                pending[pool.submit(_score_chunk, chunk)] = chunk
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(pending.pop(future), *future.result())
+            for future, chunk in pending.items():
+                collect(chunk, *future.result())
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} candidates with incomplete chart data")
+
+    calculator = EnhancedCompatibilityCalculator(orb_profile) if reports else None
+    ranked = sorted(heap, key=lambda entry: entry[:2], reverse=True)
+    matches = []
+    for rank, (score, _, key, name, scores, chart) in enumerate(ranked, 1):
+        match = {'rank': rank, 'id': key, 'name': name, 'score': score,
+                 'grade': scores['grade'], 'scores': scores}
+        if reports:
+            chart = _report_chart(candidate_source, key, chart)
+            match['report'] = calculator.generate_compatibility_report(query_chart, chart, query_name, name)
+        matches.append(match)
+    return matches
+
+def _report_chart(candidate_source, key, chart):
+    """Full chart for a report, loaded from the database when only a profile was read"""
+    if isinstance(chart, CompatibilityProfile):
+        return candidate_source.get_chart(key)['chart_data']
+    return chart
+
+def _separation(longitudes1, longitudes2):
+    """Angular separation (0-180) with numpy broadcasting"""
+    angle = np.abs(longitudes1 - longitudes2)
+    return np.where(angle > 180, 360 - angle, angle)
+
+def _body_longitudes(profile, bodies):
+    """Longitudes of the given bodies in a profile, NaN where missing"""
+    return [profile.longitudes[profile.index[body]] if body in profile.index else np.nan
+            for body in bodies]
+
+def prescreen_scores(calculator, query, profiles, bodies=CASCADE_BODIES):
+    """
+    Cheap first-stage scores of many candidate profiles against a query profile.
+
+    Only separations involving the given bodies are examined: the query's
+    bodies against every point of each candidate, and each candidate's
+    bodies against the query's other points. Every aspect adds its synastry
+    weight (scaled as in the overall score), and aspects within
+    CASCADE_TIGHT_ORB add CASCADE_TIGHT_BONUS because the destiny and
+    spiritual indicators are tight aspects.
+
+    Args:
+        calculator: EnhancedCompatibilityCalculator supplying orbs and weights
+        query: CompatibilityProfile of the query chart
+        profiles: Candidate CompatibilityProfiles
+        bodies: Bodies whose separations are screened
+
+    Returns:
+        ndarray: One score per profile; higher is more promising
+    """
+    if not profiles:
+        return np.zeros(0)
+
+    # Index -1 (no aspect) picks the trailing zero weight
+    weights = np.append(calculator.weight_table, 0)
+
+    query_bodies = np.array(_body_longitudes(query, bodies))
+    rest_names = tuple(name for name in query.point_names if name not in bodies)
+    query_rest = np.array([longitude for name, longitude in zip(query.point_names, query.points)
+                           if name not in bodies])
+    width = max(len(profile.points) for profile in profiles)
+    points = np.full((len(profiles), width), np.nan)
+    # Orbs of the query's bodies against each candidate's points (padding never matches)
+    point_orbs = np.zeros((len(profiles), len(bodies), width, len(calculator.weight_table)))
+    for row, profile in enumerate(profiles):
+        points[row, :len(profile.points)] = profile.points
+        point_orbs[row, :, :len(profile.points)] = calculator.point_orbs(bodies, profile.point_names)
+    candidate_bodies = np.array([_body_longitudes(profile, bodies) for profile in profiles])
+
+    scores = np.zeros(len(profiles))
+    for angle, orb_table in ((_separation(query_bodies[None, :, None], points[:, None, :]), point_orbs),
+                             (_separation(candidate_bodies[:, :, None], query_rest[None, None, :]),
+                              calculator.point_orbs(bodies, rest_names))):
+        aspects, orbs = calculator.first_aspects(angle, orb_table)
+        scores += CASCADE_SYNASTRY_SCALE * weights[aspects].sum(axis=(1, 2))
+        scores += CASCADE_TIGHT_BONUS * ((aspects >= 0) & (orbs <= CASCADE_TIGHT_ORB)).sum(axis=(1, 2))
+    return scores
+
+def cascade_rank(query_chart, candidate_source, k=DEFAULT_TOP_K, shortlist=None,
+                 shortlist_factor=CASCADE_SHORTLIST_FACTOR, bodies=CASCADE_BODIES,
+                 check_recall=False, workers=None, page_size=DEFAULT_PAGE_SIZE,
+                 chunk_size=DEFAULT_CHUNK_SIZE, orb_profile='synastry', exclude_ids=None,
+                 reports=False, query_name='Person A', patterns=False):
+    """
+    Two-stage search: prescreen every candidate, fully score a shortlist.
+
+    Stage one runs prescreen_scores over each page of candidate profiles and
+    keeps the best `shortlist` in a bounded heap. Stage two runs rank_matches
+    (the full destiny, spiritual and synastry analysis) on the shortlist only.
+
+    Args:
+        query_chart: Chart dict with bodies and houses
+        candidate_source: AstrologyDatabase or iterable (see iter_candidates)
+        k: Number of matches to return
+        shortlist: Candidates passed to stage two (default k * shortlist_factor)
+        shortlist_factor: Shortlist size as a multiple of k
+        bodies: Bodies whose separations stage one screens
+        check_recall: Also run the exhaustive search and report how much of
+            its top k the cascade found (the source must be readable twice)
+        workers, page_size, chunk_size, orb_profile, exclude_ids, reports,
+        query_name, patterns: As for rank_matches
+
+    Returns:
+        dict: matches (as from rank_matches), screened and shortlisted counts,
+        pruning_ratio (share of screened candidates never fully scored) and
+        recall (None unless check_recall)
+    """
+    if k < 1:
+        raise ValueError("k must be positive")
+    shortlist = shortlist or k * shortlist_factor
+    if shortlist < k:
+        raise ValueError("Shortlist must hold at least k candidates")
+
+    calculator = EnhancedCompatibilityCalculator(orb_profile)
+    query = compatibility_profile(query_chart)
+    exclude = set(exclude_ids or ())
+
+    heap = []
+    screened = 0
+    skipped = 0
+
+    def screen(page):
+        nonlocal screened
+        screened += len(page)
+        scores = prescreen_scores(calculator, query, [item[3] for item in page], bodies)
+        for score, (seq, key, name, profile, candidate) in zip(scores.tolist(), page):
+            entry = (score, -seq, key, name, profile, candidate)
+            if len(heap) < shortlist:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    page = []
+    for seq, (key, name, candidate) in enumerate(iter_candidates(candidate_source, page_size)):
+        if key in exclude:
+            continue
+        try:
+            profile = compatibility_profile(candidate)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Skipping candidate {key}: {e}")
+            skipped += 1
+            continue
+        page.append((seq, key, name, profile, candidate))
+        if len(page) >= page_size:
+            screen(page)
+            page = []
+    if page:
+        screen(page)
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} candidates with incomplete chart data")
+
+    # Candidate order decides ties in stage two, as in the exhaustive search
+    finalists = sorted(heap, key=lambda entry: -entry[1])
+    candidates = {entry[2]: entry[5] for entry in finalists}
+    matches = rank_matches(query_chart, [(key, name, profile) for _, _, key, name, profile, _ in finalists],
+                           k=k, workers=workers, chunk_size=chunk_size, orb_profile=orb_profile,
+                           patterns=patterns)
+    if reports:
+        for match in matches:
+            chart = _report_chart(candidate_source, match['id'], candidates[match['id']])
+            match['report'] = calculator.generate_compatibility_report(query_chart, chart, query_name,
+                                                                       match['name'])
+
+    recall = None
+    if check_recall:
+        exhaustive = rank_matches(query_chart, candidate_source, k=k, workers=workers, page_size=page_size,
+                                  chunk_size=chunk_size, orb_profile=orb_profile, exclude_ids=exclude_ids)
+        expected = {match['id'] for match in exhaustive}
+        found = {match['id'] for match in matches}
+        recall = len(expected & found) / len(expected) if expected else 1.0
+
+    pruning_ratio = 1 - len(finalists) / screened if screened else 0.0
+    logger.info(f"Cascade screened {screened} candidates, fully scored {len(finalists)} "
+                f"(pruned {pruning_ratio:.1%})" + (f", recall {recall:.1%}" if recall is not None else ""))
+    return {'matches': matches, 'screened': screened, 'shortlisted': len(finalists),
+            'pruning_ratio': pruning_ratio, 'recall': recall}
@@ -8,44 +8,907 @@ Handles chart storage, reading history, and user data management.
 import sqlite3
 import json
 import os
+import time
+import threading
+import re
+import zlib
+import queue
+import argparse
+import functools
+import inspect
+import weakref
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 
+from compatibility_profile import PROFILE_VERSION, CompatibilityProfile
+from houses import find_house, house_cusps
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# UPSERT (INSERT ... ON CONFLICT DO UPDATE) needs SQLite 3.24; RETURNING needs
+# 3.35, older libraries look the upserted id up by its birth key instead
+MIN_SQLITE_VERSION = (3, 24, 0)
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Connection settings applied to every pooled connection
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers never block the writer
+    'synchronous': 'NORMAL',      # fsync at checkpoints only; safe with WAL
+    'busy_timeout': 5000,         # ms to wait on a locked database
+    'cache_size': -20000,         # page cache in KiB (negative) per connection
+    'mmap_size': 268435456,       # memory-map up to 256 MB of the file
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON'          # ON DELETE CASCADE on the chart child tables
+}
+
+# Query instrumentation: statements slower than DEFAULT_SLOW_QUERY_MS are
+# logged with their query plan; latencies are counted in these buckets (ms)
+DEFAULT_SLOW_QUERY_MS = 100.0
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+SLOW_QUERY_LOG_SIZE = 50
+NORMALIZED_SQL_CACHE_SIZE = 1024
+
+# Statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+def _new_timing() -> Dict:
+    """Empty latency record"""
+    return {'calls': 0, 'errors': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+
+@functools.lru_cache(maxsize=NORMALIZED_SQL_CACHE_SIZE)
+def normalize_sql(sql: str) -> str:
+    """Statement text with whitespace collapsed (used as the stats key)"""
+    return ' '.join(sql.split())
+
+def _bucket(elapsed_ms: float) -> int:
+    """Index of the latency bucket for elapsed_ms"""
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if elapsed_ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+class QueryStats:
+    """Thread-safe call counts, latency histograms and row counts for a database"""
+    
+    def __init__(self, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods = {}
+        self._statements = {}
+        self._slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+    
+    def _method_stack(self) -> list:
+        stack = getattr(self._local, 'methods', None)
+        if stack is None:
+            stack = self._local.methods = []
+        return stack
+    
+    def record_method(self, name: str, elapsed_ms: float, failed: bool = False):
+        """Count one AstrologyDatabase method call"""
+        with self._lock:
+            timing = self._methods.get(name)
+            if timing is None:
+                timing = self._methods[name] = _new_timing()
+            timing['calls'] += 1
+            timing['errors'] += failed
+            timing['total_ms'] += elapsed_ms
+            timing['max_ms'] = max(timing['max_ms'], elapsed_ms)
+            timing['histogram'][_bucket(elapsed_ms)] += 1
+    
+    def normalize(self, sql: str) -> str:
+        """Statement text with whitespace collapsed (used as the stats key)"""
+        return normalize_sql(sql)
+    
+    def record_statement(self, sql: str, elapsed_ms: float, rows: int = 0, new_call: bool = True,
+                         failed: bool = False):
+        """Count execution (new_call) or fetch time of one statement"""
+        key = self.normalize(sql)
+        stack = self._method_stack()
+        with self._lock:
+            timing = self._statements.get(key)
+            if timing is None:
+                timing = self._statements[key] = _new_timing()
+            if new_call:
+                timing['calls'] += 1
+                timing['errors'] += failed
+                timing['histogram'][_bucket(elapsed_ms)] += 1
+            timing['rows'] += rows
+            timing['total_ms'] += elapsed_ms
+            timing['max_ms'] = max(timing['max_ms'], elapsed_ms)
+            if rows and stack:
+                method = self._methods.get(stack[-1])
+                if method is None:
+                    method = self._methods[stack[-1]] = _new_timing()
+                method['rows'] += rows
+    
+    def record_slow_query(self, sql: str, elapsed_ms: float, plan: List[str]):
+        """Keep and log a statement that exceeded the slow-query threshold"""
+        entry = {'sql': self.normalize(sql), 'elapsed_ms': round(elapsed_ms, 3), 'plan': plan,
+                 'at': datetime.now().isoformat(timespec='seconds')}
+        with self._lock:
+            self._slow_queries.append(entry)
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {entry['sql']}"
+                       + ''.join(f"\n    {line}" for line in plan))
+    
+    def snapshot(self, top: int = 20) -> Dict:
+        """
+        Copy of the collected statistics.
+        
+        Returns:
+            Dict: 'methods' and the 'top' 'statements' by total time, each with
+            calls, errors, rows, total/mean/max ms and a latency histogram keyed
+            by bucket upper bound; plus the recent 'slow_queries'
+        """
+        labels = [f'<={bound}ms' for bound in LATENCY_BUCKETS_MS] + [f'>{LATENCY_BUCKETS_MS[-1]}ms']
+        
+        def export(timing):
+            summary = {key: value for key, value in timing.items() if key != 'histogram'}
+            summary['total_ms'] = round(timing['total_ms'], 3)
+            summary['max_ms'] = round(timing['max_ms'], 3)
+            summary['mean_ms'] = round(timing['total_ms'] / timing['calls'], 3) if timing['calls'] else 0.0
+            summary['histogram'] = {label: count for label, count in zip(labels, timing['histogram']) if count}
+            return summary
+        
+        with self._lock:
+            methods = {name: export(timing) for name, timing in sorted(self._methods.items())}
+            statements = sorted(self._statements.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+            statements = [dict(sql=sql, **export(timing)) for sql, timing in statements[:top]]
+            slow_queries = list(self._slow_queries)
+        return {'slow_query_ms': self.slow_query_ms, 'methods': methods,
+                'statements': statements, 'slow_queries': slow_queries}
+    
+    def reset(self):
+        """Forget everything collected so far"""
+        with self._lock:
+            self._methods.clear()
+            self._statements.clear()
+            self._slow_queries.clear()
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports statement timings and row counts to its connection's QueryStats"""
+    
+    _sql = None
+    _parameters = ()
+    _elapsed_ms = 0.0
+    _logged = False
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            result = super().execute(sql, parameters)
+        except Exception:
+            self.connection.query_stats.record_statement(sql, (time.perf_counter() - start) * 1000,
+                                                         failed=True)
+            raise
+        self._finish_execute(sql, parameters, start)
+        return result
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            result = super().executemany(sql, seq_of_parameters)
+        except Exception:
+            self.connection.query_stats.record_statement(sql, (time.perf_counter() - start) * 1000,
+                                                         failed=True)
+            raise
+        self._finish_execute(sql, None, start)
+        return result
+    
+    def _finish_execute(self, sql, parameters, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._sql, self._parameters = sql, parameters
+        self._elapsed_ms, self._logged = elapsed_ms, False
+        self.connection.query_stats.record_statement(sql, elapsed_ms, max(self.rowcount, 0))
+        self._check_slow()
+    
+    def __next__(self):
+        # `for row in cursor` fetches through here rather than fetchone
+        start = time.perf_counter()
+        row = super().__next__()
+        self._record_fetch(start, 1)
+        return row
+    
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._record_fetch(start, row is not None)
+        return row
+    
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._record_fetch(start, len(rows))
+        return rows
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._record_fetch(start, len(rows))
+        return rows
+    
+    def _record_fetch(self, start, rows):
+        """Add fetch time and rows to the statement last executed on this cursor"""
+        if self._sql is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._elapsed_ms += elapsed_ms
+        self.connection.query_stats.record_statement(self._sql, elapsed_ms, int(rows), new_call=False)
+        self._check_slow()
+    
+    def _check_slow(self):
+        """Log the current statement once it exceeds the slow-query threshold"""
+        stats = self.connection.query_stats
+        if self._logged or stats.slow_query_ms is None or self._elapsed_ms < stats.slow_query_ms:
+            return
+        self._logged = True
+        stats.record_slow_query(self._sql, self._elapsed_ms, self._explain())
+    
+    def _explain(self) -> List[str]:
+        """EXPLAIN QUERY PLAN lines for the current statement, if it has a plan"""
+        if self._parameters is None or not self._sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            # A plain cursor, so explaining is not itself instrumented
+            cursor = sqlite3.Cursor(self.connection)
+            cursor.execute(f'EXPLAIN QUERY PLAN {self._sql}', self._parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            return [f'(no plan: {e})']
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including Connection.execute) are instrumented"""
+    
+    query_stats = None
+    
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+    
+    # The C shortcuts create plain cursors, so route them through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+class _ThreadConnection:
+    """One thread's pooled connection; dropped with the thread's locals when it exits"""
+    
+    __slots__ = ('connection', '__weakref__')
+    
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+class ConnectionPool:
+    """Hands each thread its own SQLite connection to one database file, closed when the thread exits"""
+    
+    def __init__(self, db_path: str, pragmas: Dict = None, timeout: float = 30.0,
+                 query_stats: QueryStats = None):
+        """
+        Args:
+            db_path: Database file path (':memory:' shares one connection)
+            pragmas: PRAGMA settings for new connections (default DEFAULT_PRAGMAS)
+            timeout: Seconds sqlite3 waits for a lock before raising
+            query_stats: Instrument connections and report into these stats
+        """
+        self.db_path = db_path
+        self.query_stats = query_stats
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._connections = []
+        self._shared = None
+        # Each in-memory connection would be a separate empty database
+        self.in_memory = db_path == ':memory:' or db_path.startswith('file::memory:')
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        factory = sqlite3.Connection if self.query_stats is None else InstrumentedConnection
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                                     uri=self.db_path.startswith('file:'), factory=factory)
+        connection.row_factory = sqlite3.Row  # Enable dict-like access
+        if self.query_stats is not None:
+            connection.query_stats = self.query_stats
+        for name, value in self.pragmas.items():
+            if name == 'journal_mode' and self.in_memory:
+                continue
+            connection.execute(f'PRAGMA {name} = {value}')
+        
+        with self._lock:
+            self._connections.append(connection)
+        logger.debug(f"Opened database connection for thread {threading.current_thread().name}")
+        return connection
+    
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use"""
+        if self.in_memory:
+            with self._lock:
+                shared = self._shared
+            if shared is None:
+                shared = self._open()
+                with self._lock:
+                    self._shared = shared
+            return shared
+        
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            connection = self._open()
+            holder = _ThreadConnection(connection)
+            # Close the connection once its thread exits and the holder is collected
+            weakref.finalize(holder, self._release, connection)
+            self._local.holder = holder
+        return holder.connection
+    
+    def _release(self, connection: sqlite3.Connection):
+        """Close the connection of a thread that has exited"""
+        with self._lock:
+            try:
+                self._connections.remove(connection)
+            except ValueError:
+                return  # already closed by close_all
+        try:
+            connection.close()
+            logger.debug("Closed database connection of an exited thread")
+        except Exception as e:
+            logger.error(f"Error closing pooled connection: {e}")
+    
+    def size(self) -> int:
+        """Number of open connections"""
+        with self._lock:
+            return len(self._connections)
+    
+    def close_all(self):
+        """Close every connection handed out by this pool"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._shared = None
+        
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.error(f"Error closing pooled connection: {e}")
+        # Stale thread-locals in other threads are replaced on their next call
+        self._local = threading.local()
+
+# Storage formats for the chart/reading/compatibility JSON payload columns
+STORAGE_FORMAT_JSON = 'json'          # plain json.dumps text (legacy rows)
+STORAGE_FORMAT_ZLIB = 'json+zlib'     # compact JSON compressed into a BLOB
+DEFAULT_STORAGE_FORMAT = STORAGE_FORMAT_ZLIB
+
+# (table, payload column, format tag column) for every encoded payload
+PAYLOAD_COLUMNS = [
+    ('charts', 'chart_data', 'chart_data_format'),
+    ('readings', 'reading_data', 'reading_data_format'),
+    ('compatibility_analyses', 'compatibility_data', 'compatibility_data_format'),
+]
+
+def encode_data(data, storage_format: str = DEFAULT_STORAGE_FORMAT):
+    """Encode a payload for storage; returns (value, format tag)"""
+    if storage_format == STORAGE_FORMAT_ZLIB:
+        text = json.dumps(data, separators=(',', ':'))
+        return zlib.compress(text.encode('utf-8'), 6), storage_format
+    if storage_format == STORAGE_FORMAT_JSON:
+        return json.dumps(data), storage_format
+    raise ValueError(f"Unknown storage format '{storage_format}'")
+
+def decode_data(value, storage_format: str = STORAGE_FORMAT_JSON):
+    """Decode a stored payload according to its format tag"""
+    if storage_format == STORAGE_FORMAT_ZLIB:
+        return json.loads(zlib.decompress(value))
+    if storage_format in (STORAGE_FORMAT_JSON, None):
+        return json.loads(value)
+    raise ValueError(f"Unknown storage format '{storage_format}'")
+
+def _decode_row(row, column: str) -> Dict:
+    """Convert a row to a dict with its payload column decoded"""
+    data = dict(row)
+    data[column] = decode_data(data[column], data.pop(f'{column}_format', STORAGE_FORMAT_JSON))
+    return data
+
+# Columns identifying one person's chart; save_chart upserts on this key
+BIRTH_KEY_COLUMNS = ('name', 'birth_date', 'birth_time', 'timezone', 'latitude', 'longitude')
+
+# Insert a chart, or update the chart data of the row with the same birth key
+CHART_UPSERT_SQL = f'''
+    INSERT INTO charts ({', '.join(BIRTH_KEY_COLUMNS)}, house_system, chart_data, chart_data_format)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT ({', '.join(BIRTH_KEY_COLUMNS)})
+    DO UPDATE SET chart_data = excluded.chart_data,
+                  chart_data_format = excluded.chart_data_format,
+                  updated_at = CURRENT_TIMESTAMP
+'''
+CHART_BY_BIRTH_KEY_SQL = ('SELECT id FROM charts WHERE '
+                          + ' AND '.join(f'{column} = ?' for column in BIRTH_KEY_COLUMNS))
+
+# Birth keys of a bulk save, typed like the charts columns so the join below
+# compares the same stored values the unique birth-key index holds
+CHART_BATCH_KEYS_SQL = '''
+    CREATE TEMP TABLE IF NOT EXISTS chart_batch_keys (
+        seq INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        birth_date TEXT NOT NULL,
+        birth_time TEXT NOT NULL,
+        timezone TEXT NOT NULL,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL
+    )
+'''
+CHART_BATCH_IDS_SQL = ('SELECT k.seq, c.id FROM temp.chart_batch_keys k JOIN charts c ON '
+                       + ' AND '.join(f'c.{column} = k.{column}' for column in BIRTH_KEY_COLUMNS)
+                       + ' ORDER BY k.seq')
+
+def _migrate_unique_birth_key(cursor):
+    """Merge duplicate birth keys and add the unique birth-key index"""
+    key = ', '.join(BIRTH_KEY_COLUMNS)
+    join = ' AND '.join(f'c.{column} = d.{column}' for column in BIRTH_KEY_COLUMNS)
+    
+    # Keep the oldest row of each duplicate group with the newest chart data
+    cursor.execute(f'''
+        CREATE TEMP TABLE chart_merge AS
+        SELECT c.id AS old_id, d.keep_id, d.latest_id
+        FROM charts c
+        JOIN (SELECT {key}, MIN(id) AS keep_id, MAX(id) AS latest_id
+              FROM charts GROUP BY {key} HAVING COUNT(*) > 1) d ON {join}
+    ''')
+    cursor.execute('''
+        UPDATE charts
+        SET chart_data = (SELECT l.chart_data FROM charts l
+                          JOIN chart_merge m ON l.id = m.latest_id
+                          WHERE m.keep_id = charts.id LIMIT 1),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id IN (SELECT keep_id FROM chart_merge)
+    ''')
+    cursor.execute('DELETE FROM chart_merge WHERE old_id = keep_id')
+    
+    # Point history at the surviving row before removing the duplicates
+    cursor.execute('''
+        UPDATE readings
+        SET chart_id = (SELECT keep_id FROM chart_merge WHERE old_id = readings.chart_id)
+        WHERE chart_id IN (SELECT old_id FROM chart_merge)
+    ''')
+    for column in ('chart1_id', 'chart2_id'):
+        cursor.execute(f'''
+            UPDATE compatibility_analyses
+            SET {column} = (SELECT keep_id FROM chart_merge WHERE old_id = compatibility_analyses.{column})
+            WHERE {column} IN (SELECT old_id FROM chart_merge)
+        ''')
+    cursor.execute('DELETE FROM charts WHERE id IN (SELECT old_id FROM chart_merge)')
+    cursor.execute('DROP TABLE chart_merge')
+    
+    cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_charts_birth_key ON charts({key})')
+    # The birth key starts with name, so the single-column index is redundant
+    cursor.execute('DROP INDEX IF EXISTS idx_charts_name')
+
+# Charts parsed per round trip when (re)building the position/aspect tables
+INDEX_BATCH_SIZE = 500
+
+def _chart_index_rows(chart_id, chart_data):
+    """Flatten one chart's bodies and aspects into chart_positions/chart_aspects rows"""
+    positions = []
+    aspects = []
+    if not isinstance(chart_data, dict):
+        return positions, aspects
+    
+    bodies = chart_data.get('bodies') or {}
+    cusps = house_cusps(chart_data.get('houses'))
+    for body, data in bodies.items():
+        if not isinstance(data, dict):
+            continue
+        longitude = data.get('ecliptic_longitude_deg')
+        if not isinstance(longitude, (int, float)):
+            continue
+        house = data.get('house')
+        if house is None:
+            house = find_house(longitude, cusps) if cusps else None
+        retrograde = data.get('retrograde')
+        positions.append((
+            chart_id, body, longitude, data.get('sign'),
+            data.get('degree_in_sign', longitude % 30), house,
+            None if retrograde is None else int(bool(retrograde)),
+            data.get('speed_deg_per_day')
+        ))
+    
+    for aspect in chart_data.get('aspects') or []:
+        try:
+            body1, body2 = sorted(aspect['between'])
+            aspects.append((chart_id, body1, body2, aspect['aspect'],
+                            aspect.get('orb'), aspect.get('strength')))
+        except (KeyError, TypeError, ValueError):
+            continue
+    
+    return positions, aspects
+
+def _index_charts(cursor, charts):
+    """Replace the position and aspect rows for (chart_id, chart_data) pairs"""
+    charts = list(charts)
+    ids = [(chart_id,) for chart_id, _ in charts]
+    cursor.executemany('DELETE FROM chart_positions WHERE chart_id = ?', ids)
+    cursor.executemany('DELETE FROM chart_aspects WHERE chart_id = ?', ids)
+    
+    positions = []
+    aspects = []
+    for chart_id, chart_data in charts:
+        chart_positions, chart_aspects = _chart_index_rows(chart_id, chart_data)
+        positions.extend(chart_positions)
+        aspects.extend(chart_aspects)
+    
+    cursor.executemany('''
+        INSERT INTO chart_positions (chart_id, body, longitude, sign, degree,
+                                     house, retrograde, speed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', positions)
+    cursor.executemany('''
+        INSERT OR REPLACE INTO chart_aspects (chart_id, body1, body2, aspect, orb, strength)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', aspects)
+
+def _migrate_chart_index_tables(cursor):
+    """Add queryable position/aspect tables and backfill them from chart_data"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chart_positions (
+            chart_id INTEGER NOT NULL,
+            body TEXT NOT NULL,
+            longitude REAL NOT NULL,
+            sign TEXT,
+            degree REAL,
+            house INTEGER,
+            retrograde INTEGER,  -- 0/1, NULL when unknown
+            speed REAL,          -- degrees per day
+            PRIMARY KEY (chart_id, body),
+            FOREIGN KEY (chart_id) REFERENCES charts (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chart_aspects (
+            chart_id INTEGER NOT NULL,
+            body1 TEXT NOT NULL,  -- body1 < body2
+            body2 TEXT NOT NULL,
+            aspect TEXT NOT NULL,
+            orb REAL,
+            strength REAL,
+            PRIMARY KEY (chart_id, body1, body2, aspect),
+            FOREIGN KEY (chart_id) REFERENCES charts (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    
+    # Placement index; migration 8 widens it to cover the selected columns
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_chart_positions_placement
+        ON chart_positions(body, sign, house, retrograde, chart_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_chart_positions_longitude
+        ON chart_positions(body, longitude, chart_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_chart_aspects_pair
+        ON chart_aspects(body1, body2, aspect, orb, chart_id)
+    ''')
+    
+    # Backfill in batches so large stores are never parsed all at once
+    last_id = 0
+    while True:
+        cursor.execute('SELECT id, chart_data FROM charts WHERE id > ? ORDER BY id LIMIT ?',
+                       (last_id, INDEX_BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        _index_charts(cursor, ((row[0], decode_data(row[1])) for row in rows))
+        last_id = rows[-1][0]
+
+def _migrate_payload_format_columns(cursor):
+    """Tag every payload column with its storage format (existing rows are plain JSON)"""
+    for table, _, format_column in PAYLOAD_COLUMNS:
+        cursor.execute(f'''
+            ALTER TABLE {table}
+            ADD COLUMN {format_column} TEXT NOT NULL DEFAULT '{STORAGE_FORMAT_JSON}'
+        ''')
+
+def _migrate_created_at_index(cursor):
+    """Index created_at so newest-first listings page without sorting"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_charts_created_at ON charts(created_at, id)')
+
+def _fts5_available(cursor) -> bool:
+    """Whether the SQLite library was built with the FTS5 extension"""
+    return bool(cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+def _migrate_chart_search(cursor):
+    """Add a notes column and, where FTS5 is available, the name/notes search index"""
+    cursor.execute('ALTER TABLE charts ADD COLUMN notes TEXT')
+    if _fts5_available(cursor):
+        _create_chart_search_index(cursor)
+
+def _create_chart_search_index(cursor):
+    """Create the FTS5 index over name and notes kept in sync by triggers"""
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS charts_fts USING fts5(
+            name, notes,
+            content = 'charts', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '1 2 3'
+        )
+    ''')
+    
+    # External-content FTS tables must be told about every change to the source rows
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS charts_fts_insert AFTER INSERT ON charts BEGIN
+            INSERT INTO charts_fts (rowid, name, notes) VALUES (new.id, new.name, new.notes);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS charts_fts_delete AFTER DELETE ON charts BEGIN
+            INSERT INTO charts_fts (charts_fts, rowid, name, notes)
+            VALUES ('delete', old.id, old.name, old.notes);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS charts_fts_update AFTER UPDATE OF name, notes ON charts BEGIN
+            INSERT INTO charts_fts (charts_fts, rowid, name, notes)
+            VALUES ('delete', old.id, old.name, old.notes);
+            INSERT INTO charts_fts (rowid, name, notes) VALUES (new.id, new.name, new.notes);
+        END
+    ''')
+    cursor.execute("INSERT INTO charts_fts (charts_fts) VALUES ('rebuild')")
+
+def fts_prefix_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    tokens = re.findall(r'\w+', text or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+def like_prefix_condition(text: str, columns) -> tuple:
+    """
+    LIKE fallback for builds without FTS5: every word must start a word in one of columns.
+    
+    Returns:
+        tuple: (SQL condition or '' when text has no words, parameters)
+    """
+    conditions = []
+    params = []
+    for token in re.findall(r'\w+', text or ''):
+        token = token.replace('_', '\\_')  # \w tokens hold no other LIKE wildcards
+        matches = []
+        for column in columns:
+            matches.append(f"({column} LIKE ? ESCAPE '\\' OR {column} LIKE ? ESCAPE '\\')")
+            params.extend([f'{token}%', f'% {token}%'])
+        conditions.append('(' + ' OR '.join(matches) + ')')
+    return ' AND '.join(conditions), params
+
+def _migrate_reading_cache(cursor):
+    """Create the read-through cache of generated readings"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reading_cache (
+            chart_id INTEGER NOT NULL,
+            reading_type TEXT NOT NULL,
+            target_date TEXT NOT NULL,
+            engine_version TEXT NOT NULL,
+            reading_data BLOB NOT NULL,
+            reading_data_format TEXT NOT NULL,
+            created_at REAL NOT NULL,   -- unix time
+            accessed_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (chart_id, reading_type, target_date, engine_version)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reading_cache_accessed ON reading_cache(accessed_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reading_cache_expires ON reading_cache(expires_at)')
+
+def _store_profiles(cursor, charts, storage_format: str = DEFAULT_STORAGE_FORMAT):
+    """Replace the compatibility profiles for (chart_id, chart_data) pairs"""
+    rows = []
+    missing = []
+    for chart_id, chart_data in charts:
+        try:
+            profile = CompatibilityProfile.from_chart(chart_data)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            # Incomplete charts get no profile and are skipped by profile scans
+            missing.append((chart_id,))
+            continue
+        rows.append((chart_id, PROFILE_VERSION, *encode_data(profile.to_dict(), storage_format)))
+    
+    cursor.executemany('DELETE FROM compatibility_profiles WHERE chart_id = ?', missing)
+    cursor.executemany('''
+        INSERT OR REPLACE INTO compatibility_profiles
+            (chart_id, profile_version, profile_data, profile_data_format)
+        VALUES (?, ?, ?, ?)
+    ''', rows)
+
+def _migrate_compatibility_profiles(cursor):
+    """Create the per-chart compatibility profile table and backfill it from chart_data"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS compatibility_profiles (
+            chart_id INTEGER PRIMARY KEY,
+            profile_version INTEGER NOT NULL,
+            profile_data BLOB NOT NULL,
+            profile_data_format TEXT NOT NULL,
+            FOREIGN KEY (chart_id) REFERENCES charts (id) ON DELETE CASCADE
+        )
+    ''')
+    
+    last_id = 0
+    while True:
+        cursor.execute('''
+            SELECT id, chart_data, chart_data_format FROM charts
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, INDEX_BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        _store_profiles(cursor, ((row[0], decode_data(row[1], row[2])) for row in rows))
+        last_id = rows[-1][0]
+
+def _migrate_covering_placement_index(cursor):
+    """Rebuild the placement index to cover every column find_charts_by_placement selects"""
+    cursor.execute('DROP INDEX IF EXISTS idx_chart_positions_placement')
+    cursor.execute('''
+        CREATE INDEX idx_chart_positions_placement
+        ON chart_positions(body, sign, house, retrograde, chart_id, longitude, degree, speed)
+    ''')
+
+# Schema migrations as (version, description, function(cursor)); PRAGMA
+# user_version stores the last version applied. Append only.
+MIGRATIONS = [
+    (1, "unique birth-key index on charts", _migrate_unique_birth_key),
+    (2, "chart_positions and chart_aspects tables", _migrate_chart_index_tables),
+    (3, "storage format tags for payload columns", _migrate_payload_format_columns),
+    (4, "created_at index for chart listings", _migrate_created_at_index),
+    (5, "chart notes and FTS5 name/notes search", _migrate_chart_search),
+    (6, "reading cache table", _migrate_reading_cache),
+    (7, "compatibility profiles per chart", _migrate_compatibility_profiles),
+    (8, "covering placement index", _migrate_covering_placement_index),
+]
+
+# Reading cache defaults: entries live a day and the least recently used
+# beyond the size bound are evicted every READING_CACHE_PRUNE_INTERVAL writes
+READING_CACHE_TTL = 24 * 3600
+READING_CACHE_MAX_ENTRIES = 10000
+READING_CACHE_PRUNE_INTERVAL = 100
+READING_CACHE_TOUCH_INTERVAL = 60  # seconds between LRU timestamp updates per entry
+
+# Summary columns returned by chart listings (chart_data is loaded on demand)
+CHART_SUMMARY_COLUMNS = ('id', 'name', 'birth_date', 'birth_time', 'timezone', 'latitude',
+                         'longitude', 'house_system', 'notes', 'created_at', 'updated_at')
+
+# Columns iter_charts can order by; ties are broken by id for stable keysets
+CHART_ORDER_COLUMNS = ('id', 'name', 'birth_date', 'created_at', 'updated_at')
+
+class ChartRecord(Mapping):
+    """Read-only chart row whose chart_data is decoded only when first accessed"""
+    
+    def __init__(self, fields: Dict, loader):
+        """
+        Args:
+            fields: Summary column values
+            loader: Callable returning the decoded chart_data
+        """
+        self._fields = dict(fields)
+        self._loader = loader
+    
+    def __getitem__(self, key):
+        if key == 'chart_data' and 'chart_data' not in self._fields:
+            self._fields['chart_data'] = self._loader()
+        return self._fields[key]
+    
+    def __iter__(self):
+        yield from self._fields
+        if 'chart_data' not in self._fields:
+            yield 'chart_data'
+    
+    def __len__(self):
+        return len(self._fields) + ('chart_data' not in self._fields)
+    
+    @property
+    def data_loaded(self) -> bool:
+        """Whether chart_data has been decoded yet"""
+        return 'chart_data' in self._fields
+    
+    def to_dict(self) -> Dict:
+        """Plain dict in the same shape as get_chart()"""
+        return dict(self)
+    
+    def __repr__(self):
+        return f"ChartRecord(id={self._fields.get('id')}, name={self._fields.get('name')!r})"
+
+def instrument_methods(cls):
+    """
+    Class decorator timing every public method through the instance's query_stats.
+    
+    Generators are left alone; the methods they call are timed instead.
+    """
+    def wrap(name, method):
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            stats = getattr(self, 'query_stats', None)
+            if stats is None:
+                return method(self, *args, **kwargs)
+            
+            stack = stats._method_stack()
+            stack.append(name)
+            start = time.perf_counter()
+            failed = False
+            try:
+                return method(self, *args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                stack.pop()
+                stats.record_method(name, (time.perf_counter() - start) * 1000, failed)
+        return timed
+    
+    for name, member in list(vars(cls).items()):
+        if (name.startswith('_') or not inspect.isfunction(member)
+                or inspect.isgeneratorfunction(member)):
+            continue
+        setattr(cls, name, wrap(name, member))
+    return cls
+
+@instrument_methods
 class AstrologyDatabase:
     """SQLite database manager for astrology charts and readings"""
     
-    def __init__(self, db_path: str = None):
-        """Initialize database connection"""
+    def __init__(self, db_path: str = None, storage_format: str = DEFAULT_STORAGE_FORMAT,
+                 slow_query_ms: Optional[float] = DEFAULT_SLOW_QUERY_MS):
+        """
+        Initialize database connection.
+        
+        Args:
+            db_path: Database file (default astrology_data.db next to this module)
+            storage_format: Format new payloads are written in
+            slow_query_ms: Log statements slower than this with their query plan
+                (None disables the slow-query log; timings are still collected)
+        """
         try:
+            if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+                raise RuntimeError(f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required, "
+                                   f"found {sqlite3.sqlite_version}")
             if db_path is None:
                 db_path = os.path.join(os.path.dirname(__file__), 'astrology_data.db')
             
+            encode_data({}, storage_format)  # validate the format up front
             self.db_path = db_path
-            self.connection = None
+            self.storage_format = storage_format
+            self.pool = None
+            self.query_stats = QueryStats(slow_query_ms)
+            self.reading_cache_max_entries = READING_CACHE_MAX_ENTRIES
+            self._cache_writes = 0
+            self._cache_touches = {}
+            self._cache_lock = threading.Lock()
+            self._writers = []
             self.connect()
             self.create_tables()
+            self.migrate()
+            self.full_text_search = self._ensure_chart_search()
             logger.info(f"Database initialized at {db_path}")
             
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
-    def connect(self):
-        """Establish database connection"""
+    def connect(self, pragmas: Dict = None):
+        """Create the per-thread connection pool and open this thread's connection"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # Enable dict-like access
+            self.pool = ConnectionPool(self.db_path, pragmas, query_stats=self.query_stats)
+            self.pool.connection()
             logger.info("Database connection established")
             
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """Connection owned by the calling thread (None once closed)"""
+        return self.pool.connection() if self.pool else None
+    
     def create_tables(self):
         """Create necessary database tables"""
         try:
@@ -104,8 +967,8 @@ class AstrologyDatabase:
                 )
             ''')
             
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_charts_name ON charts(name)')
+            # Create indexes for better performance (name lookups use the
+            # unique birth-key index added by migration 1)
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_charts_birth_date ON charts(birth_date)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_readings_chart_id ON readings(chart_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_readings_target_date ON readings(target_date)')
@@ -117,43 +980,80 @@ class AstrologyDatabase:
             logger.error(f"Failed to create tables: {e}")
             raise
     
+    def get_schema_version(self) -> int:
+        """Return the last applied migration number (PRAGMA user_version)"""
+        return self.connection.execute('PRAGMA user_version').fetchone()[0]
+    
+    def migrate(self) -> int:
+        """
+        Apply pending schema migrations in order.
+        
+        Each migration runs in its own write transaction together with the
+        user_version bump, so an interrupted upgrade resumes where it stopped.
+        
+        Returns:
+            int: Schema version after migrating
+        """
+        connection = self.connection
+        version = self.get_schema_version()
+        
+        for target, description, apply in MIGRATIONS:
+            if target <= version:
+                continue
+            
+            cursor = connection.cursor()
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                # Another connection may have migrated while we waited for the lock
+                if self.get_schema_version() >= target:
+                    connection.rollback()
+                    continue
+                apply(cursor)
+                cursor.execute(f'PRAGMA user_version = {int(target)}')
+                connection.commit()
+                version = target
+                logger.info(f"Applied database migration {target}: {description}")
+                
+            except Exception as e:
+                logger.error(f"Database migration {target} failed: {e}")
+                connection.rollback()
+                raise
+        
+        return version
+    
+    def _ensure_chart_search(self) -> bool:
+        """Create the FTS5 chart index if missing; False when search must fall back to LIKE"""
+        connection = self.connection
+        cursor = connection.cursor()
+        if not _fts5_available(cursor):
+            logger.warning("SQLite was built without FTS5; chart search falls back to LIKE")
+            return False
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'charts_fts'")
+        if cursor.fetchone() is None:
+            # Database migrated by a build without FTS5
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                _create_chart_search_index(cursor)
+                connection.commit()
+                logger.info("Created FTS5 chart search index")
+            except Exception as e:
+                logger.error(f"Failed to create chart search index: {e}")
+                connection.rollback()
+                raise
+        return True
+    
     def save_chart(self, name: str, birth_date: str, birth_time: str, 
                    timezone: str, latitude: float, longitude: float, 
                    house_system: str, chart_data: Dict) -> int:
-        """Save a natal chart to the database"""
+        """Save a natal chart to the database (updates the chart for a known birth key)"""
         try:
             cursor = self.connection.cursor()
-            
-            # Check if chart with same name and birth data already exists
-            cursor.execute('''
-                SELECT id FROM charts 
-                WHERE name = ? AND birth_date = ? AND birth_time = ? 
-                AND timezone = ? AND latitude = ? AND longitude = ?
-            ''', (name, birth_date, birth_time, timezone, latitude, longitude))
-            
-            existing_chart = cursor.fetchone()
-            
-            if existing_chart:
-                # Update existing chart
-                cursor.execute('''
-                    UPDATE charts 
-                    SET chart_data = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (json.dumps(chart_data), existing_chart['id']))
-                chart_id = existing_chart['id']
-                logger.info(f"Updated existing chart: {name}")
-            else:
-                # Insert new chart
-                cursor.execute('''
-                    INSERT INTO charts (name, birth_date, birth_time, timezone, 
-                                      latitude, longitude, house_system, chart_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (name, birth_date, birth_time, timezone, latitude, 
-                      longitude, house_system, json.dumps(chart_data)))
-                chart_id = cursor.lastrowid
-                logger.info(f"Saved new chart: {name}")
+            chart_id = self._write_chart(cursor, name, birth_date, birth_time, timezone,
+                                         latitude, longitude, house_system, chart_data)
             
             self.connection.commit()
+            logger.info(f"Saved chart: {name}")
             return chart_id
             
         except Exception as e:
@@ -161,6 +1061,105 @@ class AstrologyDatabase:
             self.connection.rollback()
             raise
     
+    def _write_chart(self, cursor, name: str, birth_date: str, birth_time: str,
+                     timezone: str, latitude: float, longitude: float,
+                     house_system: str, chart_data: Dict) -> int:
+        """Upsert one chart and its index rows on cursor without committing"""
+        # One indexed statement: insert, or update the row with the same birth key
+        key = (name, birth_date, birth_time, timezone, latitude, longitude)
+        cursor.execute(CHART_UPSERT_SQL + (' RETURNING id' if SQLITE_HAS_RETURNING else ''),
+                       (*key, house_system, *encode_data(chart_data, self.storage_format)))
+        if not SQLITE_HAS_RETURNING:
+            cursor.execute(CHART_BY_BIRTH_KEY_SQL, key)
+        chart_id = cursor.fetchone()['id']
+        _index_charts(cursor, [(chart_id, chart_data)])
+        _store_profiles(cursor, [(chart_id, chart_data)], self.storage_format)
+        cursor.execute('DELETE FROM reading_cache WHERE chart_id = ?', (chart_id,))
+        return chart_id
+    
+    def save_charts_many(self, charts, batch_size: int = 5000) -> Dict[str, List[int]]:
+        """
+        Save many charts with one transaction per batch.
+        
+        Args:
+            charts: Iterable of dicts with name, birth_date, birth_time, timezone,
+                latitude, longitude, chart_data and optional house_system
+            batch_size: Charts written per transaction
+        
+        Returns:
+            Dict: {'inserted': [ids], 'updated': [ids]}; repeats of the same
+            birth data within one batch collapse onto a single row
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive")
+        
+        result = {'inserted': [], 'updated': []}
+        batch = []
+        for chart in charts:
+            batch.append(chart)
+            if len(batch) >= batch_size:
+                self._save_chart_batch(batch, result)
+                batch = []
+        if batch:
+            self._save_chart_batch(batch, result)
+        
+        logger.info(f"Bulk saved charts: {len(result['inserted'])} inserted, "
+                    f"{len(result['updated'])} updated")
+        return result
+    
+    def _save_chart_batch(self, charts: List[Dict], result: Dict[str, List[int]]):
+        """Upsert one batch of charts inside a single write transaction"""
+        rows = []
+        for chart in charts:
+            try:
+                rows.append((chart['name'], chart['birth_date'], chart['birth_time'],
+                             chart['timezone'], chart['latitude'], chart['longitude'],
+                             chart.get('house_system', 'P'),
+                             *encode_data(chart['chart_data'], self.storage_format)))
+            except KeyError as e:
+                raise ValueError(f"Chart is missing required field {e}")
+        
+        connection = self.connection
+        cursor = connection.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            # Ids above the current maximum are new rows (we hold the write lock)
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM charts')
+            last_id = cursor.fetchone()[0]
+            
+            # The unique birth-key index decides insert or update, so repeats
+            # within the batch land on one row with the last chart data
+            cursor.executemany(CHART_UPSERT_SQL, rows)
+            
+            # Resolve every id in one join through the birth-key index; sqlite3
+            # drops rows RETURNING'd by executemany, so this serves all versions
+            cursor.execute(CHART_BATCH_KEYS_SQL)
+            cursor.execute('DELETE FROM temp.chart_batch_keys')
+            cursor.executemany(
+                f"INSERT INTO temp.chart_batch_keys (seq, {', '.join(BIRTH_KEY_COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(seq, *row[:6]) for seq, row in enumerate(rows)])
+            saved = {}
+            for seq, chart_id in cursor.execute(CHART_BATCH_IDS_SQL).fetchall():
+                saved[chart_id] = charts[seq]['chart_data']
+            cursor.execute('DELETE FROM temp.chart_batch_keys')
+            
+            inserted = [chart_id for chart_id in saved if chart_id > last_id]
+            updated = [chart_id for chart_id in saved if chart_id <= last_id]
+            cursor.executemany('DELETE FROM reading_cache WHERE chart_id = ?',
+                               [(chart_id,) for chart_id in updated])
+            _index_charts(cursor, saved.items())
+            _store_profiles(cursor, saved.items(), self.storage_format)
+            
+            connection.commit()
+            result['inserted'].extend(inserted)
+            result['updated'].extend(updated)
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk save charts: {e}")
+            connection.rollback()
+            raise
+    
     def get_chart(self, chart_id: int) -> Optional[Dict]:
         """Retrieve a chart by ID"""
         try:
@@ -169,51 +1168,374 @@ class AstrologyDatabase:
             row = cursor.fetchone()
             
             if row:
-                chart_data = dict(row)
-                chart_data['chart_data'] = json.loads(chart_data['chart_data'])
-                return chart_data
+                return _decode_row(row, 'chart_data')
             return None
             
         except Exception as e:
             logger.error(f"Failed to retrieve chart {chart_id}: {e}")
             return None
     
+    def get_chart_id(self, name: str, birth_date: str, birth_time: str, timezone: str,
+                     latitude: float, longitude: float) -> Optional[int]:
+        """Id of the chart saved under a birth key (None if it is not saved)"""
+        try:
+            row = self.connection.execute(
+                CHART_BY_BIRTH_KEY_SQL, (name, birth_date, birth_time, timezone, latitude, longitude)
+            ).fetchone()
+            return row['id'] if row else None
+            
+        except Exception as e:
+            logger.error(f"Failed to look up chart for {name}: {e}")
+            return None
+    
     def get_charts_by_name(self, name: str) -> List[Dict]:
-        """Retrieve all charts for a given name"""
+        """Retrieve all charts whose name contains words starting with the given text"""
         try:
             cursor = self.connection.cursor()
-            cursor.execute('SELECT * FROM charts WHERE name LIKE ?', (f'%{name}%',))
+            if self.full_text_search:
+                query = fts_prefix_query(name)
+                if not query:
+                    return []
+                cursor.execute('''
+                    SELECT c.* FROM charts_fts
+                    JOIN charts c ON c.id = charts_fts.rowid
+                    WHERE charts_fts MATCH ?
+                    ORDER BY bm25(charts_fts, 10.0, 1.0)
+                ''', (f'name : ({query})',))
+            else:
+                condition, params = like_prefix_condition(name, ['name'])
+                if not condition:
+                    return []
+                cursor.execute(f'SELECT * FROM charts WHERE {condition} ORDER BY name, id', params)
             rows = cursor.fetchall()
             
-            charts = []
-            for row in rows:
-                chart_data = dict(row)
-                chart_data['chart_data'] = json.loads(chart_data['chart_data'])
-                charts.append(chart_data)
-            
-            return charts
+            return [_decode_row(row, 'chart_data') for row in rows]
             
         except Exception as e:
             logger.error(f"Failed to retrieve charts for {name}: {e}")
             return []
     
+    def search_charts(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Ranked prefix search over chart names and notes.
+        
+        Args:
+            query: Free text; every word must match the start of a word
+            limit: Maximum number of results
+        
+        Returns:
+            List[Dict]: Summary rows (without chart_data) with a 'rank' score,
+            best matches first (without FTS5 the rank only puts name matches
+            before notes matches)
+        """
+        try:
+            cursor = self.connection.cursor()
+            if not self.full_text_search:
+                # Unranked: name matches first, then notes-only matches
+                condition, params = like_prefix_condition(query, ['name', 'notes'])
+                if not condition:
+                    return []
+                name_condition, name_params = like_prefix_condition(query, ['name'])
+                cursor.execute(f'''
+                    SELECT {', '.join(CHART_SUMMARY_COLUMNS)},
+                           CASE WHEN {name_condition} THEN 0.0 ELSE 1.0 END AS rank
+                    FROM charts
+                    WHERE {condition}
+                    ORDER BY rank, name, id
+                    LIMIT ?
+                ''', (*name_params, *params, limit))
+                return [dict(row) for row in cursor.fetchall()]
+            
+            match = fts_prefix_query(query)
+            if not match:
+                return []
+            
+            cursor.execute(f'''
+                SELECT {', '.join('c.' + column for column in CHART_SUMMARY_COLUMNS)},
+                       bm25(charts_fts, 10.0, 1.0) AS rank
+                FROM charts_fts
+                JOIN charts c ON c.id = charts_fts.rowid
+                WHERE charts_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ''', (match, limit))
+            return [dict(row) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            logger.error(f"Failed to search charts for {query!r}: {e}")
+            return []
+    
+    def update_chart_notes(self, chart_id: int, notes: str) -> bool:
+        """Set the free-text notes of a chart (indexed for search)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('UPDATE charts SET notes = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                           (notes, chart_id))
+            self.connection.commit()
+            return cursor.rowcount > 0
+            
+        except Exception as e:
+            logger.error(f"Failed to update notes for chart {chart_id}: {e}")
+            self.connection.rollback()
+            raise
+    
     def get_all_charts(self) -> List[Dict]:
-        """Retrieve all charts from database"""
+        """Retrieve all charts from database (use iter_charts for large stores)"""
         try:
             cursor = self.connection.cursor()
             cursor.execute('SELECT * FROM charts ORDER BY created_at DESC')
             rows = cursor.fetchall()
             
-            charts = []
+            return [_decode_row(row, 'chart_data') for row in rows]
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve all charts: {e}")
+            return []
+    
+    def get_chart_page(self, limit: int = 100, after: tuple = None, order_by: str = 'id',
+                       descending: bool = False, name_prefix: str = None,
+                       birth_date_from: str = None, birth_date_to: str = None,
+                       include_data: bool = False) -> Dict:
+        """
+        Fetch one keyset-paginated page of charts.
+        
+        Args:
+            limit: Maximum charts in the page
+            after: Cursor returned as next_cursor by the previous page
+            order_by: One of CHART_ORDER_COLUMNS
+            descending: Newest/largest first
+            name_prefix: Only names starting with this text
+            birth_date_from, birth_date_to: Inclusive birth date bounds (YYYY-MM-DD)
+            include_data: Fetch chart_data with the page (still decoded lazily);
+                otherwise it is loaded per chart on first access
+        
+        Returns:
+            Dict: {'charts': [ChartRecord], 'next_cursor': tuple or None}
+        """
+        if order_by not in CHART_ORDER_COLUMNS:
+            raise ValueError(f"Cannot order charts by '{order_by}'. Use one of {CHART_ORDER_COLUMNS}")
+        if limit < 1:
+            raise ValueError("Page limit must be positive")
+        
+        conditions = []
+        params = []
+        if name_prefix:
+            # Range on the indexed name column instead of LIKE
+            conditions.append('name >= ? AND name < ?')
+            params.extend([name_prefix, name_prefix + '\U0010ffff'])
+        if birth_date_from:
+            conditions.append('birth_date >= ?')
+            params.append(birth_date_from)
+        if birth_date_to:
+            conditions.append('birth_date <= ?')
+            params.append(birth_date_to)
+        if after is not None:
+            operator = '<' if descending else '>'
+            if order_by == 'id':
+                conditions.append(f'id {operator} ?')
+                params.append(after[-1])
+            else:
+                conditions.append(f'({order_by}, id) {operator} (?, ?)')
+                params.extend(after)
+        
+        columns = list(CHART_SUMMARY_COLUMNS)
+        if include_data:
+            columns += ['chart_data', 'chart_data_format']
+        direction = 'DESC' if descending else 'ASC'
+        order = 'id' if order_by == 'id' else f'{order_by} {direction}, id'
+        query = f'''
+            SELECT {', '.join(columns)} FROM charts
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY {order} {direction}
+            LIMIT ?
+        '''
+        params.append(limit)
+        
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        charts = []
+        for row in rows:
+            fields = {column: row[column] for column in CHART_SUMMARY_COLUMNS}
+            if include_data:
+                payload = (row['chart_data'], row['chart_data_format'])
+                loader = lambda payload=payload: decode_data(*payload)
+            else:
+                loader = lambda chart_id=row['id']: self._load_chart_data(chart_id)
+            charts.append(ChartRecord(fields, loader))
+        
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = (last['id'],) if order_by == 'id' else (last[order_by], last['id'])
+        return {'charts': charts, 'next_cursor': next_cursor}
+    
+    def iter_charts(self, page_size: int = 500, **filters):
+        """
+        Iterate over charts page by page with flat memory use.
+        
+        Accepts the ordering and filter arguments of get_chart_page. Each page
+        is a separate short query, so no read transaction stays open between pages.
+        
+        Yields:
+            ChartRecord: Summary row; chart_data is loaded when accessed
+        """
+        after = None
+        while True:
+            page = self.get_chart_page(limit=page_size, after=after, **filters)
+            yield from page['charts']
+            after = page['next_cursor']
+            if after is None:
+                return
+    
+    def _load_chart_data(self, chart_id: int):
+        """Fetch and decode a single chart's chart_data"""
+        row = self.connection.execute(
+            'SELECT chart_data, chart_data_format FROM charts WHERE id = ?', (chart_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Chart {chart_id} no longer exists")
+        return decode_data(row['chart_data'], row['chart_data_format'])
+    
+    def get_compatibility_profile(self, chart_id: int) -> Optional[CompatibilityProfile]:
+        """Stored compatibility profile of a chart (None if missing or incomplete)"""
+        try:
+            row = self.connection.execute('''
+                SELECT chart_id, profile_version, profile_data, profile_data_format
+                FROM compatibility_profiles WHERE chart_id = ?
+            ''', (chart_id,)).fetchone()
+            return self._decode_profile(row) if row else None
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve compatibility profile {chart_id}: {e}")
+            return None
+    
+    def iter_compatibility_profiles(self, page_size: int = 500):
+        """
+        Iterate over stored compatibility profiles in chart id order.
+        
+        Yields:
+            tuple: (chart id, chart name, CompatibilityProfile)
+        """
+        last_id = 0
+        while True:
+            rows = self.connection.execute('''
+                SELECT p.chart_id, c.name, p.profile_version, p.profile_data, p.profile_data_format
+                FROM compatibility_profiles p JOIN charts c ON c.id = p.chart_id
+                WHERE p.chart_id > ? ORDER BY p.chart_id LIMIT ?
+            ''', (last_id, page_size)).fetchall()
+            if not rows:
+                return
             for row in rows:
-                chart_data = dict(row)
-                chart_data['chart_data'] = json.loads(chart_data['chart_data'])
-                charts.append(chart_data)
+                yield row['chart_id'], row['name'], self._decode_profile(row)
+            last_id = rows[-1]['chart_id']
+    
+    def _decode_profile(self, row) -> CompatibilityProfile:
+        """Decode a stored profile, rebuilding it from the chart if its version is stale"""
+        if row['profile_version'] != PROFILE_VERSION:
+            return CompatibilityProfile.from_chart(self._load_chart_data(row['chart_id']))
+        return CompatibilityProfile.from_dict(decode_data(row['profile_data'], row['profile_data_format']))
+    
+    def export_charts_jsonl(self, filepath: str, **filters) -> int:
+        """
+        Stream charts to a JSON Lines file without loading the whole store.
+        
+        Returns:
+            int: Number of charts written
+        """
+        count = 0
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for chart in self.iter_charts(include_data=True, **filters):
+                f.write(json.dumps(chart.to_dict(), default=str) + '\n')
+                count += 1
+        logger.info(f"Exported {count} charts to {filepath}")
+        return count
+    
+    def find_charts_by_placement(self, body: str, sign: str = None, house: int = None,
+                                 retrograde: bool = None, limit: int = None) -> List[Dict]:
+        """
+        Find charts by a body's placement without parsing chart_data.
+        
+        Args:
+            body: Body name (e.g. 'venus')
+            sign: Zodiac sign to match (e.g. 'Scorpio')
+            house: House number to match
+            retrograde: Match only retrograde (True) or direct (False) placements
+            limit: Maximum number of rows
+        
+        Returns:
+            List[Dict]: id, name, birth_date plus the matched position fields
+        """
+        try:
+            conditions = ['p.body = ?']
+            params = [body]
+            if sign is not None:
+                conditions.append('p.sign = ?')
+                params.append(sign)
+            if house is not None:
+                conditions.append('p.house = ?')
+                params.append(house)
+            if retrograde is not None:
+                conditions.append('p.retrograde = ?')
+                params.append(int(retrograde))
+            
+            query = f'''
+                SELECT c.id, c.name, c.birth_date, p.body, p.longitude, p.sign,
+                       p.degree, p.house, p.retrograde, p.speed
+                FROM chart_positions p
+                JOIN charts c ON c.id = p.chart_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY c.id
+            '''
+            if limit is not None:
+                query += ' LIMIT ?'
+                params.append(limit)
+            
+            cursor = self.connection.cursor()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
             
-            return charts
+        except Exception as e:
+            logger.error(f"Failed to find charts with {body} placement: {e}")
+            return []
+    
+    def find_charts_by_aspect(self, body1: str, body2: str, aspect: str = None,
+                              max_orb: float = None, limit: int = None) -> List[Dict]:
+        """
+        Find charts with an aspect between two bodies (in either order).
+        
+        Returns:
+            List[Dict]: id, name, birth_date plus the aspect fields, tightest first
+        """
+        try:
+            first, second = sorted((body1, body2))
+            conditions = ['a.body1 = ?', 'a.body2 = ?']
+            params = [first, second]
+            if aspect is not None:
+                conditions.append('a.aspect = ?')
+                params.append(aspect)
+            if max_orb is not None:
+                conditions.append('a.orb <= ?')
+                params.append(max_orb)
+            
+            query = f'''
+                SELECT c.id, c.name, c.birth_date, a.body1, a.body2, a.aspect, a.orb, a.strength
+                FROM chart_aspects a
+                JOIN charts c ON c.id = a.chart_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY a.orb
+            '''
+            if limit is not None:
+                query += ' LIMIT ?'
+                params.append(limit)
+            
+            cursor = self.connection.cursor()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
             
         except Exception as e:
-            logger.error(f"Failed to retrieve all charts: {e}")
+            logger.error(f"Failed to find charts with {body1}-{body2} aspect: {e}")
             return []
     
     def save_reading(self, chart_id: int, reading_type: str, target_date: str, 
@@ -221,13 +1543,8 @@ class AstrologyDatabase:
         """Save a reading to the database"""
         try:
             cursor = self.connection.cursor()
+            reading_id = self._write_reading(cursor, chart_id, reading_type, target_date, reading_data)
             
-            cursor.execute('''
-                INSERT INTO readings (chart_id, reading_type, target_date, reading_data)
-                VALUES (?, ?, ?, ?)
-            ''', (chart_id, reading_type, target_date, json.dumps(reading_data)))
-            
-            reading_id = cursor.lastrowid
             self.connection.commit()
             logger.info(f"Saved reading: {reading_type} for chart {chart_id}")
             
@@ -238,6 +1555,15 @@ class AstrologyDatabase:
             self.connection.rollback()
             raise
     
+    def _write_reading(self, cursor, chart_id: int, reading_type: str, target_date: str,
+                       reading_data: Dict) -> int:
+        """Insert one reading on cursor without committing"""
+        cursor.execute('''
+            INSERT INTO readings (chart_id, reading_type, target_date, reading_data, reading_data_format)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (chart_id, reading_type, target_date, *encode_data(reading_data, self.storage_format)))
+        return cursor.lastrowid
+    
     def get_readings_for_chart(self, chart_id: int) -> List[Dict]:
         """Retrieve all readings for a specific chart"""
         try:
@@ -248,32 +1574,145 @@ class AstrologyDatabase:
                 ORDER BY created_at DESC
             ''', (chart_id,))
             
-            rows = cursor.fetchall()
-            readings = []
-            
-            for row in rows:
-                reading_data = dict(row)
-                reading_data['reading_data'] = json.loads(reading_data['reading_data'])
-                readings.append(reading_data)
-            
-            return readings
+            return [_decode_row(row, 'reading_data') for row in cursor.fetchall()]
             
         except Exception as e:
             logger.error(f"Failed to retrieve readings for chart {chart_id}: {e}")
             return []
     
+    def get_cached_reading(self, chart_id: int, reading_type: str, target_date: str,
+                           engine_version: str) -> Optional[Dict]:
+        """
+        Look up a generated reading in the cache.
+        
+        Returns:
+            Dict: The cached reading, or None when missing or expired
+        """
+        try:
+            key = (chart_id, reading_type, target_date, engine_version)
+            now = time.time()
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                SELECT reading_data, reading_data_format, accessed_at FROM reading_cache
+                WHERE chart_id = ? AND reading_type = ? AND target_date = ? AND engine_version = ?
+                  AND expires_at > ?
+            ''', (*key, now))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            
+            # Hits stay read-only: LRU timestamps are written with the next cache write
+            if now - row['accessed_at'] > READING_CACHE_TOUCH_INTERVAL:
+                with self._cache_lock:
+                    self._cache_touches[key] = now
+            
+            return decode_data(row['reading_data'], row['reading_data_format'])
+            
+        except Exception as e:
+            logger.error(f"Failed to read cached {reading_type} reading for chart {chart_id}: {e}")
+            return None
+    
+    def cache_reading(self, chart_id: int, reading_type: str, target_date: str,
+                      engine_version: str, reading_data: Dict, ttl: float = None) -> bool:
+        """
+        Store a generated reading in the cache, replacing any previous entry.
+        
+        Args:
+            ttl: Seconds until the entry expires (default READING_CACHE_TTL)
+        
+        Returns:
+            bool: Whether the reading was cached
+        """
+        try:
+            now = time.time()
+            expires_at = now + (READING_CACHE_TTL if ttl is None else ttl)
+            cursor = self.connection.cursor()
+            self._flush_cache_touches(cursor)
+            cursor.execute('''
+                INSERT OR REPLACE INTO reading_cache (chart_id, reading_type, target_date, engine_version,
+                                                      reading_data, reading_data_format,
+                                                      created_at, accessed_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (chart_id, reading_type, target_date, engine_version,
+                  *encode_data(reading_data, self.storage_format), now, now, expires_at))
+            self.connection.commit()
+            
+            with self._cache_lock:
+                prune = self._cache_writes % READING_CACHE_PRUNE_INTERVAL == 0
+                self._cache_writes += 1
+            if prune:
+                self.prune_reading_cache()
+            return True
+            
+        except Exception as e:
+            # A reading that cannot be cached is still a valid reading
+            logger.error(f"Failed to cache {reading_type} reading for chart {chart_id}: {e}")
+            self.connection.rollback()
+            return False
+    
+    def prune_reading_cache(self, max_entries: int = None) -> int:
+        """
+        Drop expired cache entries, then the least recently used beyond max_entries.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        max_entries = self.reading_cache_max_entries if max_entries is None else max_entries
+        try:
+            cursor = self.connection.cursor()
+            self._flush_cache_touches(cursor)
+            cursor.execute('DELETE FROM reading_cache WHERE expires_at <= ?', (time.time(),))
+            removed = cursor.rowcount
+            cursor.execute('''
+                DELETE FROM reading_cache WHERE rowid IN (
+                    SELECT rowid FROM reading_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            removed += cursor.rowcount
+            self.connection.commit()
+            if removed:
+                logger.info(f"Pruned {removed} reading cache entries")
+            return removed
+            
+        except Exception as e:
+            logger.error(f"Failed to prune reading cache: {e}")
+            self.connection.rollback()
+            raise
+    
+    def _flush_cache_touches(self, cursor):
+        """Write the access times of recent cache hits on cursor without committing"""
+        # At most one pending touch per cache entry, so this stays bounded
+        with self._cache_lock:
+            touches, self._cache_touches = self._cache_touches, {}
+        cursor.executemany('''
+            UPDATE reading_cache SET accessed_at = MAX(accessed_at, ?)
+            WHERE chart_id = ? AND reading_type = ? AND target_date = ? AND engine_version = ?
+        ''', [(accessed_at, *key) for key, accessed_at in touches.items()])
+    
+    def clear_reading_cache(self, chart_id: int = None) -> int:
+        """Remove cached readings for one chart, or all of them"""
+        try:
+            cursor = self.connection.cursor()
+            if chart_id is None:
+                cursor.execute('DELETE FROM reading_cache')
+            else:
+                cursor.execute('DELETE FROM reading_cache WHERE chart_id = ?', (chart_id,))
+            self.connection.commit()
+            return cursor.rowcount
+            
+        except Exception as e:
+            logger.error(f"Failed to clear reading cache: {e}")
+            self.connection.rollback()
+            raise
+    
     def save_compatibility_analysis(self, chart1_id: int, chart2_id: int, 
                                    compatibility_data: Dict) -> int:
         """Save compatibility analysis to database"""
         try:
             cursor = self.connection.cursor()
+            analysis_id = self._write_compatibility_analysis(cursor, chart1_id, chart2_id,
+                                                             compatibility_data)
             
-            cursor.execute('''
-                INSERT INTO compatibility_analyses (chart1_id, chart2_id, compatibility_data)
-                VALUES (?, ?, ?)
-            ''', (chart1_id, chart2_id, json.dumps(compatibility_data)))
-            
-            analysis_id = cursor.lastrowid
             self.connection.commit()
             logger.info(f"Saved compatibility analysis for charts {chart1_id} and {chart2_id}")
             
@@ -284,6 +1723,16 @@ class AstrologyDatabase:
             self.connection.rollback()
             raise
     
+    def _write_compatibility_analysis(self, cursor, chart1_id: int, chart2_id: int,
+                                      compatibility_data: Dict) -> int:
+        """Insert one compatibility analysis on cursor without committing"""
+        cursor.execute('''
+            INSERT INTO compatibility_analyses (chart1_id, chart2_id, compatibility_data,
+                                                compatibility_data_format)
+            VALUES (?, ?, ?, ?)
+        ''', (chart1_id, chart2_id, *encode_data(compatibility_data, self.storage_format)))
+        return cursor.lastrowid
+    
     def get_compatibility_analyses(self) -> List[Dict]:
         """Retrieve all compatibility analyses"""
         try:
@@ -296,15 +1745,7 @@ class AstrologyDatabase:
                 ORDER BY ca.created_at DESC
             ''')
             
-            rows = cursor.fetchall()
-            analyses = []
-            
-            for row in rows:
-                analysis_data = dict(row)
-                analysis_data['compatibility_data'] = json.loads(analysis_data['compatibility_data'])
-                analyses.append(analysis_data)
-            
-            return analyses
+            return [_decode_row(row, 'compatibility_data') for row in cursor.fetchall()]
             
         except Exception as e:
             logger.error(f"Failed to retrieve compatibility analyses: {e}")
@@ -314,11 +1755,7 @@ class AstrologyDatabase:
         """Save user preference"""
         try:
             cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO user_preferences (key, value, updated_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-            ''', (key, value))
+            self._write_preference(cursor, key, value)
             
             self.connection.commit()
             logger.info(f"Saved preference: {key} = {value}")
@@ -328,6 +1765,13 @@ class AstrologyDatabase:
             self.connection.rollback()
             raise
     
+    def _write_preference(self, cursor, key: str, value: str):
+        """Upsert one preference on cursor without committing"""
+        cursor.execute('''
+            INSERT OR REPLACE INTO user_preferences (key, value, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        ''', (key, value))
+    
     def get_preference(self, key: str, default: str = None) -> Optional[str]:
         """Get user preference"""
         try:
@@ -351,6 +1795,11 @@ class AstrologyDatabase:
             cursor.execute('DELETE FROM compatibility_analyses WHERE chart1_id = ? OR chart2_id = ?', 
                           (chart_id, chart_id))
             
+            cursor.execute('DELETE FROM chart_positions WHERE chart_id = ?', (chart_id,))
+            cursor.execute('DELETE FROM chart_aspects WHERE chart_id = ?', (chart_id,))
+            cursor.execute('DELETE FROM reading_cache WHERE chart_id = ?', (chart_id,))
+            cursor.execute('DELETE FROM compatibility_profiles WHERE chart_id = ?', (chart_id,))
+            
             # Delete the chart
             cursor.execute('DELETE FROM charts WHERE id = ?', (chart_id,))
             
@@ -364,7 +1813,7 @@ class AstrologyDatabase:
             return False
     
     def get_database_stats(self) -> Dict:
-        """Get database statistics"""
+        """Get database statistics (row counts, file size and query timings)"""
         try:
             cursor = self.connection.cursor()
             
@@ -382,20 +1831,91 @@ class AstrologyDatabase:
             cursor.execute('SELECT COUNT(*) as count FROM compatibility_analyses')
             stats['compatibility_analyses_count'] = cursor.fetchone()['count']
             
+            # Count cached readings
+            cursor.execute('SELECT COUNT(*) as count FROM reading_cache')
+            stats['reading_cache_count'] = cursor.fetchone()['count']
+            
             # Database size
             stats['database_size_mb'] = os.path.getsize(self.db_path) / (1024 * 1024)
             
+            # Per-method and per-statement timings collected on this instance
+            stats['queries'] = self.query_stats.snapshot()
+            
             return stats
             
         except Exception as e:
             logger.error(f"Failed to get database stats: {e}")
             return {}
     
+    def repack_database(self, storage_format: str = None, batch_size: int = 500,
+                        vacuum: bool = True) -> Dict[str, int]:
+        """
+        Re-encode every stored payload into one storage format.
+        
+        Rows are converted in keyset batches (one transaction each), then the
+        file is vacuumed so the space freed by compression is returned.
+        
+        Args:
+            storage_format: Target format (default: this database's storage_format)
+            batch_size: Rows converted per transaction
+            vacuum: Run VACUUM afterwards
+        
+        Returns:
+            Dict: Number of rows converted per table
+        """
+        storage_format = storage_format or self.storage_format
+        encode_data({}, storage_format)
+        connection = self.connection
+        converted = {}
+        
+        try:
+            size_before = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+            for table, column, format_column in PAYLOAD_COLUMNS:
+                converted[table] = 0
+                last_id = 0
+                while True:
+                    cursor = connection.cursor()
+                    cursor.execute(f'''
+                        SELECT id, {column}, {format_column} FROM {table}
+                        WHERE id > ? AND {format_column} != ?
+                        ORDER BY id LIMIT ?
+                    ''', (last_id, storage_format, batch_size))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    
+                    updates = [(*encode_data(decode_data(row[1], row[2]), storage_format), row[0])
+                               for row in rows]
+                    cursor.executemany(f'''
+                        UPDATE {table} SET {column} = ?, {format_column} = ? WHERE id = ?
+                    ''', updates)
+                    connection.commit()
+                    converted[table] += len(rows)
+                    last_id = rows[-1][0]
+            
+            if vacuum:
+                connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                connection.execute('VACUUM')
+            
+            size_after = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+            logger.info(f"Repacked database to {storage_format}: {converted} "
+                        f"({size_before / 1048576:.1f} MB -> {size_after / 1048576:.1f} MB)")
+            return converted
+            
+        except Exception as e:
+            logger.error(f"Failed to repack database: {e}")
+            connection.rollback()
+            raise
+    
     def backup_database(self, backup_path: str) -> bool:
         """Create a backup of the database"""
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            # Online backup includes pages still held in the WAL file
+            target = sqlite3.connect(backup_path)
+            try:
+                self.connection.backup(target)
+            finally:
+                target.close()
             logger.info(f"Database backed up to {backup_path}")
             return True
             
@@ -403,11 +1923,32 @@ class AstrologyDatabase:
             logger.error(f"Failed to backup database: {e}")
             return False
     
+    def write_behind(self, **options) -> 'WriteBehindQueue':
+        """
+        Start a background writer for this database.
+        
+        Options are passed to WriteBehindQueue. Writers still running when the
+        database is closed are flushed and shut down first.
+        """
+        writer = WriteBehindQueue(self, **options)
+        self._writers.append(writer)
+        return writer
+    
     def close(self):
         """Close database connection"""
         try:
-            if self.connection:
-                self.connection.close()
+            for writer in self._writers:
+                writer.shutdown()
+            self._writers = []
+            if self.pool and self._cache_touches:
+                try:
+                    self._flush_cache_touches(self.connection.cursor())
+                    self.connection.commit()
+                except Exception as e:
+                    logger.error(f"Failed to record reading cache access times: {e}")
+            if self.pool:
+                self.pool.close_all()
+                self.pool = None
                 logger.info("Database connection closed")
         except Exception as e:
             logger.error(f"Error closing database connection: {e}")
@@ -420,19 +1961,219 @@ class AstrologyDatabase:
         """Context manager exit"""
         self.close()
 
+# Queue markers handled by the writer thread itself
+_FLUSH = 'flush'
+_STOP = 'stop'
+
+class WriteBehindQueue:
+    """
+    Persists writes on a background thread so callers never wait on a commit.
+    
+    Writes are queued as (operation, args, future); the writer drains the
+    queue and commits everything it collected in one transaction, giving each
+    write its own savepoint so a bad row fails alone. File databases only:
+    an in-memory database has a single connection shared with callers, whose
+    statements would land in the writer's open transaction.
+    """
+    
+    def __init__(self, db: AstrologyDatabase, max_pending: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 0.05, on_error=None):
+        """
+        Args:
+            db: Database to write to (the writer uses its own pooled connection)
+            max_pending: Queue bound; enqueueing blocks while the queue is full
+            batch_size: Most writes committed in one transaction
+            flush_interval: Seconds to keep collecting writes before committing
+            on_error: Callback on_error(exception, operation, args) for failed writes
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive")
+        if db.pool is None or db.pool.in_memory:
+            raise ValueError("Write-behind needs a file database")
+        
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='astrology-db-writer', daemon=True)
+        self._thread.start()
+    
+    def _submit(self, operation: str, args: tuple) -> Future:
+        """Queue a write and return the future that receives its result"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write-behind queue has been shut down")
+            self._queue.put((operation, args, future))
+        return future
+    
+    def save_chart(self, name: str, birth_date: str, birth_time: str,
+                   timezone: str, latitude: float, longitude: float,
+                   house_system: str, chart_data: Dict) -> Future:
+        """Queue AstrologyDatabase.save_chart; the future yields the chart id"""
+        return self._submit('chart', (name, birth_date, birth_time, timezone,
+                                      latitude, longitude, house_system, chart_data))
+    
+    def save_reading(self, chart_id: int, reading_type: str, target_date: str,
+                     reading_data: Dict) -> Future:
+        """Queue AstrologyDatabase.save_reading; the future yields the reading id"""
+        return self._submit('reading', (chart_id, reading_type, target_date, reading_data))
+    
+    def save_compatibility_analysis(self, chart1_id: int, chart2_id: int,
+                                    compatibility_data: Dict) -> Future:
+        """Queue AstrologyDatabase.save_compatibility_analysis"""
+        return self._submit('compatibility_analysis', (chart1_id, chart2_id, compatibility_data))
+    
+    def save_preference(self, key: str, value: str) -> Future:
+        """Queue AstrologyDatabase.save_preference"""
+        return self._submit('preference', (key, value))
+    
+    def pending(self) -> int:
+        """Approximate number of queued, uncommitted writes"""
+        return self._queue.qsize()
+    
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every write queued before this call is committed.
+        
+        Returns:
+            bool: False if the timeout expired first
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                return not self._thread.is_alive()
+            self._queue.put((_FLUSH, (), future))
+        try:
+            future.result(timeout)
+            return True
+        except FutureTimeoutError:
+            return False
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting writes, commit what is queued and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP, (), Future()))
+        if wait:
+            self._thread.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+    
+    def _run(self):
+        """Writer thread: collect queued writes and commit them in groups"""
+        stopping = False
+        while not stopping:
+            group = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(group) < self.batch_size and group[-1][0] not in (_FLUSH, _STOP):
+                remaining = deadline - time.monotonic()
+                try:
+                    group.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self._write_group([item for item in group if item[0] not in (_FLUSH, _STOP)])
+            for operation, _, future in group:
+                if operation == _FLUSH:
+                    future.set_result(True)
+                stopping = stopping or operation == _STOP
+    
+    def _write_group(self, group: list):
+        """Apply a group of writes in one transaction and resolve their futures"""
+        if not group:
+            return
+        
+        writers = {
+            'chart': self.db._write_chart,
+            'reading': self.db._write_reading,
+            'compatibility_analysis': self.db._write_compatibility_analysis,
+            'preference': self.db._write_preference,
+        }
+        outcomes = []
+        try:
+            connection = self.db.connection
+            cursor = connection.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            for operation, args, future in group:
+                cursor.execute('SAVEPOINT write_behind')
+                try:
+                    outcomes.append((True, writers[operation](cursor, *args)))
+                    cursor.execute('RELEASE write_behind')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO write_behind')
+                    cursor.execute('RELEASE write_behind')
+                    outcomes.append((False, e))
+            connection.commit()
+            
+        except Exception as e:
+            logger.error(f"Write-behind transaction of {len(group)} writes failed: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+            outcomes = [(False, e)] * len(group)
+        
+        for (operation, args, future), (ok, value) in zip(group, outcomes):
+            if ok:
+                future.set_result(value)
+                continue
+            future.set_exception(value)
+            logger.error(f"Write-behind {operation} failed: {value}")
+            if self.on_error is not None:
+                try:
+                    self.on_error(value, operation, args)
+                except Exception as e:
+                    logger.error(f"Write-behind error callback failed: {e}")
+
 # Global database instance
 _db_instance = None
+_db_lock = threading.Lock()
 
 def get_database() -> AstrologyDatabase:
-    """Get global database instance"""
+    """Get global database instance (safe to share across threads)"""
     global _db_instance
-    if _db_instance is None:
-        _db_instance = AstrologyDatabase()
-    return _db_instance
+    with _db_lock:
+        if _db_instance is None:
+            _db_instance = AstrologyDatabase()
+        return _db_instance
 
 def close_database():
     """Close global database instance"""
     global _db_instance
-    if _db_instance:
-        _db_instance.close()
-        _db_instance = None
+    with _db_lock:
+        if _db_instance:
+            _db_instance.close()
+            _db_instance = None
+
+def main():
+    """Database maintenance commands"""
+    parser = argparse.ArgumentParser(description='Astrology database maintenance')
+    parser.add_argument('command', choices=['repack', 'stats'], help='Maintenance command to run')
+    parser.add_argument('--db', type=str, help='Database file (default: astrology_data.db)')
+    parser.add_argument('--format', type=str, default=DEFAULT_STORAGE_FORMAT,
+                        choices=[STORAGE_FORMAT_ZLIB, STORAGE_FORMAT_JSON],
+                        help='Storage format for repack')
+    parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM after repacking')
+    args = parser.parse_args()
+    
+    with AstrologyDatabase(args.db, storage_format=args.format) as db:
+        if args.command == 'repack':
+            converted = db.repack_database(vacuum=not args.no_vacuum)
+            for table, count in converted.items():
+                print(f"{table}: {count} rows repacked")
+        stats = db.get_database_stats()
+        print(f"Charts: {stats.get('charts_count', 0)}, size: {stats.get('database_size_mb', 0):.2f} MB")
+
+if __name__ == '__main__':
+    main()
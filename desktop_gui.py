@@ -9,6 +9,8 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import json
+import logging
+import sqlite3
 import pandas as pd
 from datetime import datetime
 import sys
@@ -20,15 +22,20 @@ from typing import Dict, Any, Optional
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from natal_chart_enhanced import calculate_complete_chart
+from aspects import cross_aspects
+from orb_profiles import ASPECT_NAMES, get_orb_table
 from astrology_readings import AstrologyReadings
+from database import get_database
 from cli import save_chart_json, save_chart_csv, save_chart_text
 from theme import DylanCustomTheme
 
+logger = logging.getLogger(__name__)
+
 class CompatibilityCalculator:
     """Handles synastry compatibility calculations between two charts"""
     
     @staticmethod
-    def calculate_synastry(chart1: Dict, chart2: Dict) -> Dict:
+    def calculate_synastry(chart1: Dict, chart2: Dict, orb_profile: str = 'wide') -> Dict:
         """Calculate synastry aspects between two charts"""
         synastry = {
             'aspects': [],
@@ -41,45 +48,40 @@ class CompatibilityCalculator:
         bodies1 = chart1.get('bodies', {})
         bodies2 = chart2.get('bodies', {})
         
-        # Define aspect orbs and meanings
+        # Define aspect weights and meanings (orbs come from the compiled orb table)
         aspects_config = {
-            'conjunction': {'orb': 8, 'weight': 3, 'harmony': 'neutral'},
-            'opposition': {'orb': 8, 'weight': 2, 'harmony': 'challenging'},
-            'trine': {'orb': 8, 'weight': 3, 'harmony': 'harmonious'},
-            'square': {'orb': 8, 'weight': 2, 'harmony': 'challenging'},
-            'sextile': {'orb': 6, 'weight': 2, 'harmony': 'harmonious'},
-            'quincunx': {'orb': 3, 'weight': 1, 'harmony': 'challenging'},
+            'conjunction': {'weight': 3, 'harmony': 'neutral'},
+            'opposition': {'weight': 2, 'harmony': 'challenging'},
+            'trine': {'weight': 3, 'harmony': 'harmonious'},
+            'square': {'weight': 2, 'harmony': 'challenging'},
+            'sextile': {'weight': 2, 'harmony': 'harmonious'},
+            'quincunx': {'weight': 1, 'harmony': 'challenging'},
         }
         
-        # Calculate planet-to-planet aspects
-        for planet1, pos1 in bodies1.items():
-            for planet2, pos2 in bodies2.items():
-                angle = abs(pos1['ecliptic_longitude_deg'] - pos2['ecliptic_longitude_deg'])
-                angle = min(angle, 360 - angle)
-                
-                for aspect_name, config in aspects_config.items():
-                    target_angles = {
-                        'conjunction': 0,
-                        'opposition': 180,
-                        'trine': 120,
-                        'square': 90,
-                        'sextile': 60,
-                        'quincunx': 150,
-                    }
-                    
-                    target_angle = target_angles[aspect_name]
-                    orb_diff = abs(angle - target_angle)
-                    
-                    if orb_diff <= config['orb']:
-                        synastry['aspects'].append({
-                            'between': [planet1, planet2],
-                            'aspect': aspect_name,
-                            'angle': angle,
-                            'orb': orb_diff,
-                            'strength': max(0, 1 - (orb_diff / config['orb'])),
-                            'harmony': config['harmony'],
-                            'weight': config['weight']
-                        })
+        # Every cross-chart aspect from the shared kernel, orbs from the compiled table
+        names1 = list(bodies1)
+        names2 = list(bodies2)
+        hits = cross_aspects(
+            [bodies1[name]['ecliptic_longitude_deg'] for name in names1],
+            [bodies2[name]['ecliptic_longitude_deg'] for name in names2],
+            get_orb_table(orb_profile).pair_orbs(names1, names2),
+            aspects=list(aspects_config)
+        )
+        
+        for body1, body2, code, angle, orb, strength in zip(
+                hits['body1'].tolist(), hits['body2'].tolist(), hits['aspect'].tolist(),
+                hits['angle'].tolist(), hits['orb'].tolist(), hits['strength'].tolist()):
+            aspect_name = ASPECT_NAMES[code]
+            config = aspects_config[aspect_name]
+            synastry['aspects'].append({
+                'between': [names1[body1], names2[body2]],
+                'aspect': aspect_name,
+                'angle': angle,
+                'orb': orb,
+                'strength': strength,
+                'harmony': config['harmony'],
+                'weight': config['weight']
+            })
         
         # Calculate compatibility score
         total_score = 0
@@ -895,7 +897,10 @@ MIT License
             
             # Generate reading based on type
             if reading_type == "comprehensive":
-                reading = AstrologyReadings.generate_comprehensive_reading(natal_chart, target_date)
+                chart_id, db = self.reading_cache_target(birth_data)
+                reading = AstrologyReadings.generate_comprehensive_reading(
+                    natal_chart, target_date, chart_id=chart_id, db=db
+                )
                 self.display_comprehensive_reading(birth_data, reading)
             elif reading_type == "transits_only":
                 transits = AstrologyReadings.calculate_transits(natal_chart, target_date)
@@ -918,6 +923,27 @@ MIT License
         except Exception as e:
             messagebox.showerror("Reading Error", f"Error generating reading: {str(e)}")
     
+    def reading_cache_target(self, birth_data: dict):
+        """
+        Saved chart id and database for the reading cache.
+        
+        Only charts the user already saved use the cache; nothing is written
+        here. Returns (None, None) for unsaved charts or when the database is
+        unavailable.
+        """
+        try:
+            db = get_database()
+            chart_id = db.get_chart_id(birth_data['name'], birth_data['date'], birth_data['time'],
+                                       birth_data['timezone'], birth_data['latitude'],
+                                       birth_data['longitude'])
+        except sqlite3.Error as e:
+            # Readings work without the cache
+            logger.warning(f"Reading cache unavailable: {e}")
+            return None, None
+        if chart_id is None:
+            return None, None
+        return chart_id, db
+    
     def display_comprehensive_reading(self, birth_data: dict, reading: dict):
         """Display comprehensive astrology reading"""
         self.readings_text.delete("1.0", tk.END)
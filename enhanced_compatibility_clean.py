@@ -10,13 +10,41 @@ This is a clean, publishable version suitable for GitHub distribution.
 import math
 import json
 import argparse
+import contextlib
+import csv
+import heapq
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Any
 from pathlib import Path
 
+import numpy as np
+
+from compatibility_profile import (CompatibilityProfile, compatibility_profile,
+                                   SIGN_CODES, SIGN_NAMES, NO_SIGN)
+from compatibility_report import render_report, REPORT_EXTENSIONS, REPORT_FORMATS
+from relationship_charts import calculate_composite_chart
+from aspects import (cross_aspects, match_aspects, separation_matrix,
+                     cross_chart_pattern_indices, detect_cross_chart_patterns)
+from orb_profiles import ASPECT_NAMES, ASPECT_ANGLES, get_orb_table
+
+# One row per cross-chart aspect returned by synastry_matrix; body1/body2 index
+# the two longitude arrays and aspect indexes ASPECT_NAMES
+SYNASTRY_DTYPE = np.dtype([
+    ('body1', np.int32), ('body2', np.int32), ('aspect', np.int8),
+    ('angle', np.float64), ('orb', np.float64), ('score', np.float64), ('strength', np.float64)
+])
+
+# Distinct (names1, names2) orb tables kept by point_orbs before it starts over
+POINT_ORB_CACHE_SIZE = 256
+
 class EnhancedCompatibilityCalculator:
     """Advanced compatibility analysis with spiritual insights."""
     
-    def __init__(self):
+    def __init__(self, orb_profile: str = 'synastry'):
         self.aspect_weights = {
             'conjunction': 15,
             'opposition': -8,
@@ -43,6 +71,23 @@ class EnhancedCompatibilityCalculator:
             'life_path_alignment': 20,
             'harmonic_resonance': 20
         }
+        
+        # Compiled once; determine_aspect walks this list instead of rebuilding it
+        self.orb_table = get_orb_table(orb_profile)
+        default_orbs = self.orb_table.orbs_for('other', 'other').tolist()
+        self.aspect_orbs = [
+            (name, float(ASPECT_ANGLES[code]), max_orb)
+            for code, (name, max_orb) in enumerate(zip(ASPECT_NAMES, default_orbs))
+            if max_orb > 0
+        ]
+        
+        # Orbs of points the profile does not list; named points get their
+        # body bonuses and pair overrides from point_orbs (cached per name lists)
+        self._orb_vector = np.array(default_orbs)
+        self._point_orbs = {}
+        # Synastry weight per ASPECT_NAMES code
+        self.weight_table = np.array([self.aspect_weights.get(name, 0) for name in ASPECT_NAMES],
+                                     dtype=np.float64)
 
     def calculate_angle_difference(self, pos1: float, pos2: float) -> float:
         """Calculate the angular difference between two positions."""
@@ -51,55 +96,177 @@ class EnhancedCompatibilityCalculator:
             diff = 360 - diff
         return diff
 
+    def point_orbs(self, names1, names2) -> np.ndarray:
+        """
+        Orbs for every pair of two charts' points from the compiled orb table.
+        
+        The profile's body bonuses and pair overrides apply; points the table
+        does not list (such as 'house_7') use its 'other' slot.
+        
+        Returns:
+            np.ndarray: (len(names1), len(names2), aspects) orbs
+        """
+        key = (tuple(names1), tuple(names2))
+        orbs = self._point_orbs.get(key)
+        if orbs is None:
+            if len(self._point_orbs) >= POINT_ORB_CACHE_SIZE:
+                self._point_orbs.clear()
+            orbs = self._point_orbs[key] = self.orb_table.pair_orbs(*key)
+        return orbs
+
+    def _pair_orbs(self, names1, names2) -> np.ndarray:
+        """point_orbs for two name lists, or the unlisted-point orbs when either is missing."""
+        if names1 is None or names2 is None:
+            return self._orb_vector
+        return self.point_orbs(names1, names2)
+
     def determine_aspect(self, angle: float, orb: float = 8) -> Tuple[str, float]:
-        """Determine the aspect between two positions."""
-        aspects = [
-            ('conjunction', 0, 8),
-            ('opposition', 180, 8),
-            ('trine', 120, 6),
-            ('square', 90, 6),
-            ('sextile', 60, 4),
-            ('quincunx', 150, 2),
-            ('semi-sextile', 30, 2),
-            ('semi-square', 45, 2)
-        ]
-        
-        for aspect_name, target_angle, max_orb in aspects:
+        """Determine the aspect between two positions (orbs for unlisted points)."""
+        for aspect_name, target_angle, max_orb in self.aspect_orbs:
             orb_diff = abs(angle - target_angle)
             if orb_diff <= max_orb:
                 return aspect_name, orb_diff
         
         return None, None
 
+    def synastry_matrix(self, longitudes1, longitudes2, names1=None, names2=None) -> np.ndarray:
+        """
+        Find every cross-chart aspect between two sets of longitudes at once.
+        
+        Each pair gets the first aspect (in ASPECT_NAMES order) within its orb
+        from point_orbs. Scores come from aspect_weights and strength fades
+        linearly to zero at 8 degrees.
+        
+        Args:
+            longitudes1: Ecliptic longitudes of the first chart's bodies
+            longitudes2: Ecliptic longitudes of the second chart's bodies
+            names1, names2: Body names of the longitudes (default: orbs of
+                unlisted points for every pair)
+        
+        Returns:
+            np.ndarray: SYNASTRY_DTYPE rows ordered by (body1, body2)
+        """
+        hits = cross_aspects(longitudes1, longitudes2, self._pair_orbs(names1, names2),
+                             weights=self.aspect_weights)
+        
+        result = np.empty(len(hits), dtype=SYNASTRY_DTYPE)
+        for field in ('body1', 'body2', 'aspect', 'angle', 'orb'):
+            result[field] = hits[field]
+        result['score'] = hits['weight']
+        result['strength'] = np.maximum(0, 1 - hits['orb'] / 8)
+        return result
+
+    def synastry_totals(self, longitudes, others, names=None, other_names=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positive and negative synastry score sums of one chart against many.
+        
+        Gives the same totals calculate_compatibility_score derives from
+        calculate_synastry_aspects, without building any aspect dictionaries.
+        
+        Args:
+            longitudes: Body longitudes of one chart
+            others: Body longitudes of M charts, shape (M, bodies); pad charts
+                with fewer bodies with NaN
+            names: Body names of longitudes
+            other_names: Body names of the columns of others
+        
+        Returns:
+            tuple: (positive, negative) score sums, each of shape (M,)
+        """
+        lon = np.asarray(longitudes, dtype=np.float64)
+        others = np.asarray(others, dtype=np.float64)
+        
+        codes, _ = match_aspects(separation_matrix(lon, others), self._pair_orbs(names, other_names))
+        score = np.where(codes >= 0, self.weight_table[codes], 0.0)
+        positive = np.where(score > 0, score, 0.0).sum(axis=(1, 2))
+        negative = np.where(score < 0, score, 0.0).sum(axis=(1, 2))
+        return positive, negative
+
     def calculate_synastry_aspects(self, chart1: Dict, chart2: Dict) -> Dict:
         """Calculate all synastry aspects between two charts."""
         synastry = {}
         
-        bodies1 = chart1['bodies']
-        bodies2 = chart2['bodies']
+        names1 = list(chart1['bodies'])
+        names2 = list(chart2['bodies'])
+        hits = self.synastry_matrix(
+            [chart1['bodies'][name]['ecliptic_longitude_deg'] for name in names1],
+            [chart2['bodies'][name]['ecliptic_longitude_deg'] for name in names2],
+            names1, names2
+        )
         
-        # Calculate all planetary aspects
-        for planet1, data1 in bodies1.items():
-            for planet2, data2 in bodies2.items():
-                angle = self.calculate_angle_difference(data1['ecliptic_longitude_deg'], 
-                                                       data2['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=8)
-                
-                if aspect:
-                    aspect_key = f"{planet1}_{planet2}_{aspect}"
-                    synastry[aspect_key] = {
-                        'planets': (planet1, planet2),
-                        'aspect': aspect,
-                        'orb': orb,
-                        'angle': angle,
-                        'score': self.aspect_weights.get(aspect, 0),
-                        'strength': max(0, 1 - (orb / 8))
-                    }
+        # Plain Python values from here on, keyed as before
+        for body1, body2, code, angle, orb in zip(hits['body1'].tolist(), hits['body2'].tolist(),
+                                                  hits['aspect'].tolist(), hits['angle'].tolist(),
+                                                  hits['orb'].tolist()):
+            planet1, planet2, aspect = names1[body1], names2[body2], ASPECT_NAMES[code]
+            synastry[f"{planet1}_{planet2}_{aspect}"] = {
+                'planets': (planet1, planet2),
+                'aspect': aspect,
+                'orb': orb,
+                'angle': angle,
+                'score': self.aspect_weights.get(aspect, 0),
+                'strength': max(0, 1 - (orb / 8))
+            }
         
         return synastry
 
-    def analyze_destiny_connections(self, chart1: Dict, chart2: Dict) -> Dict:
-        """Analyze destiny indicators and fated connections."""
+    def profile(self, chart) -> CompatibilityProfile:
+        """Compatibility profile of a chart (profiles are returned unchanged)."""
+        return compatibility_profile(chart)
+
+    def _cross_aspects(self, profile1: CompatibilityProfile,
+                       profile2: CompatibilityProfile) -> Tuple[List, List, List]:
+        """
+        First aspect between every point of two profiles, computed once per pair.
+        
+        Points are the bodies followed by the 7th-house cusp. Aspects are
+        ASPECT_NAMES codes (-1 for none), each pair using its own orbs.
+        
+        Returns:
+            tuple: (aspects, orbs, angles) as nested lists indexed [point1][point2]
+        """
+        return tuple(array.tolist() for array in self._cross_aspect_arrays(profile1, profile2))
+
+    def _cross_aspect_arrays(self, profile1: CompatibilityProfile,
+                             profile2: CompatibilityProfile) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Array form of _cross_aspects."""
+        angle = np.abs(profile1.points[:, None] - profile2.points[None, :])
+        angle = np.where(angle > 180, 360 - angle, angle)
+        orbs = self.point_orbs(profile1.point_names, profile2.point_names)
+        return (*self.first_aspects(angle, orbs), angle)
+
+    def first_aspects(self, angle: np.ndarray, orbs: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        First aspect within orb for an array of separations.
+        
+        Args:
+            angle: Separations in degrees
+            orbs: Orbs broadcastable to angle.shape + (aspects,), e.g. from
+                point_orbs (default: the orbs of unlisted points)
+        
+        Returns:
+            tuple: (ASPECT_NAMES codes, -1 where there is none; orbs), each
+            shaped like angle
+        """
+        return match_aspects(angle, self._orb_vector if orbs is None else orbs)
+
+    def _cross_aspect(self, cross: Tuple[List, List, List], point1: int, point2: int,
+                      max_orb: float) -> Tuple[str, float]:
+        """Aspect name and orb between two points if within max_orb, else (None, None)."""
+        aspects, orbs, _ = cross
+        code = aspects[point1][point2]
+        if code < 0 or orbs[point1][point2] > max_orb:
+            return None, None
+        return ASPECT_NAMES[code], orbs[point1][point2]
+
+    def analyze_destiny_connections(self, chart1, chart2) -> Dict:
+        """Analyze destiny indicators and fated connections (charts or profiles)."""
+        profile1, profile2 = self.profile(chart1), self.profile(chart2)
+        return self._destiny_from_profiles(profile1, profile2, self._cross_aspects(profile1, profile2))
+
+    def _destiny_from_profiles(self, profile1: CompatibilityProfile, profile2: CompatibilityProfile,
+                               cross: Tuple[List, List, List]) -> Dict:
+        """Destiny analysis from two profiles and their cross aspects."""
         destiny = {
             'node_connections': [],
             'vertex_connections': [],
@@ -109,20 +276,16 @@ class EnhancedCompatibilityCalculator:
             'max_score': 60
         }
         
-        bodies1 = chart1['bodies']
-        bodies2 = chart2['bodies']
-        houses1 = chart1['houses']
-        houses2 = chart2['houses']
+        index1 = profile1.index
+        index2 = profile2.index
         
         # North Node connections (major destiny indicator) - standard 3° orb
         significant_planets = ['sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn', 'ascendant', 'midheaven']
         
         for planet in significant_planets:
-            if planet in bodies1:
-                angle = self.calculate_angle_difference(bodies1[planet]['ecliptic_longitude_deg'], 
-                                                       bodies2['north_node']['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=5)  # Standard orb
-                if aspect and orb <= 3:  # Standard destiny orb
+            if planet in index1:
+                aspect, orb = self._cross_aspect(cross, index1[planet], index2['north_node'], 3)
+                if aspect:
                     destiny['node_connections'].append({
                         'planet': planet,
                         'aspect': aspect,
@@ -131,12 +294,11 @@ class EnhancedCompatibilityCalculator:
                     })
                     destiny['score'] += 6
         
+        # The separation is symmetric, so chart 2's planets read the transposed cell
         for planet in significant_planets:
-            if planet in bodies2:
-                angle = self.calculate_angle_difference(bodies2[planet]['ecliptic_longitude_deg'], 
-                                                       bodies1['north_node']['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=5)
-                if aspect and orb <= 3:
+            if planet in index2:
+                aspect, orb = self._cross_aspect(cross, index1['north_node'], index2[planet], 3)
+                if aspect:
                     destiny['node_connections'].append({
                         'planet': planet,
                         'aspect': aspect,
@@ -147,11 +309,9 @@ class EnhancedCompatibilityCalculator:
         
         # Part of Fortune connections (destiny/luck)
         for planet in significant_planets:
-            if planet in bodies1:
-                angle = self.calculate_angle_difference(bodies1[planet]['ecliptic_longitude_deg'], 
-                                                       bodies2['part_of_fortune']['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=4)
-                if aspect and orb <= 2:
+            if planet in index1:
+                aspect, orb = self._cross_aspect(cross, index1[planet], index2['part_of_fortune'], 2)
+                if aspect:
                     destiny['part_of_fortune_connections'].append({
                         'planet': planet,
                         'aspect': aspect,
@@ -161,11 +321,9 @@ class EnhancedCompatibilityCalculator:
                     destiny['score'] += 4
         
         for planet in significant_planets:
-            if planet in bodies2:
-                angle = self.calculate_angle_difference(bodies2[planet]['ecliptic_longitude_deg'], 
-                                                       bodies1['part_of_fortune']['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=4)
-                if aspect and orb <= 2:
+            if planet in index2:
+                aspect, orb = self._cross_aspect(cross, index1['part_of_fortune'], index2[planet], 2)
+                if aspect:
                     destiny['part_of_fortune_connections'].append({
                         'planet': planet,
                         'aspect': aspect,
@@ -175,16 +333,17 @@ class EnhancedCompatibilityCalculator:
                     destiny['score'] += 4
         
         # 7th House connections (relationship destiny) - standard 3° orb
-        house7_cusp1 = houses1['house_7']['ecliptic_longitude_deg']
-        house7_cusp2 = houses2['house_7']['ecliptic_longitude_deg']
+        if np.isnan(profile1.house_cusps[6]) or np.isnan(profile2.house_cusps[6]):
+            raise KeyError('house_7')
+        house7_point1 = profile1.body_count
+        house7_point2 = profile2.body_count
         
         personal_planets = ['sun', 'moon', 'venus', 'mars', 'ascendant', 'midheaven']
         
         for planet in personal_planets:
-            if planet in bodies1:
-                angle = self.calculate_angle_difference(bodies1[planet]['ecliptic_longitude_deg'], house7_cusp2)
-                aspect, orb = self.determine_aspect(angle, orb=4)
-                if aspect and orb <= 3:
+            if planet in index1:
+                aspect, orb = self._cross_aspect(cross, index1[planet], house7_point2, 3)
+                if aspect:
                     destiny['7th_house_synastry'].append({
                         'planet': planet,
                         'aspect': aspect,
@@ -194,10 +353,9 @@ class EnhancedCompatibilityCalculator:
                     destiny['score'] += 5
         
         for planet in personal_planets:
-            if planet in bodies2:
-                angle = self.calculate_angle_difference(bodies2[planet]['ecliptic_longitude_deg'], house7_cusp1)
-                aspect, orb = self.determine_aspect(angle, orb=4)
-                if aspect and orb <= 3:
+            if planet in index2:
+                aspect, orb = self._cross_aspect(cross, house7_point1, index2[planet], 3)
+                if aspect:
                     destiny['7th_house_synastry'].append({
                         'planet': planet,
                         'aspect': aspect,
@@ -211,8 +369,33 @@ class EnhancedCompatibilityCalculator:
         
         return destiny
 
-    def analyze_spiritual_connections(self, chart1: Dict, chart2: Dict) -> Dict:
-        """Analyze spiritual indicators including twin flame and soulmate markers."""
+    def analyze_spiritual_connections(self, chart1, chart2) -> Dict:
+        """Analyze spiritual indicators including twin flame and soulmate markers (charts or profiles)."""
+        profile1, profile2 = self.profile(chart1), self.profile(chart2)
+        return self._spiritual_from_profiles(profile1, profile2, self._cross_aspects(profile1, profile2))
+
+    def analyze_cross_patterns(self, chart1, chart2, name1: str = 'chart1', name2: str = 'chart2') -> Dict:
+        """
+        T-squares, Grand Trines, Grand Crosses and Yods one chart completes in the other.
+        
+        Both charts' planets and nodes form one graph (see
+        aspects.detect_cross_chart_patterns); points are (name, body) pairs.
+        """
+        profile1, profile2 = self.profile(chart1), self.profile(chart2)
+        return detect_cross_chart_patterns([(profile1.names, profile1.longitudes),
+                                            (profile2.names, profile2.longitudes)],
+                                           (name1, name2), self.orb_table)
+
+    def cross_pattern_counts(self, chart1, chart2) -> Dict[str, int]:
+        """Number of each cross-chart pattern, without building the pattern dicts."""
+        profile1, profile2 = self.profile(chart1), self.profile(chart2)
+        *_, patterns = cross_chart_pattern_indices([(profile1.names, profile1.longitudes),
+                                                    (profile2.names, profile2.longitudes)], self.orb_table)
+        return {key: len(rows) for key, rows in patterns.items()}
+
+    def _spiritual_from_profiles(self, profile1: CompatibilityProfile, profile2: CompatibilityProfile,
+                                 cross: Tuple[List, List, List]) -> Dict:
+        """Spiritual analysis from two profiles and their cross aspects."""
         spiritual = {
             'twin_flame_indicators': [],
             'soulmate_indicators': [],
@@ -223,8 +406,8 @@ class EnhancedCompatibilityCalculator:
             'max_score': 150
         }
         
-        bodies1 = chart1['bodies']
-        bodies2 = chart2['bodies']
+        index1 = profile1.index
+        index2 = profile2.index
         
         # Twin Flame Indicators (intense, challenging connections) - standard 3° orb
         twin_aspects = [
@@ -235,11 +418,9 @@ class EnhancedCompatibilityCalculator:
         ]
         
         for planet1, planet2 in twin_aspects:
-            if planet1 in bodies1 and planet2 in bodies2:
-                angle = self.calculate_angle_difference(bodies1[planet1]['ecliptic_longitude_deg'],
-                                                       bodies2[planet2]['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=4)  # Standard orb
-                if aspect in ['conjunction', 'opposition', 'square'] and orb <= 3:
+            if planet1 in index1 and planet2 in index2:
+                aspect, orb = self._cross_aspect(cross, index1[planet1], index2[planet2], 3)
+                if aspect in ['conjunction', 'opposition', 'square']:
                     spiritual['twin_flame_indicators'].append({
                         'connection': f"{planet1}-{planet2}",
                         'aspect': aspect,
@@ -257,11 +438,9 @@ class EnhancedCompatibilityCalculator:
         ]
         
         for planet1, planet2 in soulmate_aspects:
-            if planet1 in bodies1 and planet2 in bodies2:
-                angle = self.calculate_angle_difference(bodies1[planet1]['ecliptic_longitude_deg'],
-                                                       bodies2[planet2]['ecliptic_longitude_deg'])
-                aspect, orb = self.determine_aspect(angle, orb=6)  # Standard orb
-                if aspect in ['trine', 'sextile', 'conjunction'] and orb <= 5:
+            if planet1 in index1 and planet2 in index2:
+                aspect, orb = self._cross_aspect(cross, index1[planet1], index2[planet2], 5)
+                if aspect in ['trine', 'sextile', 'conjunction']:
                     spiritual['soulmate_indicators'].append({
                         'connection': f"{planet1}-{planet2}",
                         'aspect': aspect,
@@ -272,14 +451,15 @@ class EnhancedCompatibilityCalculator:
         
         # Enhanced Elemental Harmony (same element connections) - SPIRITUALLY WEIGHTED
         # Check for Pisces-Pisces connections (MAJOR spiritual indicator)
-        if bodies1['sun']['sign'] == 'Pisces' and bodies2['ascendant']['sign'] == 'Pisces':
+        pisces = SIGN_CODES['pisces']
+        if profile1.sign('sun') == pisces and profile2.sign('ascendant') == pisces:
             spiritual['elemental_harmony'].append({
                 'connection': 'Sun-Pisces to Ascendant-Pisces',
                 'significance': 'PROFOUND spiritual resonance - soul recognition'
             })
             spiritual['score'] += 35  # Increased from 20
         
-        if bodies1['moon']['sign'] == 'Pisces' and bodies2['ascendant']['sign'] == 'Pisces':
+        if profile1.sign('moon') == pisces and profile2.sign('ascendant') == pisces:
             spiritual['elemental_harmony'].append({
                 'connection': 'Moon-Pisces to Ascendant-Pisces',
                 'significance': 'DEEP emotional spiritual connection'
@@ -287,17 +467,11 @@ class EnhancedCompatibilityCalculator:
             spiritual['score'] += 25  # Increased from 15
         
         # Water element harmony - ENHANCED
-        water_signs = ['cancer', 'scorpio', 'pisces']
-        water_connections = 0
-        
-        # Count ALL water connections, not just personal planets
+        # Count ALL water connections, not just personal planets: every water
+        # planet of chart 1 pairs with every water planet of chart 2
         all_planets = ['sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter', 'saturn']
-        
-        for planet1 in all_planets:
-            if planet1 in bodies1 and bodies1[planet1]['sign'].lower() in water_signs:
-                for planet2 in all_planets:
-                    if planet2 in bodies2 and bodies2[planet2]['sign'].lower() in water_signs:
-                        water_connections += 1
+        water_connections = (profile1.count_in_element(all_planets, 'water') *
+                             profile2.count_in_element(all_planets, 'water'))
         
         if water_connections >= 6:  # Lowered threshold for recognition
             spiritual['elemental_harmony'].append({
@@ -317,13 +491,11 @@ class EnhancedCompatibilityCalculator:
         significant_planets = ['sun', 'moon', 'venus', 'mars', 'jupiter']
         
         for planet1 in past_life_planets:
-            if planet1 in bodies1:
+            if planet1 in index1:
                 for planet2 in significant_planets:
-                    if planet2 in bodies2:
-                        angle = self.calculate_angle_difference(bodies1[planet1]['ecliptic_longitude_deg'],
-                                                               bodies2[planet2]['ecliptic_longitude_deg'])
-                        aspect, orb = self.determine_aspect(angle, orb=4)
-                        if aspect and orb <= 3:
+                    if planet2 in index2:
+                        aspect, orb = self._cross_aspect(cross, index1[planet1], index2[planet2], 3)
+                        if aspect:
                             # EXACT aspects get major bonus
                             if orb <= 0.5:
                                 spiritual['past_life_connections'].append({
@@ -343,17 +515,17 @@ class EnhancedCompatibilityCalculator:
                                 spiritual['score'] += 10
         
         # Life Path Alignment (North Node directions) - ENHANCED
-        node1_sign = bodies1['north_node']['sign']
-        node2_sign = bodies2['north_node']['sign']
+        node1 = index1['north_node']
+        node2 = index2['north_node']
+        node1_sign = profile1.sign('north_node')
         
-        if node1_sign == node2_sign:
+        if node1_sign != NO_SIGN and node1_sign == profile2.sign('north_node'):
             spiritual['life_path_alignment'].append({
-                'alignment': f"Both North Nodes in {node1_sign}",
+                'alignment': f"Both North Nodes in {SIGN_NAMES[node1_sign]}",
                 'significance': 'IDENTICAL life purpose - destined journey together'
             })
             spiritual['score'] += 20  # Increased from 15
-        elif self.calculate_angle_difference(bodies1['north_node']['ecliptic_longitude_deg'],
-                                            bodies2['north_node']['ecliptic_longitude_deg']) <= 30:
+        elif cross[2][node1][node2] <= 30:
             spiritual['life_path_alignment'].append({
                 'alignment': f"North Nodes in compatible signs",
                 'significance': 'Harmonious life paths'
@@ -361,11 +533,9 @@ class EnhancedCompatibilityCalculator:
             spiritual['score'] += 12  # Increased from 8
         
         # BONUS: Check for Pluto-Node connections (major twin flame indicator)
-        if 'pluto' in bodies1:
-            angle = self.calculate_angle_difference(bodies1['pluto']['ecliptic_longitude_deg'],
-                                                   bodies2['north_node']['ecliptic_longitude_deg'])
-            aspect, orb = self.determine_aspect(angle, orb=3)
-            if aspect and orb <= 2:
+        if 'pluto' in index1:
+            aspect, orb = self._cross_aspect(cross, index1['pluto'], node2, 2)
+            if aspect:
                 spiritual['twin_flame_indicators'].append({
                     'connection': 'Pluto-North Node',
                     'aspect': aspect,
@@ -374,11 +544,9 @@ class EnhancedCompatibilityCalculator:
                 })
                 spiritual['score'] += 25
         
-        if 'pluto' in bodies2:
-            angle = self.calculate_angle_difference(bodies2['pluto']['ecliptic_longitude_deg'],
-                                                   bodies1['north_node']['ecliptic_longitude_deg'])
-            aspect, orb = self.determine_aspect(angle, orb=3)
-            if aspect and orb <= 2:
+        if 'pluto' in index2:
+            aspect, orb = self._cross_aspect(cross, node1, index2['pluto'], 2)
+            if aspect:
                 spiritual['twin_flame_indicators'].append({
                     'connection': 'Pluto-North Node',
                     'aspect': aspect,
@@ -393,27 +561,8 @@ class EnhancedCompatibilityCalculator:
         return spiritual
 
     def calculate_composite_chart(self, chart1: Dict, chart2: Dict) -> Dict:
-        """Calculate composite chart midpoint positions."""
-        composite = {}
-        bodies1 = chart1['bodies']
-        bodies2 = chart2['bodies']
-        
-        for planet in bodies1:
-            if planet in bodies2:
-                pos1 = bodies1[planet]['ecliptic_longitude_deg']
-                pos2 = bodies2[planet]['ecliptic_longitude_deg']
-                
-                # Calculate midpoint
-                midpoint = (pos1 + pos2) / 2
-                if midpoint > 360:
-                    midpoint -= 360
-                
-                composite[planet] = {
-                    'longitude': midpoint,
-                    'sign': self.get_sign_from_longitude(midpoint)
-                }
-        
-        return composite
+        """Calculate composite chart positions (nearer circular midpoints, see relationship_charts)."""
+        return calculate_composite_chart([chart1, chart2])
 
     def get_sign_from_longitude(self, longitude: float) -> str:
         """Get zodiac sign from longitude."""
@@ -424,6 +573,18 @@ class EnhancedCompatibilityCalculator:
 
     def calculate_compatibility_score(self, synastry: Dict, destiny: Dict, spiritual: Dict) -> Dict:
         """Calculate overall compatibility score out of 100 with proper normalization."""
+        # Calculate synastry score properly
+        synastry_positive = sum(aspect['score'] for aspect in synastry.values() if aspect['score'] > 0)
+        synastry_negative = sum(aspect['score'] for aspect in synastry.values() if aspect['score'] < 0)
+        
+        return self.compatibility_score_from_totals(synastry_positive, synastry_negative,
+                                                    destiny['score'], destiny['max_score'],
+                                                    spiritual['score'])
+
+    def compatibility_score_from_totals(self, synastry_positive: float, synastry_negative: float,
+                                        destiny_score: float, destiny_max_score: float,
+                                        spiritual_score: float) -> Dict:
+        """Calculate the compatibility scores from the raw synastry, destiny and spiritual totals."""
         scores = {
             'synastry_score': 0,
             'destiny_score': 0,
@@ -434,9 +595,6 @@ class EnhancedCompatibilityCalculator:
             'synastry_details': {'positive': 0, 'negative': 0, 'neutral': 0, 'net': 0}
         }
         
-        # Calculate synastry score properly
-        synastry_positive = sum(aspect['score'] for aspect in synastry.values() if aspect['score'] > 0)
-        synastry_negative = sum(aspect['score'] for aspect in synastry.values() if aspect['score'] < 0)
         synastry_net = synastry_positive + synastry_negative
         
         scores['synastry_details']['positive'] = synastry_positive
@@ -458,11 +616,11 @@ class EnhancedCompatibilityCalculator:
         scores['synastry_score'] = max(0, min(100, synastry_normalized))
         
         # Destiny score (already capped at 60, normalize to 0-100)
-        scores['destiny_score'] = (destiny['score'] / destiny['max_score']) * 100
+        scores['destiny_score'] = (destiny_score / destiny_max_score) * 100
         
         # Spiritual score with proper capping
         max_spiritual = 150  # Maximum possible spiritual score
-        spiritual_score = min(spiritual['score'], max_spiritual)
+        spiritual_score = min(spiritual_score, max_spiritual)
         scores['spiritual_score'] = spiritual_score
         
         # Calculate weighted overall score
@@ -525,200 +683,83 @@ class EnhancedCompatibilityCalculator:
         else:
             return "This relationship faces significant obstacles but may offer important lessons. Requires exceptional commitment and self-awareness."
 
-    def generate_compatibility_report(self, chart1: Dict, chart2: Dict, 
-                                    name1: str, name2: str) -> str:
-        """Generate comprehensive compatibility report."""
-        
-        # Calculate all analyses
+    def score_compatibility(self, chart1, chart2) -> Dict:
+        """Calculate only the numeric compatibility scores (no report text) from charts or profiles."""
+        profile1, profile2 = self.profile(chart1), self.profile(chart2)
+        arrays = self._cross_aspect_arrays(profile1, profile2)
+        cross = tuple(array.tolist() for array in arrays)
+        destiny = self._destiny_from_profiles(profile1, profile2, cross)
+        spiritual = self._spiritual_from_profiles(profile1, profile2, cross)
+        
+        # Synastry totals from aspect counts over the body block of the same matrix
+        bodies = arrays[0][:profile1.body_count, :profile2.body_count]
+        counts = np.bincount(bodies.ravel() + 1, minlength=len(ASPECT_NAMES) + 1)[1:].tolist()
+        weights = self.weight_table.tolist()
+        synastry_positive = sum(weight * count for weight, count in zip(weights, counts) if weight > 0)
+        synastry_negative = sum(weight * count for weight, count in zip(weights, counts) if weight < 0)
+        
+        return self.compatibility_score_from_totals(synastry_positive, synastry_negative,
+                                                    destiny['score'], destiny['max_score'],
+                                                    spiritual['score'])
+
+    def compatibility_result(self, chart1: Dict, chart2: Dict, name1: str, name2: str) -> Dict:
+        """
+        Run every analysis for a pair and collect the structured result renderers use.
+        
+        The synastry highlights (counts, strongest five, first five harmonious
+        and challenging aspects) are picked in a single pass.
+        """
         synastry = self.calculate_synastry_aspects(chart1, chart2)
         destiny = self.analyze_destiny_connections(chart1, chart2)
         spiritual = self.analyze_spiritual_connections(chart1, chart2)
         composite = self.calculate_composite_chart(chart1, chart2)
+        patterns = self.analyze_cross_patterns(chart1, chart2, name1, name2)
         scores = self.calculate_compatibility_score(synastry, destiny, spiritual)
         
-        # Debug: Show synastry breakdown
-        harmonious_count = len([a for a in synastry.values() if a['score'] > 0])
-        challenging_count = len([a for a in synastry.values() if a['score'] < 0])
-        total_aspects = len(synastry)
-        
-        report = f"""
-# 🔮 Enhanced Relationship Compatibility Report
-## {name1} & {name2}
-
----
-
-## 📊 COMPATIBILITY SCORES
-
-### **Overall Score: {scores['overall_score']:.1f}/100** 
-**Grade: {scores['grade']} - {scores['interpretation']}**
-
-| Category | Score | Weight |
-|----------|-------|--------|
-| **Synastry Harmony** | {scores['synastry_score']:.1f}/100 | 40% |
-| **Destiny Connection** | {scores['destiny_score']:.1f}/100 | 30% |
-| **Spiritual Bond** | {scores['spiritual_score']:.1f}/100 | 30% |
-
-**Synastry Breakdown:** {total_aspects} total aspects ({harmonious_count} harmonious, {challenging_count} challenging)
-**Raw Score:** {scores['synastry_details']['positive']:.1f} positive, {scores['synastry_details']['negative']:.1f} negative
-
----
-
-## 🌟 DESTINY & FATED CONNECTIONS
-
-### **Were You Destined to Meet? {'✅ YES' if destiny['score'] >= 20 else '❌ NO'}**
-**Destiny Score: {destiny['score']}/{destiny['max_score']}**
-
-**Node Connections (Life Path Alignment):**
-"""
-        
-        for connection in destiny['node_connections']:
-            report += f"- {connection['planet']} {connection['aspect']} North Node (orb: {connection['orb']:.1f}°) - {connection['significance']}\n"
-        
-        report += f"\n**7th House Synastry (Relationship Destiny):**\n"
-        for connection in destiny['7th_house_synastry']:
-            report += f"- {connection['planet']} in 7th House {connection['aspect']} (orb: {connection['orb']:.1f}°) - {connection['significance']}\n"
-        
-        report += f"\n**Part of Fortune Connections:**\n"
-        for connection in destiny['part_of_fortune_connections']:
-            report += f"- {connection['planet']} {connection['aspect']} Part of Fortune (orb: {connection['orb']:.1f}°) - {connection['significance']}\n"
-        
-        report += f"""
-
----
-
-## 🔥 SPIRITUAL CONNECTION ANALYSIS
-
-### **Twin Flame Indicators: {'⚡ STRONG' if len(spiritual['twin_flame_indicators']) >= 2 else '⚡ MODERATE' if len(spiritual['twin_flame_indicators']) == 1 else '💫 MINIMAL'}**
-**Twin Flame Score: {len(spiritual['twin_flame_indicators']) * 18}/180**
-
-"""
-        
-        for indicator in spiritual['twin_flame_indicators']:
-            report += f"- {indicator['connection']} {indicator['aspect']} (orb: {indicator['orb']:.1f}°) - {indicator['intensity']} intensity\n"
-        
-        report += f"\n### **Soulmate Indicators: {'💕 STRONG' if len(spiritual['soulmate_indicators']) >= 3 else '💕 MODERATE' if len(spiritual['soulmate_indicators']) >= 1 else '💫 MINIMAL'}**\n"
-        for indicator in spiritual['soulmate_indicators']:
-            report += f"- {indicator['connection']} {indicator['aspect']} (orb: {indicator['orb']:.1f}°) - {indicator['harmony']} harmony\n"
-        
-        report += f"\n**Past Life Connections:**\n"
-        for connection in spiritual['past_life_connections']:
-            report += f"- {connection['connection']} {connection['aspect']} (orb: {connection['orb']:.1f}°) - {connection['karma']} karma\n"
-        
-        report += f"\n**Elemental Harmony:**\n"
-        for harmony in spiritual['elemental_harmony']:
-            report += f"- {harmony['connection']} - {harmony['significance']}\n"
-        
-        report += f"\n**Life Path Alignment:**\n"
-        for alignment in spiritual['life_path_alignment']:
-            report += f"- {alignment['alignment']} - {alignment['significance']}\n"
-        
-        report += f"""
-
----
-
-## 💫 SYNASTRY HIGHLIGHTS
-
-### **Top 5 Strongest Aspects:**
-"""
-        
-        # Sort synastry by strength
-        sorted_synastry = sorted(synastry.items(), key=lambda x: x[1]['strength'], reverse=True)[:5]
-        
-        for aspect_name, aspect_data in sorted_synastry:
-            planet1, planet2 = aspect_data['planets']
-            score_type = "✨" if aspect_data['score'] > 0 else "⚡" if aspect_data['score'] < 0 else "➖"
-            report += f"- {score_type} **{planet1.capitalize()} {aspect_data['aspect']} {planet2.capitalize()}** (orb: {aspect_data['orb']:.1f}°, score: {aspect_data['score']:+.1f})\n"
-        
-        report += f"\n### **Harmonious Aspects (Supportive):**\n"
-        harmonious = [a for a in synastry.values() if a['score'] > 0]
-        for aspect in harmonious[:5]:
-            planet1, planet2 = aspect['planets']
-            report += f"- {planet1.capitalize()} {aspect['aspect']} {planet2.capitalize()} - Flowing energy (score: {aspect['score']:+.1f})\n"
-        
-        report += f"\n### **Challenging Aspects (Growth Areas):**\n"
-        challenging = [a for a in synastry.values() if a['score'] < 0]
-        if challenging:
-            for aspect in challenging[:5]:
-                planet1, planet2 = aspect['planets']
-                report += f"- {planet1.capitalize()} {aspect['aspect']} {planet2.capitalize()} - Tension for growth (score: {aspect['score']:+.1f})\n"
-        else:
-            report += "- No significant challenging aspects detected\n"
-        
-        report += f"""
-
----
-
-## 🌈 COMPOSITE CHART INSIGHTS
-
-**Relationship Essence:**
-"""
-        
-        if 'sun' in composite:
-            report += f"- **Composite Sun:** {composite['sun']['sign']} - Relationship identity and purpose\n"
-        if 'moon' in composite:
-            report += f"- **Composite Moon:** {composite['moon']['sign']} - Emotional foundation of the relationship\n"
-        if 'venus' in composite:
-            report += f"- **Composite Venus:** {composite['venus']['sign']} - How love and harmony are expressed\n"
-        if 'mars' in composite:
-            report += f"- **Composite Mars:** {composite['mars']['sign']} - Shared drive and passion\n"
-        
-        report += f"""
-
----
-
-## 💖 RELATIONSHIP RECOMMENDATIONS
-
-### **Strengths to Nurture:**
-"""
-        
-        if scores['spiritual_score'] >= 70:
-            report += "- **Deep Spiritual Connection** - Nurture shared spiritual practices and intuitive understanding\n"
-        if scores['destiny_score'] >= 60:
-            report += "- **Fated Connection** - Trust the timing and purpose of your meeting\n"
-        if scores['synastry_score'] >= 60:
-            report += "- **Natural Harmony** - Build on your easy flow and mutual understanding\n"
-        
-        report += f"\n### **Areas for Growth:**\n"
-        if challenging_count >= 3:
-            report += "- **Embrace Tension** - Use challenging aspects as opportunities for deeper understanding\n"
-        if destiny['score'] < 15:
-            report += "- **Create Shared Purpose** - Consciously build meaning and direction together\n"
-        if len(spiritual['soulmate_indicators']) < 2:
-            report += "- **Cultivate Harmony** - Practice patience and develop flowing communication\n"
-        
-        report += f"""
+        harmonious = []
+        challenging = []
+        for aspect in synastry.values():
+            if aspect['score'] > 0:
+                harmonious.append(aspect)
+            elif aspect['score'] < 0:
+                challenging.append(aspect)
+        
+        return {
+            'names': [name1, name2],
+            'scores': scores,
+            'synastry': synastry,
+            'destiny': destiny,
+            'spiritual': spiritual,
+            'composite': composite,
+            'patterns': patterns,
+            'highlights': {
+                'total_aspects': len(synastry),
+                'harmonious_count': len(harmonious),
+                'challenging_count': len(challenging),
+                # Same order as a stable sort by strength, descending
+                'strongest': heapq.nlargest(5, synastry.values(), key=lambda aspect: aspect['strength']),
+                'harmonious': harmonious[:5],
+                'challenging': challenging[:5]
+            },
+            'verdict': {
+                'description': self.get_score_description(scores['overall_score']),
+                'recommendation': self.get_final_recommendation(scores, spiritual, destiny)
+            }
+        }
 
-### **Long-Term Potential:**
-"""
-        
-        if scores['overall_score'] >= 75:
-            report += "✨ **Exceptional Potential** - This relationship has the ingredients for profound, lasting love and mutual growth. The cosmic alignment supports a deeply meaningful connection.\n"
-        elif scores['overall_score'] >= 60:
-            report += "💫 **Strong Potential** - With conscious effort and mutual understanding, this relationship can develop into something beautiful and lasting. The foundation is solid.\n"
-        elif scores['overall_score'] >= 45:
-            report += "🌱 **Moderate Potential** - This relationship requires patience and communication but can grow into something meaningful. Focus on understanding differences.\n"
-        else:
-            report += "⚠️ **Challenging Potential** - This relationship faces significant obstacles but may offer important lessons. Requires exceptional commitment and self-awareness.\n"
+    def generate_compatibility_report(self, chart1: Dict, chart2: Dict,
+                                    name1: str, name2: str, stream=None, fmt: str = 'markdown') -> str:
+        """
+        Generate comprehensive compatibility report.
         
-        report += f"""
-
----
-
-## 🎯 FINAL VERDICT
-
-**{name1} & {name2}:** {scores['interpretation']}
-
-Your compatibility score of **{scores['overall_score']:.1f}/100** indicates {self.get_score_description(scores['overall_score'])}.
-
-{self.get_final_recommendation(scores, spiritual, destiny)}
-
----
-
-*Generated with advanced synastry calculations and spiritual compatibility analysis*
-*Calculation Method: Enhanced Swiss Ephemeris + Spiritual Indicators*
-"""
+        Args:
+            stream: Text stream to write the report to instead of returning it
+            fmt: 'markdown', 'json' or 'html'
         
-        return report
+        Returns:
+            str: The report, or None when written to stream
+        """
+        return render_report(self.compatibility_result(chart1, chart2, name1, name2), stream, fmt)
 
 def load_chart_from_json(file_path: str) -> Dict:
     """Load natal chart data from JSON file."""
@@ -733,17 +774,184 @@ def load_chart_from_json(file_path: str) -> Dict:
         print(f"JSON Error: {e}")
         return {}
 
+def load_pairs_csv(file_path: str) -> List[Dict]:
+    """
+    Load a pairs file for batch scoring.
+    
+    Each row names two chart JSON files and optionally the two people:
+    chart1,chart2[,name1,name2]. A header row starting with "chart1" is
+    skipped. Relative chart paths are resolved against the CSV's folder.
+    
+    Returns:
+        list: Dicts with chart1, chart2, name1 and name2
+    """
+    base = Path(file_path).parent
+    pairs = []
+    with open(file_path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            row = [value.strip() for value in row]
+            if not row or not any(row) or row[0].startswith('#'):
+                continue
+            if row[0].lower() == 'chart1':
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Pairs row needs two chart files: {row}")
+            path1, path2 = (str(base / path) for path in row[:2])
+            pairs.append({
+                'chart1': path1,
+                'chart2': path2,
+                'name1': row[2] if len(row) > 2 and row[2] else Path(path1).stem,
+                'name2': row[3] if len(row) > 3 and row[3] else Path(path2).stem
+            })
+    return pairs
+
+# Per-process state set up once by the pairs pool initializer
+_pairs_state = {}
+
+def _init_pairs_worker(charts: Dict[str, Dict], reports_dir: str = None, report_format: str = 'markdown'):
+    """Pool initializer: keep the loaded charts and derive their profiles once."""
+    _pairs_state['calculator'] = EnhancedCompatibilityCalculator()
+    _pairs_state['charts'] = charts
+    _pairs_state['reports_dir'] = reports_dir
+    _pairs_state['report_format'] = report_format
+    profiles = {}
+    for path, chart in charts.items():
+        try:
+            profiles[path] = compatibility_profile(chart) if chart else None
+        except (KeyError, TypeError, ValueError):
+            profiles[path] = None
+    _pairs_state['profiles'] = profiles
+
+def _report_filename(index: int, name1: str, name2: str, report_format: str = 'markdown') -> str:
+    """File name for one pair's report."""
+    label = re.sub(r'[^A-Za-z0-9]+', '_', f"{name1}_{name2}").strip('_') or 'pair'
+    return f"{index:05d}_{label}{REPORT_EXTENSIONS[report_format]}"
+
+def _score_pair_chunk(chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+    """Score (index, pair) items, writing reports when a reports folder is set."""
+    calculator = _pairs_state['calculator']
+    charts = _pairs_state['charts']
+    profiles = _pairs_state['profiles']
+    reports_dir = _pairs_state['reports_dir']
+    report_format = _pairs_state['report_format']
+    
+    records = []
+    for index, pair in chunk:
+        record = {'pair': index, **pair}
+        profile1, profile2 = profiles.get(pair['chart1']), profiles.get(pair['chart2'])
+        if profile1 is None or profile2 is None:
+            record['error'] = 'Could not load chart files'
+            records.append(record)
+            continue
+        
+        try:
+            scores = calculator.score_compatibility(profile1, profile2)
+            record.update({
+                'overall_score': scores['overall_score'],
+                'grade': scores['grade'],
+                'synastry_score': scores['synastry_score'],
+                'destiny_score': scores['destiny_score'],
+                'spiritual_score': scores['spiritual_score']
+            })
+            if reports_dir:
+                report_path = os.path.join(reports_dir, _report_filename(index, pair['name1'], pair['name2'],
+                                                                         report_format))
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    calculator.generate_compatibility_report(charts[pair['chart1']], charts[pair['chart2']],
+                                                             pair['name1'], pair['name2'], f, report_format)
+                record['report'] = report_path
+        except (KeyError, TypeError, ValueError) as e:
+            record['error'] = f"Incomplete chart data: {e}"
+        except Exception as e:
+            # Any other failure is reported on its own record; the run goes on
+            record['error'] = f"Scoring failed: {type(e).__name__}: {e}"
+        records.append(record)
+    return records
+
+def score_pairs(pairs: List[Dict], workers: int = None, reports_dir: str = None,
+                chunk_size: int = 32, report_format: str = 'markdown'):
+    """
+    Score many chart pairs, loading each distinct chart file once.
+    
+    Args:
+        pairs: Dicts with chart1, chart2, name1 and name2 (see load_pairs_csv)
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+        reports_dir: Also write a report per pair into this folder
+        chunk_size: Pairs sent to a worker per task
+        report_format: Format of those reports ('markdown', 'json' or 'html')
+    
+    Yields:
+        dict: One score record per pair, in input order; pairs that cannot be
+        scored carry an 'error' instead of scores
+    """
+    paths = {path for pair in pairs for path in (pair['chart1'], pair['chart2'])}
+    # Load errors go to stderr so a JSONL stream on stdout stays clean
+    with contextlib.redirect_stdout(sys.stderr):
+        charts = {path: load_chart_from_json(path) for path in sorted(paths)}
+    if reports_dir:
+        os.makedirs(reports_dir, exist_ok=True)
+    
+    items = list(enumerate(pairs))
+    chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1 or len(chunks) <= 1:
+        _init_pairs_worker(charts, reports_dir, report_format)
+        for chunk in chunks:
+            yield from _score_pair_chunk(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pairs_worker,
+                             initargs=(charts, reports_dir, report_format)) as pool:
+        # First in, first out keeps the stream in input order with few chunks in flight
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_pair_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def run_pairs(pairs_file: str, output: str = None, reports_dir: str = None, workers: int = None,
+              report_format: str = 'markdown') -> int:
+    """Score a pairs CSV into a JSONL stream (stdout when output is None); returns pairs scored."""
+    pairs = load_pairs_csv(pairs_file)
+    stream = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    scored = 0
+    try:
+        for record in score_pairs(pairs, workers=workers, reports_dir=reports_dir, report_format=report_format):
+            stream.write(json.dumps(record) + '\n')
+            scored += 'error' not in record
+    finally:
+        if output:
+            stream.close()
+    return scored
+
 def main():
     """Main function for command line usage."""
     parser = argparse.ArgumentParser(description='Enhanced Relationship Compatibility Calculator')
-    parser.add_argument('chart1', help='Path to first person\'s chart JSON file')
-    parser.add_argument('chart2', help='Path to second person\'s chart JSON file')
+    parser.add_argument('chart1', nargs='?', help='Path to first person\'s chart JSON file')
+    parser.add_argument('chart2', nargs='?', help='Path to second person\'s chart JSON file')
     parser.add_argument('--name1', default='Person A', help='Name of first person')
     parser.add_argument('--name2', default='Person B', help='Name of second person')
-    parser.add_argument('--output', help='Output file path (optional)')
+    parser.add_argument('--output', help='Output file path (optional; the JSONL scores with --pairs)')
+    parser.add_argument('--pairs', help='CSV of chart1,chart2[,name1,name2] rows to score in one run')
+    parser.add_argument('--reports-dir', help='With --pairs, also write a report per pair here')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='markdown', help='Report format')
+    parser.add_argument('--workers', type=int, help='With --pairs, worker processes (default: CPU count)')
     
     args = parser.parse_args()
     
+    if args.pairs:
+        scored = run_pairs(args.pairs, args.output, args.reports_dir, args.workers, args.format)
+        if args.output:
+            print(f"✅ Scored {scored} pairs")
+            print(f"📄 Saved as: {args.output}")
+        return
+    
+    if not args.chart1 or not args.chart2:
+        parser.error("chart1 and chart2 are required unless --pairs is given")
+    
     # Load charts
     chart1 = load_chart_from_json(args.chart1)
     chart2 = load_chart_from_json(args.chart2)
@@ -754,16 +962,15 @@ def main():
     
     # Calculate compatibility
     calculator = EnhancedCompatibilityCalculator()
-    report = calculator.generate_compatibility_report(chart1, chart2, args.name1, args.name2)
     
     # Save or print report
     if args.output:
         with open(args.output, 'w') as f:
-            f.write(report)
+            calculator.generate_compatibility_report(chart1, chart2, args.name1, args.name2, f, args.format)
         print(f"✅ Enhanced compatibility report generated!")
         print(f"📄 Saved as: {args.output}")
     else:
-        print(report)
+        print(calculator.generate_compatibility_report(chart1, chart2, args.name1, args.name2, fmt=args.format))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+group_compatibility.py
+
+All-pairs compatibility for groups (teams, families, cohorts).
+Every unordered pair is scored once and mirrored into a symmetric N x N
+matrix. Rows of the upper triangle are sharded over a process pool, and each
+worker derives the compatibility profiles of the group once, so a pair costs
+one cross-aspect matrix between two profiles.
+"""
+
+import argparse
+import csv
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from compatibility_profile import compatibility_profile
+from enhanced_compatibility_clean import EnhancedCompatibilityCalculator, load_chart_from_json
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def group_profiles(charts):
+    """
+    Compatibility profiles of a group.
+
+    Returns:
+        list: One CompatibilityProfile per chart, None where a chart is incomplete
+    """
+    profiles = []
+    for i, chart in enumerate(charts):
+        try:
+            profiles.append(compatibility_profile(chart))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"No compatibility profile for chart {i}: {e}")
+            profiles.append(None)
+    return profiles
+
+def _row_tasks(n):
+    """Pair row i with row n-2-i so every task holds about n pair scores"""
+    tasks = []
+    for i in range(n // 2):
+        partner = n - 2 - i
+        tasks.append((i,) if partner <= i else (i, partner))
+    return tasks
+
+# Per-process state set up once by the pool initializer
+_group = {}
+
+def _init_group_worker(charts, orb_profile):
+    """Pool initializer: derive the group's profiles once per process"""
+    _group['calculator'] = EnhancedCompatibilityCalculator(orb_profile)
+    _group['profiles'] = group_profiles(charts)
+
+def _score_rows(rows):
+    """Overall scores of chart i against every later chart, for each row i"""
+    calculator = _group['calculator']
+    profiles = _group['profiles']
+
+    results = []
+    for i in rows:
+        row = np.full(len(profiles) - i - 1, np.nan)
+        for offset, j in enumerate(range(i + 1, len(profiles))):
+            if profiles[i] is None or profiles[j] is None:
+                continue
+            try:
+                row[offset] = calculator.score_compatibility(profiles[i], profiles[j])['overall_score']
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Cannot score pair ({i}, {j}): {e}")
+            except Exception as e:
+                # Leave the pair NaN rather than lose the whole shard
+                logger.error(f"Error scoring pair ({i}, {j}): {e}")
+        results.append((i, row))
+    return results
+
+def group_compatibility_matrix(charts, names=None, workers=None, orb_profile='synastry',
+                               dtype=np.float32):
+    """
+    Calculate the compatibility matrix of a group.
+
+    Each unordered pair (i < j) is scored once as
+    score_compatibility(charts[i], charts[j]) and stored at both [i, j]
+    and [j, i]; the diagonal and unscorable pairs are NaN.
+
+    Args:
+        charts: List of chart dicts with bodies and houses, or their
+            CompatibilityProfiles (e.g. from iter_compatibility_profiles)
+        names: Labels for the charts (default: birth names or indices)
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+        orb_profile: Orb profile for the calculator
+        dtype: Matrix dtype (float32 keeps large matrices compact)
+
+    Returns:
+        dict: {'names': [...], 'scores': ndarray (N, N)}
+    """
+    charts = list(charts)
+    n = len(charts)
+    if names is None:
+        names = [chart.get('birth', {}).get('name', str(i)) if isinstance(chart, dict) else str(i)
+                 for i, chart in enumerate(charts)]
+    if len(names) != n:
+        raise ValueError("Need exactly one name per chart")
+
+    scores = np.full((n, n), np.nan, dtype=dtype)
+    tasks = _row_tasks(n)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tasks) <= 1:
+        _init_group_worker(charts, orb_profile)
+        for task in tasks:
+            _fill(scores, _score_rows(task))
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_group_worker,
+                                 initargs=(charts, orb_profile)) as pool:
+            for batch in pool.map(_score_rows, tasks, chunksize=chunksize):
+                _fill(scores, batch)
+
+    logger.info(f"Scored {n * (n - 1) // 2} pairs for a group of {n}")
+    return {'names': list(names), 'scores': scores}
+
+def _fill(scores, batch):
+    """Write row results into both triangles"""
+    for i, row in batch:
+        scores[i, i + 1:] = row
+        scores[i + 1:, i] = row
+
+def save_group_matrix(result, filepath):
+    """
+    Save a group matrix as .npz (compressed scores + names) or .csv.
+
+    Args:
+        result: Output of group_compatibility_matrix
+        filepath: Destination; the extension picks the format
+    """
+    path = Path(filepath)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([''] + result['names'])
+            for name, row in zip(result['names'], result['scores']):
+                writer.writerow([name] + ['' if np.isnan(value) else f'{value:.2f}' for value in row])
+    else:
+        np.savez_compressed(path, scores=result['scores'], names=np.array(result['names']))
+    logger.info(f"Group matrix saved to {path}")
+
+def load_group_matrix(filepath):
+    """Load a matrix written by save_group_matrix in .npz format"""
+    with np.load(filepath) as data:
+        return {'names': data['names'].tolist(), 'scores': data['scores']}
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Group compatibility matrix')
+    parser.add_argument('charts', nargs='*', help='Chart JSON files')
+    parser.add_argument('--db', type=str, help='Score every chart in this database instead')
+    parser.add_argument('--output', default='group_matrix.npz', help='Output .npz or .csv file')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if args.db:
+        # Stored profiles only; no chart JSON is decoded (charts without one are incomplete)
+        from database import AstrologyDatabase
+        with AstrologyDatabase(args.db) as db:
+            records = [(name, profile) for _, name, profile in db.iter_compatibility_profiles()]
+    else:
+        records = [(Path(path).stem, load_chart_from_json(path)) for path in args.charts]
+        records = [(name, chart) for name, chart in records if chart]
+
+    if len(records) < 2:
+        print("Error: Need at least two charts")
+        return
+
+    names = [name for name, _ in records]
+    result = group_compatibility_matrix([chart for _, chart in records], names, workers=args.workers)
+    save_group_matrix(result, args.output)
+    print(f"✅ Scored {len(names)} charts ({len(names) * (len(names) - 1) // 2} pairs)")
+    print(f"📄 Saved as: {args.output}")
+
+if __name__ == '__main__':
+    main()
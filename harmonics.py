@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+harmonics.py
+
+Harmonic chart generation and analysis.
+Produces every harmonic position set of a chart as one 2-D array
+(harmonic x body) and detects conjunctions on all harmonics in a single
+vectorized call through the aspect kernel in aspects.py.
+"""
+
+import csv
+import logging
+import numpy as np
+
+from aspects import separation_matrix, match_aspects
+from orb_profiles import ASPECT_CODES, DISABLED_ORB, get_orb_table
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_HARMONICS = tuple(range(1, 33))
+
+def harmonic_positions(longitudes, harmonics=DEFAULT_HARMONICS):
+    """
+    Calculate harmonic chart positions.
+
+    Args:
+        longitudes: Body longitudes (..., n); leading axes are kept for cohorts
+        harmonics: Harmonic numbers to generate (default H1-H32)
+
+    Returns:
+        ndarray: Positions (..., len(harmonics), n) in degrees [0, 360)
+    """
+    lons = np.asarray(longitudes, dtype=float)
+    numbers = np.asarray(harmonics, dtype=float)
+    if numbers.ndim != 1 or numbers.size == 0 or np.any(numbers < 1):
+        raise ValueError("Harmonics must be a non-empty sequence of numbers >= 1")
+
+    return (lons[..., None, :] * numbers[:, None]) % 360
+
+def conjunction_orbs(names, orb=None, orb_profile="modern"):
+    """
+    Build a conjunction-only orb array for the aspect kernel.
+
+    Args:
+        names: Body names (used for per-pair orbs from the profile)
+        orb: Fixed orb for every pair; overrides the profile when given
+        orb_profile: Orb profile supplying per-pair conjunction orbs
+
+    Returns:
+        ndarray: Orbs (n, n, aspects) with every aspect but conjunction disabled
+    """
+    if orb is not None and not orb > 0:
+        raise ValueError("Orb must be positive")
+    conj = ASPECT_CODES["conjunction"]
+    pair_orbs = get_orb_table(orb_profile).pair_orbs(names, names)
+    orbs = np.full(pair_orbs.shape, DISABLED_ORB)
+    orbs[..., conj] = pair_orbs[..., conj] if orb is None else orb
+    return orbs
+
+def harmonic_conjunctions(longitudes, names, harmonics=DEFAULT_HARMONICS, orb=None,
+                          orb_profile="modern"):
+    """
+    Detect conjunctions in every harmonic chart with one kernel call.
+
+    Args:
+        longitudes: Body longitudes (..., n); leading axes are a cohort of charts
+            sharing the same bodies
+        names: Body names parallel to the last axis of longitudes
+        harmonics: Harmonic numbers to analyse
+        orb: Fixed conjunction orb (default: profile conjunction orbs)
+        orb_profile: Orb profile name
+
+    Returns:
+        dict: Arrays "harmonic", "body1", "body2" (indices into names) and
+        "orb"/"max_orb" for every conjunction found, "chart" with one index
+        array per leading axis (an empty tuple for a single chart), plus the
+        positions array
+    """
+    lons = np.asarray(longitudes, dtype=float)
+    if lons.ndim == 0 or len(names) != lons.shape[-1]:
+        raise ValueError("Names and longitudes must have the same length")
+
+    numbers = np.asarray(harmonics)
+    positions = harmonic_positions(lons, numbers)
+    orbs = conjunction_orbs(list(names), orb=orb, orb_profile=orb_profile)
+
+    separation = separation_matrix(positions, positions)
+    codes, deviations = match_aspects(separation, orbs)
+
+    n = len(names)
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    *chart, h_idx, rows, cols = np.nonzero((codes >= 0) & upper)
+
+    return {
+        "positions": positions,
+        "chart": tuple(chart),
+        "harmonic": numbers[h_idx],
+        "body1": rows,
+        "body2": cols,
+        "orb": deviations[(*chart, h_idx, rows, cols)],
+        "max_orb": orbs[rows, cols, ASPECT_CODES["conjunction"]]
+    }
+
+def harmonic_summaries(longitudes, names, harmonics=DEFAULT_HARMONICS, orb=None,
+                       orb_profile="modern"):
+    """
+    Summarise conjunctions per harmonic of one chart for export.
+
+    Args:
+        longitudes: Body longitudes of one chart (n,)
+        names, harmonics, orb, orb_profile: As for harmonic_conjunctions;
+            a fixed orb must be positive
+
+    Returns:
+        list: One dict per harmonic with the conjunction count, a tightness
+        score (sum of 1 - orb/max_orb), the tightest pair and all pairs as
+        [body1, body2, orb] rows
+    """
+    try:
+        if np.ndim(longitudes) != 1:
+            raise ValueError("Summaries take the longitudes of one chart")
+        found = harmonic_conjunctions(longitudes, names, harmonics, orb, orb_profile)
+        names = list(names)
+        tightness = 1 - found["orb"] / found["max_orb"]
+
+        summaries = []
+        for h in np.asarray(harmonics).tolist():
+            mask = found["harmonic"] == h
+            pairs = [
+                [names[i], names[j], round(o, 3)]
+                for i, j, o in zip(found["body1"][mask].tolist(), found["body2"][mask].tolist(),
+                                   found["orb"][mask].tolist())
+            ]
+            pairs.sort(key=lambda row: row[2])
+            summaries.append({
+                "harmonic": h,
+                "conjunctions": len(pairs),
+                "score": round(float(tightness[mask].sum()), 3),
+                "tightest": pairs[0] if pairs else None,
+                "pairs": pairs
+            })
+
+        logger.info(f"Analysed {len(summaries)} harmonics, {len(found['orb'])} conjunctions")
+        return summaries
+
+    except Exception as e:
+        logger.error(f"Error generating harmonic summaries: {e}")
+        raise
+
+def chart_harmonic_summaries(bodies, harmonics=DEFAULT_HARMONICS, orb=None,
+                             orb_profile="modern", include_points=None):
+    """Summarise harmonics directly from a chart's bodies dictionary."""
+    if not bodies or not isinstance(bodies, dict):
+        raise ValueError("Bodies must be a non-empty dictionary")
+
+    names = [name for name in bodies if include_points is None or name in include_points]
+    lons = [bodies[name]["ecliptic_longitude_deg"] for name in names]
+    return harmonic_summaries(lons, names, harmonics, orb, orb_profile)
+
+def save_harmonic_summaries_csv(rows, filepath):
+    """
+    Write per-harmonic summaries for a cohort as CSV.
+
+    Args:
+        rows: Iterable of (chart_id, summaries) tuples
+        filepath: Output CSV path
+    """
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['chart_id', 'harmonic', 'conjunctions', 'score', 'tightest_pair', 'tightest_orb'])
+
+        for chart_id, summaries in rows:
+            for summary in summaries:
+                tightest = summary['tightest']
+                writer.writerow([
+                    chart_id,
+                    summary['harmonic'],
+                    summary['conjunctions'],
+                    f"{summary['score']:.3f}",
+                    f"{tightest[0]}-{tightest[1]}" if tightest else "",
+                    f"{tightest[2]:.3f}" if tightest else ""
+                ])
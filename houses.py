@@ -214,3 +214,33 @@ def calculate_houses(t, latitude, longitude, house_system='P', ascendant=None):
         # Use Swiss Ephemeris for Placidus, Koch, Campanus
         _, _, houses = get_ascendant_mc_houses(t, latitude, longitude, house_system)
         return houses
+
+def house_cusps(houses):
+    """Return the 12 cusp longitudes from a houses dictionary, or None if incomplete."""
+    try:
+        return [houses[f"house_{i}"]["ecliptic_longitude_deg"] for i in range(1, 13)]
+    except (KeyError, TypeError):
+        return None
+
+def find_house(longitude, houses):
+    """
+    Find the house containing an ecliptic longitude.
+    
+    Args:
+        longitude: Ecliptic longitude in degrees
+        houses: Houses dictionary (house_1 ... house_12), or a cusp list from house_cusps()
+    
+    Returns:
+        int: House number (1-12), or None if the cusps are incomplete
+    """
+    cusps = houses if isinstance(houses, list) else house_cusps(houses)
+    if not cusps or len(cusps) != 12:
+        return None
+    
+    lon = normalize_angle(longitude)
+    for i in range(12):
+        start = cusps[i]
+        span = (cusps[(i + 1) % 12] - start) % 360
+        if (lon - start) % 360 < span:
+            return i + 1
+    return None
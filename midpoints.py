@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+midpoints.py
+
+Midpoint calculations for natal charts.
+Computes all circular midpoints of a chart as arrays and indexes them on the
+90° and 45° dials so midpoint activations are found by binary search.
+"""
+
+import logging
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIALS = (90, 45)
+DEFAULT_MIDPOINT_ORB = 1.5
+
+def circular_midpoint(lon1, lon2):
+    """
+    Nearer midpoint of two longitudes on the circle (works on scalars or arrays).
+
+    The arithmetic mean is wrong whenever the two points straddle 0° Aries;
+    this takes half of the signed shortest arc from lon1 to lon2 instead.
+    """
+    arc = (np.asarray(lon2, dtype=float) - lon1 + 180) % 360 - 180
+    return (lon1 + arc / 2) % 360
+
+def circular_mean(longitudes, axis=0):
+    """
+    Mean direction of longitudes along an axis (the midpoint of N points).
+
+    Averages unit vectors, so groups straddling 0° Aries come out right.
+    Where the points cancel out (e.g. two exact oppositions) there is no
+    mean and NaN is returned.
+    """
+    radians = np.radians(np.asarray(longitudes, dtype=float))
+    sin = np.sin(radians).mean(axis=axis)
+    cos = np.cos(radians).mean(axis=axis)
+    mean = np.degrees(np.arctan2(sin, cos)) % 360
+    # A tiny negative angle wraps to exactly 360.0
+    mean = np.where(mean >= 360, 0.0, mean)
+    return np.where(np.hypot(sin, cos) < 1e-9, np.nan, mean)
+
+def calculate_midpoints(longitudes):
+    """
+    Calculate all n(n-1)/2 circular midpoints.
+
+    Args:
+        longitudes: Sequence of n ecliptic longitudes
+
+    Returns:
+        tuple: (pairs, midpoints) where pairs is an (M, 2) index array into the
+        input and midpoints is the (M,) array of midpoint longitudes
+    """
+    lons = np.asarray(longitudes, dtype=float)
+    if lons.ndim != 1:
+        raise ValueError("Longitudes must be a one-dimensional sequence")
+
+    i, j = np.triu_indices(len(lons), k=1)
+    return np.column_stack((i, j)), circular_midpoint(lons[i], lons[j])
+
+def dial_distance(a, b, dial):
+    """Shortest distance between positions on a dial of the given size."""
+    diff = np.abs(np.asarray(a, dtype=float) - b) % dial
+    return np.minimum(diff, dial - diff)
+
+class DialIndex:
+    """Longitudes folded onto a dial and kept sorted for range searches"""
+
+    def __init__(self, longitudes, dial=90, labels=None):
+        """
+        Args:
+            longitudes: Ecliptic longitudes to index
+            dial: Dial size in degrees (must divide 360)
+            labels: Optional names parallel to longitudes
+        """
+        if dial <= 0 or 360 % dial:
+            raise ValueError(f"Dial must divide 360 evenly, got {dial}")
+
+        self.dial = dial
+        self.longitudes = np.asarray(longitudes, dtype=float)
+        self.labels = list(labels) if labels is not None else None
+        positions = self.longitudes % dial
+        self.order = np.argsort(positions, kind="stable")
+        self.sorted_positions = positions[self.order]
+
+    def __len__(self):
+        return len(self.sorted_positions)
+
+    def search(self, longitude, orb):
+        """
+        Return input indices whose dial position lies within orb of a longitude.
+
+        Args:
+            longitude: Query longitude (folded onto the dial)
+            orb: Maximum dial distance in degrees (must be below half the dial)
+
+        Returns:
+            ndarray: Indices into the longitudes the index was built from
+        """
+        if not 0 <= orb < self.dial / 2:
+            raise ValueError(f"Orb must be between 0 and {self.dial / 2}, got {orb}")
+
+        x = longitude % self.dial
+        lo, hi = x - orb, x + orb
+        positions = self.sorted_positions
+        ranges = [(np.searchsorted(positions, max(lo, 0.0), "left"),
+                   np.searchsorted(positions, min(hi, self.dial), "right"))]
+
+        # Windows that cross the dial's zero point wrap to the other end
+        if lo < 0:
+            ranges.append((np.searchsorted(positions, lo + self.dial, "left"), len(positions)))
+        if hi >= self.dial:
+            ranges.append((0, np.searchsorted(positions, hi - self.dial, "right")))
+
+        hits = np.concatenate([self.order[start:stop] for start, stop in ranges])
+        return np.unique(hits)
+
+class MidpointIndex:
+    """All midpoints of one chart, indexed on one or more dials"""
+
+    def __init__(self, names, longitudes, dials=DEFAULT_DIALS):
+        """
+        Args:
+            names: Point names, parallel to longitudes
+            longitudes: Ecliptic longitudes of the points
+            dials: Dial sizes to index (default 90° and 45°)
+        """
+        if len(names) != len(longitudes):
+            raise ValueError("Names and longitudes must have the same length")
+
+        self.names = list(names)
+        self.longitudes = np.asarray(longitudes, dtype=float)
+        self.pairs, self.midpoints = calculate_midpoints(self.longitudes)
+        self.dials = {dial: DialIndex(self.midpoints, dial) for dial in dials}
+        self._pair_lookup = {}
+        for m, (i, j) in enumerate(self.pairs.tolist()):
+            self._pair_lookup[(self.names[i], self.names[j])] = m
+            self._pair_lookup[(self.names[j], self.names[i])] = m
+
+        logger.debug(f"Indexed {len(self.midpoints)} midpoints on dials {list(self.dials)}")
+
+    @classmethod
+    def from_bodies(cls, bodies, include_points=None, dials=DEFAULT_DIALS):
+        """Build an index from a chart's bodies dictionary."""
+        if not bodies or not isinstance(bodies, dict):
+            raise ValueError("Bodies must be a non-empty dictionary")
+
+        names = [name for name in bodies if include_points is None or name in include_points]
+        lons = [bodies[name]["ecliptic_longitude_deg"] for name in names]
+        return cls(names, lons, dials=dials)
+
+    def __len__(self):
+        return len(self.midpoints)
+
+    def midpoint(self, body1, body2):
+        """Return the longitude of the body1/body2 midpoint."""
+        try:
+            return float(self.midpoints[self._pair_lookup[(body1, body2)]])
+        except KeyError:
+            raise ValueError(f"No midpoint {body1}/{body2} in this index")
+
+    def _dial(self, dial):
+        try:
+            return self.dials[dial]
+        except KeyError:
+            raise ValueError(f"Dial {dial} not indexed. Available: {list(self.dials)}")
+
+    def _describe(self, m, point, longitude, dial):
+        i, j = self.pairs[m]
+        midpoint_lon = float(self.midpoints[m])
+        return {
+            "point": point,
+            "midpoint": f"{self.names[i]}/{self.names[j]}",
+            "pair": [self.names[i], self.names[j]],
+            "midpoint_longitude": midpoint_lon,
+            "orb": float(dial_distance(longitude, midpoint_lon, dial)),
+            "dial": dial
+        }
+
+    def activations(self, points, orb=DEFAULT_MIDPOINT_ORB, dial=90, exclude_own=True):
+        """
+        Find the midpoints activated by a set of points (natal or transiting).
+
+        Args:
+            points: {name: longitude} of activating points
+            orb: Maximum dial distance in degrees
+            dial: Dial size to search on
+            exclude_own: Skip midpoints that contain the activating point itself
+
+        Returns:
+            list: Activation dictionaries sorted by orb
+        """
+        index = self._dial(dial)
+        hits = []
+        for point, longitude in points.items():
+            for m in index.search(longitude, orb).tolist():
+                if exclude_own and point in (self.names[self.pairs[m][0]], self.names[self.pairs[m][1]]):
+                    continue
+                hits.append(self._describe(m, point, longitude, dial))
+
+        hits.sort(key=lambda hit: hit["orb"])
+        return hits
+
+    def activators(self, body1, body2, points, orb=DEFAULT_MIDPOINT_ORB, dial=90):
+        """
+        Answer "which points activate midpoint body1/body2 within orb".
+
+        Args:
+            body1, body2: Midpoint pair
+            points: {name: longitude} of candidate points, or a labelled
+                DialIndex built once and reused across many pair queries
+            orb: Maximum dial distance in degrees
+            dial: Dial size to search on
+
+        Returns:
+            list: Activation dictionaries sorted by orb
+        """
+        m = self._pair_lookup.get((body1, body2))
+        if m is None:
+            raise ValueError(f"No midpoint {body1}/{body2} in this index")
+
+        if isinstance(points, dict):
+            point_index = DialIndex(list(points.values()), dial, labels=list(points))
+        else:
+            point_index = points
+
+        if point_index.dial != dial:
+            raise ValueError("Point index was built for a different dial")
+        if point_index.labels is None:
+            raise ValueError("Point index must be built with labels")
+
+        hits = []
+        for p in point_index.search(self.midpoints[m], orb).tolist():
+            name = point_index.labels[p]
+            if name in (body1, body2):
+                continue
+            hits.append(self._describe(m, name, float(point_index.longitudes[p]), dial))
+
+        hits.sort(key=lambda hit: hit["orb"])
+        return hits
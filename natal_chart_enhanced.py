@@ -16,6 +16,8 @@ Features:
 - Interactive mode for easy input
 """
 
+import copy
+import functools
 import json
 import sys
 import argparse
@@ -32,6 +34,9 @@ from aspects import compute_aspects, detect_aspect_patterns
 from cli import (parse_batch_file, generate_output_filename, save_chart_json, save_chart_csv, 
                 save_chart_text, print_chart_summary)
 
+# Completed charts kept per process, keyed on every calculate_complete_chart argument
+CHART_CACHE_SIZE = 256
+
 def interactive_input():
     """Get birth data through interactive prompts."""
     print("\n🌟 Interactive Natal Chart Calculator")
@@ -301,12 +306,30 @@ def calculate_complete_chart(birth_date, birth_time, timezone_name, latitude, lo
         aspect_patterns: Detect aspect patterns
     
     Returns:
-        dict: Complete chart data
+        dict: Complete chart data (a fresh copy; repeated calls are served from
+        a cache of the CHART_CACHE_SIZE most recent charts)
     """
-    # Load ephemeris and timescale
+    return copy.deepcopy(_cached_complete_chart(
+        birth_date, birth_time, timezone_name, latitude, longitude, house_system,
+        include_nodes, include_chiron, include_arabic_parts, aspect_patterns
+    ))
+
+@functools.lru_cache(maxsize=None)
+def load_ephemeris():
+    """Skyfield timescale and DE421 ephemeris, loaded once per process."""
     from skyfield.api import load
-    ts = load.timescale()
-    eph = load('de421.bsp')
+    return load.timescale(), load('de421.bsp')
+
+def clear_chart_cache():
+    """Forget every cached chart (the ephemeris stays loaded)."""
+    _cached_complete_chart.cache_clear()
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _cached_complete_chart(birth_date, birth_time, timezone_name, latitude, longitude,
+                           house_system, include_nodes, include_chiron,
+                           include_arabic_parts, aspect_patterns):
+    """Chart calculation behind calculate_complete_chart's cache."""
+    ts, eph = load_ephemeris()
     
     # Parse birth data and create observer
     try:
@@ -414,17 +437,8 @@ def process_single_chart(args):
     
     return chart
 
-def process_batch_charts(args):
-    """Process multiple charts from a batch file."""
-    entries = parse_batch_file(args.batch)
-    
-    if not entries:
-        print("❌ No valid entries found in batch file")
-        return
-    
-    print(f"📊 Processing {len(entries)} charts...")
-    
-    processed = 0
+def _process_batch_entries(entries, args, counts):
+    """Calculate and save each batch entry, yielding a database record per chart processed."""
     for i, entry in enumerate(entries, 1):
         try:
             chart = calculate_complete_chart(
@@ -449,7 +463,7 @@ def process_batch_charts(args):
             elif args.format == 'text':
                 save_chart_text(chart, filepath)
             
-            processed += 1
+            counts['processed'] += 1
             
             if not args.quiet:
                 print(f"  [{i}/{len(entries)}] ✅ {entry['name']}: {filepath}")
@@ -464,8 +478,50 @@ def process_batch_charts(args):
         
         except Exception as e:
             print(f"  [{i}/{len(entries)}] ❌ {entry.get('name', 'unknown')}: {e}")
+            continue
+        
+        yield {
+            'name': entry['name'],
+            'birth_date': entry['date'],
+            'birth_time': entry['time'],
+            'timezone': entry['timezone'],
+            'latitude': entry['latitude'],
+            'longitude': entry['longitude'],
+            'house_system': args.house_system,
+            'chart_data': chart
+        }
+
+def process_batch_charts(args):
+    """Process multiple charts from a batch file."""
+    entries = parse_batch_file(args.batch)
     
-    print(f"📈 Batch processing complete: {processed}/{len(entries)} charts processed")
+    if not entries:
+        print("❌ No valid entries found in batch file")
+        return
+    
+    print(f"📊 Processing {len(entries)} charts...")
+    
+    counts = {'processed': 0}
+    records = _process_batch_entries(entries, args, counts)
+    db_message = None
+    if args.save_db:
+        from database import AstrologyDatabase
+        
+        try:
+            # Records stream into the database batch by batch as charts are calculated
+            with AstrologyDatabase(args.db_path) as db:
+                saved = db.save_charts_many(records)
+            db_message = f"🗄️  Saved to database: {len(saved['inserted'])} new, {len(saved['updated'])} updated"
+        except Exception as e:
+            db_message = f"❌ Database save failed: {e}"
+    
+    # Finish the remaining charts when not saving (or when the database failed)
+    for _ in records:
+        pass
+    
+    print(f"📈 Batch processing complete: {counts['processed']}/{len(entries)} charts processed")
+    if db_message:
+        print(db_message)
 
 def export_chart(chart, filepath, export_format):
     """Export chart as PDF or SVG (placeholder for future implementation)."""
@@ -527,6 +583,10 @@ Examples:
                            help='Output format')
         parser.add_argument('--export', type=str, choices=['pdf', 'svg'],
                            help='Export chart wheel as PDF or SVG')
+        parser.add_argument('--save-db', action='store_true',
+                           help='Also store batch charts in the SQLite database')
+        parser.add_argument('--db-path', type=str,
+                           help='Database file for --save-db (default: astrology_data.db)')
         parser.add_argument('--quiet', '-q', action='store_true',
                            help='Suppress verbose output')
         parser.add_argument('--interactive', '-i', action='store_true',
@@ -569,6 +629,8 @@ Examples:
                     self.include_arabic_parts = True
                     self.aspect_patterns = True
                     self.export = None
+                    self.save_db = False
+                    self.db_path = None
                     self.quiet = False
                     self.validate = False
             
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+orb_profiles.py
+
+Named orb profiles for aspect detection.
+Each profile is compiled once into a dense body x body x aspect NumPy table,
+so aspect engines resolve orbs with a single array lookup.
+"""
+
+import logging
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Aspect order shared by every compiled table (matches aspects.ASPECTS order)
+ASPECT_NAMES = [
+    "conjunction", "semi-sextile", "semi-square", "sextile",
+    "square", "trine", "quincunx", "opposition"
+]
+ASPECT_ANGLES = np.array([0.0, 30.0, 45.0, 60.0, 90.0, 120.0, 150.0, 180.0])
+ASPECT_CODES = {name: code for code, name in enumerate(ASPECT_NAMES)}
+
+# Body order of the table axes; anything not listed shares the final "other" slot
+BODY_NAMES = [
+    "sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn",
+    "uranus", "neptune", "pluto", "north_node", "south_node", "chiron",
+    "ascendant", "midheaven", "part_of_fortune", "other"
+]
+BODY_INDEX = {name: index for index, name in enumerate(BODY_NAMES)}
+OTHER_BODY = BODY_INDEX["other"]
+
+# Orb used for an aspect a profile does not define (mirrors compute_aspects)
+DEFAULT_ORB = 5
+
+# Orbs at or below this value never match; used to switch an aspect off
+DISABLED_ORB = -1.0
+
+class OrbProfile:
+    """A named orb configuration with optional per-body and per-pair adjustments"""
+
+    def __init__(self, name, aspect_orbs, aspects=None, body_bonus=None,
+                 pair_overrides=None, default_orb=DEFAULT_ORB):
+        """
+        Args:
+            name: Registry name of the profile
+            aspect_orbs: Base orb per aspect name
+            aspects: Aspect names to detect (default: every aspect in ASPECT_NAMES)
+            body_bonus: Degrees added to a pair's orb when either body is listed;
+                the larger bonus of the two bodies is applied
+            pair_overrides: {(body1, body2, aspect): orb} exact orbs for a body pair,
+                applied symmetrically after the bonuses
+            default_orb: Orb for enabled aspects missing from aspect_orbs
+        """
+        if not isinstance(aspect_orbs, dict):
+            raise ValueError("Aspect orbs must be a dictionary")
+
+        self.name = name
+        self.aspect_orbs = dict(aspect_orbs)
+        self.aspects = list(aspects) if aspects is not None else list(ASPECT_NAMES)
+        self.body_bonus = dict(body_bonus or {})
+        self.pair_overrides = dict(pair_overrides or {})
+        self.default_orb = default_orb
+
+        unknown = [asp for asp in self.aspects if asp not in ASPECT_CODES]
+        if unknown:
+            raise ValueError(f"Unknown aspects in profile '{name}': {unknown}")
+
+    def compile(self):
+        """Build the dense (body, body, aspect) orb table for this profile."""
+        n_bodies = len(BODY_NAMES)
+        base = np.full(len(ASPECT_NAMES), DISABLED_ORB)
+        for asp in self.aspects:
+            base[ASPECT_CODES[asp]] = self.aspect_orbs.get(asp, self.default_orb)
+
+        bonus = np.zeros(n_bodies)
+        for body, extra in self.body_bonus.items():
+            bonus[BODY_INDEX.get(body, OTHER_BODY)] = extra
+        pair_bonus = np.maximum(bonus[:, None], bonus[None, :])
+
+        enabled = base > DISABLED_ORB
+        table = np.where(enabled, base[None, None, :] + pair_bonus[:, :, None], DISABLED_ORB)
+
+        for (body1, body2, asp), orb in self.pair_overrides.items():
+            if asp not in ASPECT_CODES:
+                raise ValueError(f"Unknown aspect '{asp}' in pair override")
+            i = BODY_INDEX.get(body1, OTHER_BODY)
+            j = BODY_INDEX.get(body2, OTHER_BODY)
+            k = ASPECT_CODES[asp]
+            table[i, j, k] = orb
+            table[j, i, k] = orb
+
+        return CompiledOrbTable(self.name, table)
+
+    def __repr__(self):
+        return f"OrbProfile({self.name!r})"
+
+class CompiledOrbTable:
+    """Dense orb lookup table produced by OrbProfile.compile()"""
+
+    def __init__(self, name, table):
+        self.name = name
+        self.table = table
+        self.table.setflags(write=False)
+
+    def body_indices(self, names):
+        """Map body names to table indices (unknown names use the 'other' slot)."""
+        return np.array([BODY_INDEX.get(name, OTHER_BODY) for name in names], dtype=np.intp)
+
+    def pair_orbs(self, names_a, names_b):
+        """Return orbs for every (a, b) pair as an array of shape (len(a), len(b), aspects)."""
+        return self.table[np.ix_(self.body_indices(names_a), self.body_indices(names_b))]
+
+    def orbs_for(self, body1, body2):
+        """Return the aspect orb vector for a single body pair."""
+        return self.table[BODY_INDEX.get(body1, OTHER_BODY), BODY_INDEX.get(body2, OTHER_BODY)]
+
+    def orb(self, body1, body2, aspect):
+        """Return the orb for one body pair and aspect (negative when disabled)."""
+        return float(self.orbs_for(body1, body2)[ASPECT_CODES[aspect]])
+
+    def aspect_orbs(self, body1="other", body2="other"):
+        """Return the enabled aspects and their orbs for a body pair as a dict."""
+        orbs = self.orbs_for(body1, body2)
+        return {name: float(orbs[k]) for k, name in enumerate(ASPECT_NAMES) if orbs[k] > DISABLED_ORB}
+
+    def __repr__(self):
+        return f"CompiledOrbTable({self.name!r})"
+
+# Profile registry and compiled-table cache
+_PROFILES = {}
+_COMPILED = {}
+
+def register_orb_profile(profile, replace=False):
+    """Add a profile to the registry."""
+    if not isinstance(profile, OrbProfile):
+        raise ValueError("Profile must be an OrbProfile instance")
+    if profile.name in _PROFILES and not replace:
+        raise ValueError(f"Orb profile '{profile.name}' is already registered")
+
+    _PROFILES[profile.name] = profile
+    _COMPILED.pop(profile.name, None)
+    logger.debug(f"Registered orb profile '{profile.name}'")
+    return profile
+
+def get_orb_profile(name):
+    """Return a registered profile by name."""
+    try:
+        return _PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown orb profile '{name}'. Available: {sorted(_PROFILES)}")
+
+def list_orb_profiles():
+    """Return the names of all registered profiles."""
+    return sorted(_PROFILES)
+
+def get_orb_table(profile="modern"):
+    """
+    Return the compiled orb table for a profile.
+
+    Args:
+        profile: Registered profile name, OrbProfile, or CompiledOrbTable
+
+    Returns:
+        CompiledOrbTable: Cached compiled table
+    """
+    if isinstance(profile, CompiledOrbTable):
+        return profile
+    if isinstance(profile, OrbProfile):
+        if _PROFILES.get(profile.name) is not profile:
+            return profile.compile()
+        profile = profile.name
+
+    table = _COMPILED.get(profile)
+    if table is None:
+        table = get_orb_profile(profile).compile()
+        _COMPILED[profile] = table
+    return table
+
+def orb_table_from_dict(aspect_orbs):
+    """Compile an ad-hoc table from a flat {aspect: orb} dictionary (cached)."""
+    if not isinstance(aspect_orbs, dict):
+        raise ValueError("Aspect orbs must be a dictionary")
+
+    key = ("__dict__",) + tuple(sorted(aspect_orbs.items()))
+    table = _COMPILED.get(key)
+    if table is None:
+        table = OrbProfile("custom", aspect_orbs).compile()
+        _COMPILED[key] = table
+    return table
+
+# Built-in profiles
+register_orb_profile(OrbProfile("modern", {
+    "conjunction": 8, "semi-sextile": 2, "semi-square": 2, "sextile": 6,
+    "square": 7, "trine": 8, "quincunx": 2, "opposition": 8
+}))
+
+register_orb_profile(OrbProfile("traditional", {
+    "conjunction": 8, "sextile": 6, "square": 7, "trine": 8, "opposition": 8
+}, aspects=["conjunction", "sextile", "square", "trine", "opposition"]))
+
+register_orb_profile(OrbProfile("tight", {
+    "conjunction": 4, "semi-sextile": 1, "semi-square": 1, "sextile": 3,
+    "square": 3.5, "trine": 4, "quincunx": 1, "opposition": 4
+}))
+
+register_orb_profile(OrbProfile("luminary", {
+    "conjunction": 8, "semi-sextile": 2, "semi-square": 2, "sextile": 6,
+    "square": 7, "trine": 8, "quincunx": 2, "opposition": 8
+}, body_bonus={"sun": 2, "moon": 2}))
+
+# Cross-chart profile used by EnhancedCompatibilityCalculator
+register_orb_profile(OrbProfile("synastry", {
+    "conjunction": 8, "opposition": 8, "trine": 6, "square": 6,
+    "sextile": 4, "quincunx": 2, "semi-sextile": 2, "semi-square": 2
+}))
+
+# Wide major-aspect profile used by the GUI synastry view and transit readings
+register_orb_profile(OrbProfile("wide", {
+    "conjunction": 8, "opposition": 8, "trine": 8, "square": 8,
+    "sextile": 6, "quincunx": 3
+}, aspects=["conjunction", "sextile", "square", "trine", "quincunx", "opposition"]))
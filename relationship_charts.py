@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+relationship_charts.py
+
+Relationship charts for two or more people.
+The composite chart takes the circular midpoint of every shared body in one
+vectorized pass over a (people x bodies) array. The Davison chart is a real
+chart cast for the midpoint in time and space of the births through
+calculate_complete_chart, whose ephemeris and chart caches it reuses, so a
+group costs one chart calculation however many people it holds.
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from compatibility_profile import SIGN_NAMES
+from midpoints import circular_midpoint, circular_mean
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def composite_positions(charts):
+    """
+    Composite longitude of every body the charts share.
+
+    Two charts use the nearer midpoint of each pair; larger groups use the
+    circular mean of all positions.
+
+    Args:
+        charts: Two or more chart dicts with bodies
+
+    Returns:
+        tuple: (body names in the first chart's order, composite longitudes
+        array, NaN where positions cancel out exactly)
+    """
+    if len(charts) < 2:
+        raise ValueError("A composite needs at least two charts")
+
+    names = [name for name in charts[0]['bodies']
+             if all(name in chart['bodies'] for chart in charts[1:])]
+    lons = np.array([[chart['bodies'][name]['ecliptic_longitude_deg'] for name in names]
+                     for chart in charts], dtype=float).reshape(len(charts), len(names))
+    if len(charts) == 2:
+        return names, circular_midpoint(lons[0], lons[1])
+    return names, circular_mean(lons, axis=0)
+
+def calculate_composite_chart(charts):
+    """
+    Composite chart of two or more people.
+
+    Args:
+        charts: Two or more chart dicts with bodies
+
+    Returns:
+        dict: {body: {'longitude', 'sign'}} for the shared bodies (bodies
+        without a composite position are left out)
+    """
+    names, lons = composite_positions(charts)
+    composite = {}
+    for name, lon in zip(names, lons.tolist()):
+        if not math.isnan(lon):
+            composite[name] = {'longitude': lon, 'sign': SIGN_NAMES[int(lon // 30) % 12]}
+    return composite
+
+def birth_moment(chart):
+    """
+    UTC birth time and birthplace of a chart.
+
+    Reads chart['birth'] (date, time_local) as written by calculate_complete_chart,
+    or chart['birth_info'] (date, time) as in the example charts.
+
+    Returns:
+        tuple: (timezone-aware UTC datetime, latitude, longitude)
+    """
+    birth = chart.get('birth') or chart.get('birth_info')
+    if not birth:
+        raise ValueError("Chart has no birth data")
+
+    time = birth.get('time_local') or birth.get('time')
+    time_format = "%H:%M:%S" if time.count(':') == 2 else "%H:%M"
+    local = datetime.strptime(f"{birth['date']} {time}", f"%Y-%m-%d {time_format}")
+    moment = pytz.timezone(birth['timezone']).localize(local).astimezone(pytz.utc)
+    return moment, float(birth['latitude']), float(birth['longitude'])
+
+def davison_midpoint(charts):
+    """
+    Midpoint in time and space of two or more births.
+
+    The time is the mean UTC instant, rounded to the second. The place is the
+    mean direction of the birthplaces on the sphere, which for two people is
+    the middle of the great circle between them.
+
+    Args:
+        charts: Two or more chart dicts with birth data (see birth_moment)
+
+    Returns:
+        tuple: (UTC datetime, latitude, longitude)
+    """
+    if len(charts) < 2:
+        raise ValueError("A Davison chart needs at least two charts")
+
+    moments, lats, lons = zip(*(birth_moment(chart) for chart in charts))
+    moment = moments[0] + sum((m - moments[0] for m in moments), timedelta()) / len(moments)
+    moment = moment.replace(microsecond=0) + timedelta(seconds=round(moment.microsecond / 1e6))
+
+    lat, lon = np.radians(lats), np.radians(lons)
+    x = (np.cos(lat) * np.cos(lon)).mean()
+    y = (np.cos(lat) * np.sin(lon)).mean()
+    z = np.sin(lat).mean()
+    if math.hypot(x, y, z) < 1e-9:
+        raise ValueError("Birthplaces cancel out; they have no geographic midpoint")
+
+    latitude = math.degrees(math.atan2(z, math.hypot(x, y)))
+    longitude = math.degrees(math.atan2(y, x))
+    return moment, latitude, longitude
+
+def calculate_davison_chart(charts, house_system='P', **options):
+    """
+    Davison relationship chart: a real chart cast for the births' midpoint.
+
+    Args:
+        charts: Two or more chart dicts with birth data (see birth_moment)
+        house_system: House system code
+        **options: Passed to calculate_complete_chart (include_nodes, ...)
+
+    Returns:
+        dict: Chart as from calculate_complete_chart, plus a "davison" entry
+        with the UTC midpoint, its place and the number of people
+    """
+    from natal_chart_enhanced import calculate_complete_chart
+
+    moment, latitude, longitude = davison_midpoint(charts)
+    logger.info(f"Casting Davison chart for {len(charts)} people at {moment.isoformat()} "
+                f"({latitude:.4f}, {longitude:.4f})")
+    chart = calculate_complete_chart(moment.strftime("%Y-%m-%d"), moment.strftime("%H:%M:%S"), "UTC",
+                                     latitude, longitude, house_system=house_system, **options)
+    chart['davison'] = {
+        'utc': moment.isoformat(),
+        'latitude': latitude,
+        'longitude': longitude,
+        'people': len(charts)
+    }
+    return chart
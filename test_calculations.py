@@ -7,19 +7,40 @@ Tests calculations, houses, aspects, database, and astrology readings.
 
 import unittest
 import sys
+import io
 import os
 import tempfile
 import json
+import random
+import threading
+import sqlite3
 from datetime import datetime
+from unittest import mock
+
+import numpy as np
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from calculations import normalize_angle, deg_to_sign_deg, get_planet_longitudes, get_nodes_chiron
 from houses import get_ascendant_mc_houses, calculate_whole_sign_houses, calculate_equal_houses
-from aspects import compute_aspects, calculate_aspect_strength, detect_aspect_patterns
-from database import AstrologyDatabase
-from astrology_readings import AstrologyReadings
+from aspects import (compute_aspects, calculate_aspect_strength, aspect_strengths,
+                     detect_aspect_patterns, detect_cross_chart_patterns, cross_aspects, angle_difference,
+                     separation_rate, ASPECT_ORBS, ASPECTS, CROSS_ASPECT_DTYPE)
+from midpoints import MidpointIndex, circular_midpoint, circular_mean, calculate_midpoints
+from harmonics import harmonic_positions, harmonic_conjunctions, harmonic_summaries
+from orb_profiles import (OrbProfile, get_orb_table, register_orb_profile, list_orb_profiles,
+                          ASPECT_NAMES, BODY_NAMES)
+from database import (AstrologyDatabase, MIGRATIONS, CHART_BATCH_IDS_SQL, CHART_BY_BIRTH_KEY_SQL,
+                      normalize_sql)
+from astrology_readings import AstrologyReadings, READING_ENGINE_VERSION
+from enhanced_compatibility_clean import (EnhancedCompatibilityCalculator, SYNASTRY_DTYPE,
+                                          load_pairs_csv, score_pairs, run_pairs)
+from compatibility_profile import CompatibilityProfile
+from compatibility_report import pattern_lines
+from relationship_charts import calculate_composite_chart, davison_midpoint
+from compatibility_search import rank_matches, cascade_rank, prescreen_scores
+from group_compatibility import group_compatibility_matrix, save_group_matrix, load_group_matrix
 
 class TestCalculations(unittest.TestCase):
     """Test core calculation functions"""
@@ -160,6 +181,35 @@ class TestAspects(unittest.TestCase):
             self.assertGreaterEqual(aspect["strength"], 0)
             self.assertLessEqual(aspect["strength"], 1)
     
+    def test_applying_separating(self):
+        """Test applying/separating status and time to exact"""
+        bodies = {
+            "sun": {"ecliptic_longitude_deg": 0, "speed_deg_per_day": 1.0},
+            "moon": {"ecliptic_longitude_deg": 85, "speed_deg_per_day": 13.0},
+            "mars": {"ecliptic_longitude_deg": 355, "speed_deg_per_day": 0.5},
+            "ascendant": {"ecliptic_longitude_deg": 182}
+        }
+        aspects = {tuple(a["between"]): a for a in compute_aspects(bodies)}
+        
+        square = aspects[("sun", "moon")]
+        self.assertEqual(square["motion"], "applying")
+        self.assertAlmostEqual(square["exact_in_days"], 5 / 12)
+        
+        conjunction = aspects[("sun", "mars")]
+        self.assertEqual(conjunction["motion"], "separating")
+        self.assertAlmostEqual(conjunction["exact_in_days"], -10.0)
+        
+        # Points without a speed cannot be classified
+        self.assertIsNone(aspects[("sun", "ascendant")]["motion"])
+        self.assertIsNone(aspects[("sun", "ascendant")]["exact_in_days"])
+        
+        # Rates for selected pairs match the full matrix
+        lons = np.array([0.0, 85.0, 355.0, 182.0])
+        speeds = np.array([1.0, 13.0, 0.5, np.nan])
+        rows, cols = np.array([0, 0, 1, 3]), np.array([1, 2, 2, 0])
+        np.testing.assert_array_equal(separation_rate(lons, lons, speeds, speeds, (rows, cols)),
+                                      separation_rate(lons, lons, speeds, speeds)[rows, cols])
+    
     def test_calculate_aspect_strength(self):
         """Test aspect strength calculation"""
         # Exact aspect should have maximum strength
@@ -184,6 +234,232 @@ class TestAspects(unittest.TestCase):
         
         with self.assertRaises(Exception):
             calculate_aspect_strength(0, 0, "conjunction")
+    
+    def test_vectorized_strength(self):
+        """Test the vectorized strength kernel matches the scalar function"""
+        orbs = [0.0, 1.25, 3.0, 7.9, 2.0005]
+        max_orbs = [8, 8, 6, 8, 4]
+        codes = [0, 5, 4, 7, 1]
+        expected = [calculate_aspect_strength(o, m, ASPECT_NAMES[c])
+                    for o, m, c in zip(orbs, max_orbs, codes)]
+        self.assertEqual(aspect_strengths(orbs, max_orbs, codes).tolist(), expected)
+        
+        with self.assertRaises(ValueError):
+            aspect_strengths([1.0], [0.0], [0])
+
+    def test_cross_aspects(self):
+        """Test the shared cross-chart kernel against a pair-by-pair scan"""
+        rng = random.Random(11)
+        names = ["sun", "moon", "mercury", "venus", "mars", "ascendant"]
+        lons_a = [rng.uniform(0, 360) for _ in names]
+        lons_b = [rng.uniform(0, 360) for _ in names]
+        orbs = get_orb_table("wide").pair_orbs(names, names)
+        subset = ["conjunction", "trine", "square", "opposition"]
+        hits = cross_aspects(lons_a, lons_b, orbs, aspects=subset, weights={"trine": 3, "square": -2})
+        self.assertEqual(hits.dtype, CROSS_ASPECT_DTYPE)
+        
+        expected = []
+        for i, a in enumerate(lons_a):
+            for j, b in enumerate(lons_b):
+                separation = angle_difference(a, b)
+                for name in subset:
+                    max_orb = orbs[i, j, ASPECT_NAMES.index(name)]
+                    if abs(separation - ASPECTS[name]) <= max_orb:
+                        expected.append((i, j, name, 1 - abs(separation - ASPECTS[name]) / max_orb))
+        found = [(int(row["body1"]), int(row["body2"]), ASPECT_NAMES[row["aspect"]], float(row["strength"]))
+                 for row in hits]
+        self.assertEqual(found, expected)
+        weights = {"trine": 3.0, "square": -2.0}
+        self.assertEqual(hits["weight"].tolist(), [weights.get(name, 0.0) for _, _, name, _ in expected])
+        
+        with self.assertRaises(ValueError):
+            cross_aspects(lons_a, lons_b, orbs, aspects=["biquintile"])
+
+    def test_cross_chart_patterns(self):
+        """Test patterns completed across two charts"""
+        chart_a = (["sun", "moon", "mars"], [0.0, 180.0, 90.0])
+        chart_b = (["venus"], [271.0])
+        patterns = detect_cross_chart_patterns([chart_a, chart_b], ["A", "B"])
+        
+        t_squares = {(p["focal_planet"], frozenset(p["opposition"])) for p in patterns["t_squares"]}
+        self.assertEqual(t_squares, {
+            (("B", "venus"), frozenset([("A", "sun"), ("A", "moon")])),
+            (("A", "sun"), frozenset([("A", "mars"), ("B", "venus")])),
+            (("A", "moon"), frozenset([("A", "mars"), ("B", "venus")])),
+        })
+        # Chart A's own T-square (Mars on the Sun-Moon opposition) is not cross-chart
+        self.assertEqual(len(patterns["grand_crosses"]), 1)
+        self.assertEqual(patterns["grand_crosses"][0]["charts"], ["A", "B"])
+        
+        yods = detect_cross_chart_patterns([(["pluto"], [0.0]), (["mercury", "uranus"], [150.0, 211.0])])
+        self.assertEqual(yods["yods"][0]["focal_planet"], ("chart1", "pluto"))
+        self.assertEqual(yods["grand_trines"], [])
+        
+        # The node axis is always exact and is no T-square base
+        nodes = detect_cross_chart_patterns([(["north_node", "south_node"], [0.0, 180.0]),
+                                             (["mars"], [90.0])])
+        self.assertEqual(nodes["t_squares"], [])
+        # ... and natal detection applies the same rule
+        natal = {"north_node": {"ecliptic_longitude_deg": 0.0}, "south_node": {"ecliptic_longitude_deg": 180.0},
+                 "mars": {"ecliptic_longitude_deg": 90.0}, "venus": {"ecliptic_longitude_deg": 270.0}}
+        natal_patterns = detect_aspect_patterns(compute_aspects(natal), natal)
+        self.assertEqual({frozenset(p["opposition"]) for p in natal_patterns["t_squares"]},
+                         {frozenset(["mars", "venus"])})
+        self.assertEqual(natal_patterns["grand_crosses"], [])
+        
+        # Grand Trine elements follow the signs (Leo, Sagittarius, Aries)
+        trines = detect_cross_chart_patterns([(["sun", "moon"], [125.0, 245.0]), (["mars"], [5.0])], ["A", "B"])
+        self.assertEqual([p["element"] for p in trines["grand_trines"]], ["Fire"])
+        
+        with self.assertRaises(ValueError):
+            detect_cross_chart_patterns([chart_a])
+
+class TestOrbProfiles(unittest.TestCase):
+    """Test orb profile registry and compiled tables"""
+    
+    def test_builtin_profiles(self):
+        """Test built-in profiles are registered"""
+        for name in ["modern", "traditional", "tight", "luminary", "synastry", "wide"]:
+            self.assertIn(name, list_orb_profiles())
+    
+    def test_compiled_table_shape(self):
+        """Test compiled table is body x body x aspect"""
+        table = get_orb_table("modern")
+        self.assertEqual(table.table.shape, (len(BODY_NAMES), len(BODY_NAMES), len(ASPECT_NAMES)))
+        self.assertIs(table, get_orb_table("modern"), "Compiled tables should be cached")
+    
+    def test_modern_matches_aspect_orbs(self):
+        """Test modern profile reproduces ASPECT_ORBS"""
+        table = get_orb_table("modern")
+        for aspect, orb in ASPECT_ORBS.items():
+            self.assertEqual(table.orb("mars", "saturn", aspect), orb)
+    
+    def test_luminary_and_pair_overrides(self):
+        """Test luminary widening and per-pair overrides"""
+        table = get_orb_table("luminary")
+        self.assertEqual(table.orb("sun", "saturn", "trine"), 10)
+        self.assertEqual(table.orb("mars", "saturn", "trine"), 8)
+        
+        profile = OrbProfile("test_pair", {"conjunction": 8},
+                             aspects=["conjunction"],
+                             pair_overrides={("venus", "mars", "conjunction"): 12})
+        compiled = profile.compile()
+        self.assertEqual(compiled.orb("mars", "venus", "conjunction"), 12)
+        self.assertLess(compiled.orb("mars", "venus", "trine"), 0, "Disabled aspects have negative orbs")
+    
+    def test_traditional_profile_in_compute_aspects(self):
+        """Test profiles without minor aspects skip them"""
+        bodies = {
+            "sun": {"ecliptic_longitude_deg": 0},
+            "moon": {"ecliptic_longitude_deg": 30},
+            "venus": {"ecliptic_longitude_deg": 120}
+        }
+        modern = {a["aspect"] for a in compute_aspects(bodies)}
+        traditional = {a["aspect"] for a in compute_aspects(bodies, orb_profile="traditional")}
+        self.assertIn("semi-sextile", modern)
+        self.assertNotIn("semi-sextile", traditional)
+        self.assertIn("trine", traditional)
+    
+    def test_register_errors(self):
+        """Test registry error handling"""
+        with self.assertRaises(ValueError):
+            register_orb_profile(OrbProfile("modern", {"conjunction": 8}))
+        with self.assertRaises(ValueError):
+            get_orb_table("no_such_profile")
+        with self.assertRaises(ValueError):
+            OrbProfile("bad", {"conjunction": 8}, aspects=["novile"])
+
+class TestMidpoints(unittest.TestCase):
+    """Test midpoint engine and dial index"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.names = ["sun", "moon", "venus", "mars"]
+        self.longitudes = [350.0, 10.0, 100.0, 200.0]
+        self.index = MidpointIndex(self.names, self.longitudes)
+    
+    def test_circular_midpoint(self):
+        """Test midpoints across 0° Aries use the shorter arc"""
+        self.assertAlmostEqual(float(circular_midpoint(350, 10)), 0.0)
+        self.assertAlmostEqual(float(circular_midpoint(100, 200)), 150.0)
+    
+    def test_circular_mean(self):
+        """Test the N-point circular mean and its undefined case"""
+        self.assertAlmostEqual(float(circular_mean([350, 10, 0])), 0.0)
+        self.assertAlmostEqual(float(circular_mean([100, 200])), 150.0)
+        means = circular_mean([[350, 90], [20, 270]], axis=0)
+        self.assertAlmostEqual(float(means[0]), 5.0)
+        self.assertTrue(np.isnan(means[1]))
+    
+    def test_midpoint_count(self):
+        """Test all n(n-1)/2 midpoints are produced"""
+        pairs, midpoints = calculate_midpoints(list(range(0, 360, 18)))
+        self.assertEqual(len(midpoints), 190)
+        self.assertEqual(pairs.shape, (190, 2))
+    
+    def test_activations_on_90_dial(self):
+        """Test points activating midpoints via hard aspects on the 90° dial"""
+        # Sun/Moon midpoint is 0°; a point at 90.5° squares it
+        hits = self.index.activations({"transit_mars": 90.5}, orb=1.0, dial=90)
+        self.assertIn("sun/moon", [hit["midpoint"] for hit in hits])
+        self.assertAlmostEqual(hits[0]["orb"], 0.5)
+    
+    def test_activators_of_midpoint(self):
+        """Test finding which points activate a given midpoint"""
+        points = {"jupiter": 180.4, "saturn": 47.0, "sun": 0.0}
+        hits = self.index.activators("sun", "moon", points, orb=1.0, dial=45)
+        self.assertEqual([hit["point"] for hit in hits], ["jupiter"])
+    
+    def test_midpoint_errors(self):
+        """Test midpoint error handling"""
+        with self.assertRaises(ValueError):
+            self.index.midpoint("sun", "pluto")
+        with self.assertRaises(ValueError):
+            self.index.activations({"x": 0.0}, dial=30)
+
+class TestHarmonics(unittest.TestCase):
+    """Test harmonic chart generation"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.names = ["sun", "moon", "venus", "mars"]
+        # Sun-Moon trine, Sun-Venus quintile, Mars unaspected
+        self.longitudes = [10.0, 130.0, 82.0, 315.0]
+    
+    def test_positions_shape(self):
+        """Test positions form a harmonic x body array"""
+        positions = harmonic_positions(self.longitudes)
+        self.assertEqual(positions.shape, (32, 4))
+        self.assertAlmostEqual(positions[2, 1], (130.0 * 3) % 360)
+    
+    def test_conjunctions_across_harmonics(self):
+        """Test natal aspects become conjunctions in their harmonic"""
+        found = harmonic_conjunctions(self.longitudes, self.names, orb=2.0)
+        hits = set(zip(found["harmonic"].tolist(), found["body1"].tolist(), found["body2"].tolist()))
+        self.assertIn((3, 0, 1), hits)
+        self.assertIn((5, 0, 2), hits)
+        self.assertNotIn((1, 0, 1), hits)
+        self.assertEqual(found["chart"], ())
+        
+        # A cohort along a leading axis matches the charts one by one
+        cohort = [self.longitudes, [0.0, 90.0, 180.0, 270.0]]
+        both = harmonic_conjunctions(cohort, self.names, orb=2.0)
+        for index, longitudes in enumerate(cohort):
+            single = harmonic_conjunctions(longitudes, self.names, orb=2.0)
+            mask = both["chart"][0] == index
+            for key in ("harmonic", "body1", "body2", "orb", "max_orb"):
+                self.assertEqual(both[key][mask].tolist(), single[key].tolist())
+    
+    def test_summaries(self):
+        """Test compact per-harmonic summaries"""
+        summaries = harmonic_summaries(self.longitudes, self.names, harmonics=[1, 3, 5], orb=2.0)
+        self.assertEqual([s["harmonic"] for s in summaries], [1, 3, 5])
+        self.assertEqual(summaries[1]["tightest"][:2], ["sun", "moon"])
+        self.assertEqual(summaries[1]["conjunctions"], len(summaries[1]["pairs"]))
+        with self.assertRaises(ValueError):
+            harmonic_summaries(self.longitudes, self.names[:2])
+        with self.assertRaises(ValueError):
+            harmonic_summaries(self.longitudes, self.names, orb=0)
 
 class TestDatabase(unittest.TestCase):
     """Test database functionality"""
@@ -227,6 +503,331 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(retrieved["name"], "Test Person")
         self.assertEqual(retrieved["birth_date"], "1998-03-03")
     
+    def test_save_charts_many(self):
+        """Test bulk saving reports inserted and updated ids"""
+        existing_id = self.db.save_chart(
+            "Existing", "1990-01-01", "08:00:00", "UTC", 10.0, 20.0, "P", {"v": 0}
+        )
+        charts = [
+            {"name": "Existing", "birth_date": "1990-01-01", "birth_time": "08:00:00",
+             "timezone": "UTC", "latitude": 10.0, "longitude": 20.0, "chart_data": {"v": 1}}
+        ]
+        charts += [
+            {"name": f"Person {i}", "birth_date": "2000-01-01", "birth_time": "12:00:00",
+             "timezone": "UTC", "latitude": 0.0, "longitude": 0.0, "chart_data": {"v": i}}
+            for i in range(25)
+        ]
+        
+        result = self.db.save_charts_many(charts, batch_size=10)
+        self.assertEqual(result["updated"], [existing_id])
+        self.assertEqual(len(result["inserted"]), 25)
+        self.assertEqual(self.db.get_chart(existing_id)["chart_data"], {"v": 1})
+        self.assertEqual(self.db.get_chart(result["inserted"][-1])["chart_data"], {"v": 24})
+        # Ids come from one join per batch, not a lookup per chart
+        statements = {entry["sql"]: entry["calls"] for entry in self.db.query_stats.snapshot(top=100)["statements"]}
+        self.assertEqual(statements[normalize_sql(CHART_BATCH_IDS_SQL)], 3)
+        self.assertNotIn(normalize_sql(CHART_BY_BIRTH_KEY_SQL), statements)
+        
+        # Keys equal only under the column affinity still update the same row
+        same = [dict(charts[0], latitude="10.0", chart_data={"v": 2}),
+                dict(charts[0], latitude=10, chart_data={"v": 3})]
+        self.assertEqual(self.db.save_charts_many(same), {"inserted": [], "updated": [existing_id]})
+        self.assertEqual(self.db.get_chart(existing_id)["chart_data"], {"v": 3})
+        
+        with self.assertRaises(ValueError):
+            self.db.save_charts_many([{"name": "Incomplete"}])
+    
+    def test_save_chart_upsert(self):
+        """Test saving the same birth data updates one row"""
+        args = ("Repeat", "1985-05-05", "05:05:00", "UTC", 1.5, 2.5, "P")
+        first_id = self.db.save_chart(*args, {"v": 1})
+        second_id = self.db.save_chart(*args, {"v": 2})
+        
+        self.assertEqual(first_id, second_id)
+        self.assertEqual(self.db.get_chart(first_id)["chart_data"], {"v": 2})
+        self.assertEqual(self.db.get_database_stats()["charts_count"], 1)
+        
+        # SQLite before 3.35 has no RETURNING; the id is looked up by birth key
+        with mock.patch("database.SQLITE_HAS_RETURNING", False):
+            self.assertEqual(self.db.save_chart(*args, {"v": 3}), first_id)
+            other_id = self.db.save_chart("Other", *args[1:], {"v": 1})
+        self.assertNotEqual(other_id, first_id)
+        self.assertEqual(self.db.get_chart(other_id)["name"], "Other")
+    
+    def test_birth_key_migration(self):
+        """Test migrating a legacy database merges duplicate charts"""
+        legacy_path = self.db_path + ".legacy"
+        connection = sqlite3.connect(legacy_path)
+        connection.executescript('''
+            CREATE TABLE charts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                birth_date TEXT NOT NULL, birth_time TEXT NOT NULL, timezone TEXT NOT NULL,
+                latitude REAL NOT NULL, longitude REAL NOT NULL, house_system TEXT DEFAULT 'P',
+                chart_data TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE readings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, chart_id INTEGER NOT NULL,
+                reading_type TEXT NOT NULL, target_date TEXT NOT NULL, reading_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE INDEX idx_charts_name ON charts(name);
+            INSERT INTO charts (name, birth_date, birth_time, timezone, latitude, longitude, chart_data)
+            VALUES ('Dup', '2000-01-01', '12:00:00', 'UTC', 0, 0, '{"v": 1}'),
+                   ('Dup', '2000-01-01', '12:00:00', 'UTC', 0, 0, '{"v": 2}'),
+                   ('Other', '2000-01-01', '12:00:00', 'UTC', 0, 0,
+                    '{"bodies": {"venus": {"ecliptic_longitude_deg": 215.0, "sign": "Scorpio", "house": 7}}}');
+            INSERT INTO readings (chart_id, reading_type, target_date, reading_data)
+            VALUES (2, 'comprehensive', '2024-01-01', '{}');
+        ''')
+        connection.close()
+        
+        try:
+            with AstrologyDatabase(legacy_path) as db:
+                self.assertEqual(db.get_schema_version(), MIGRATIONS[-1][0])
+                self.assertEqual(db.get_database_stats()["charts_count"], 2)
+                self.assertEqual(db.get_chart(1)["chart_data"], {"v": 2})
+                self.assertEqual(len(db.get_readings_for_chart(1)), 1)
+                # Existing rows are backfilled into the placement table
+                self.assertEqual([row["id"] for row in db.find_charts_by_placement("venus", "Scorpio", 7)], [3])
+                self.assertEqual(db.save_chart("Dup", "2000-01-01", "12:00:00", "UTC",
+                                               0.0, 0.0, "P", {"v": 4}), 1)
+        finally:
+            os.unlink(legacy_path)
+    
+    def test_find_charts_by_placement(self):
+        """Test placement and aspect queries on the normalized tables"""
+        houses = {f"house_{i}": {"ecliptic_longitude_deg": (i - 1) * 30.0} for i in range(1, 13)}
+        chart_data = {
+            "bodies": {
+                "venus": {"ecliptic_longitude_deg": 215.0, "sign": "Scorpio",
+                          "degree_in_sign": 5.0, "retrograde": True, "speed_deg_per_day": -0.4},
+                "mars": {"ecliptic_longitude_deg": 125.0, "sign": "Leo", "house": 5}
+            },
+            "houses": houses,
+            "aspects": [{"between": ["venus", "mars"], "aspect": "square", "orb": 0.0, "strength": 0.8}]
+        }
+        chart_id = self.db.save_chart("Placed", "1990-10-10", "10:10:00", "UTC",
+                                      0.0, 0.0, "P", chart_data)
+        
+        venus = self.db.find_charts_by_placement("venus", sign="Scorpio", house=8)
+        self.assertEqual([row["id"] for row in venus], [chart_id])
+        self.assertEqual(venus[0]["retrograde"], 1)
+        self.assertEqual(self.db.find_charts_by_placement("venus", sign="Scorpio", house=7), [])
+        self.assertEqual(len(self.db.find_charts_by_placement("mars", house=5)), 1)
+        
+        aspects = self.db.find_charts_by_aspect("mars", "venus", "square")
+        self.assertEqual([row["id"] for row in aspects], [chart_id])
+        
+        plan = self.db.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT chart_id, longitude, degree, speed FROM chart_positions "
+            "WHERE body = ? AND sign = ?", ("venus", "Scorpio")).fetchall()
+        self.assertIn("COVERING INDEX", plan[0][-1])
+        
+        self.db.delete_chart(chart_id)
+        self.assertEqual(self.db.find_charts_by_placement("venus"), [])
+        
+        # Foreign keys are enforced, so deleting the chart row alone cascades
+        chart_id = self.db.save_chart("Placed", "1990-10-10", "10:10:00", "UTC",
+                                      0.0, 0.0, "P", chart_data)
+        self.db.connection.execute("DELETE FROM charts WHERE id = ?", (chart_id,))
+        self.db.connection.commit()
+        self.assertEqual(self.db.find_charts_by_placement("mars"), [])
+        self.assertEqual(self.db.find_charts_by_aspect("mars", "venus"), [])
+    
+    def test_compressed_storage_and_repack(self):
+        """Test compressed payloads decode transparently and legacy rows repack"""
+        chart_data = {"bodies": {"sun": {"ecliptic_longitude_deg": 10.0, "sign": "Aries"}}}
+        with AstrologyDatabase(self.db_path, storage_format="json") as legacy_db:
+            legacy_id = legacy_db.save_chart("Legacy", "1970-01-01", "00:00:00", "UTC",
+                                             0.0, 0.0, "P", chart_data)
+        
+        chart_id = self.db.save_chart("Packed", "1971-01-01", "00:00:00", "UTC",
+                                      0.0, 0.0, "P", chart_data)
+        stored = self.db.connection.execute(
+            'SELECT chart_data, chart_data_format FROM charts WHERE id = ?', (chart_id,)).fetchone()
+        self.assertIsInstance(stored[0], bytes)
+        self.assertEqual(stored[1], "json+zlib")
+        self.assertEqual(self.db.get_chart(chart_id)["chart_data"], chart_data)
+        self.assertNotIn("chart_data_format", self.db.get_chart(chart_id))
+        
+        converted = self.db.repack_database(vacuum=False)
+        self.assertEqual(converted["charts"], 1)
+        self.assertEqual(self.db.get_chart(legacy_id)["chart_data"], chart_data)
+        self.assertEqual(self.db.repack_database(vacuum=False)["charts"], 0)
+    
+    def test_iter_charts_pagination(self):
+        """Test keyset pagination, filters and lazy chart_data loading"""
+        self.db.save_charts_many(
+            {"name": f"Person {i:02d}", "birth_date": f"19{60 + i}-01-01", "birth_time": "12:00:00",
+             "timezone": "UTC", "latitude": 0.0, "longitude": 0.0, "chart_data": {"n": i}}
+            for i in range(30)
+        )
+        
+        page = self.db.get_chart_page(limit=10, order_by="birth_date", descending=True)
+        self.assertEqual(len(page["charts"]), 10)
+        self.assertEqual(page["charts"][0]["birth_date"], "1989-01-01")
+        
+        ids = [chart["id"] for chart in self.db.iter_charts(page_size=7)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 30)
+        
+        filtered = list(self.db.iter_charts(page_size=4, birth_date_from="1965-01-01",
+                                            birth_date_to="1969-12-31", order_by="name"))
+        self.assertEqual([chart["name"] for chart in filtered],
+                         [f"Person {i:02d}" for i in range(5, 10)])
+        
+        chart = filtered[0]
+        self.assertFalse(chart.data_loaded)
+        self.assertEqual(chart["chart_data"], {"n": 5})
+        self.assertTrue(chart.data_loaded)
+        
+        with self.assertRaises(ValueError):
+            self.db.get_chart_page(order_by="chart_data")
+    
+    def test_search_charts(self):
+        """Test FTS5 name/notes search stays in sync with chart changes"""
+        ann_id = self.db.save_chart("Ann Smith", "1980-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+        self.db.save_chart("Annabel Jones", "1981-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+        self.db.save_chart("Bob Smithers", "1982-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+        
+        self.assertEqual({row["name"] for row in self.db.search_charts("ann")},
+                         {"Ann Smith", "Annabel Jones"})
+        self.assertEqual([row["name"] for row in self.db.search_charts("smi ann")], ["Ann Smith"])
+        self.assertEqual(len(self.db.search_charts("smith", limit=1)), 1)
+        self.assertEqual(self.db.search_charts('"'), [])
+        
+        self.db.update_chart_notes(ann_id, "Client from the Wellington workshop")
+        self.assertEqual([row["id"] for row in self.db.search_charts("wellington")], [ann_id])
+        
+        by_name = self.db.get_charts_by_name("Smith")
+        self.assertEqual({chart["name"] for chart in by_name}, {"Ann Smith", "Bob Smithers"})
+        self.assertEqual(by_name[0]["chart_data"], {})
+        
+        self.db.delete_chart(ann_id)
+        self.assertEqual(self.db.search_charts("wellington"), [])
+    
+    def test_search_without_fts5(self):
+        """Test chart search falls back to LIKE when SQLite lacks FTS5"""
+        path = self.db_path + ".nofts"
+        try:
+            with mock.patch("database._fts5_available", return_value=False):
+                with AstrologyDatabase(path) as db:
+                    self.assertFalse(db.full_text_search)
+                    ann_id = db.save_chart("Ann Smith", "1980-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+                    db.save_chart("Bob Smithers", "1982-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+                    db.update_chart_notes(ann_id, "Met at the workshop")
+                    self.assertEqual([row["name"] for row in db.search_charts("smi ann")], ["Ann Smith"])
+                    self.assertEqual([row["id"] for row in db.search_charts("work")], [ann_id])
+                    self.assertEqual(len(db.get_charts_by_name("Smith")), 2)
+                    self.assertEqual(db.get_charts_by_name("mith"), [])
+            
+            # A build with FTS5 creates and fills the index on open
+            with AstrologyDatabase(path) as db:
+                self.assertTrue(db.full_text_search)
+                self.assertEqual([row["id"] for row in db.search_charts("workshop")], [ann_id])
+        finally:
+            os.unlink(path)
+    
+    def test_reading_cache(self):
+        """Test reading cache lookups, expiry, eviction and invalidation"""
+        chart_id = self.db.save_chart("Cache Test", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+        reading = {"target_date": "2024-06-01", "key_influences": [], "overall_theme": "calm"}
+        
+        self.assertIsNone(self.db.get_cached_reading(chart_id, "comprehensive", "2024-06-01", "1"))
+        self.assertTrue(self.db.cache_reading(chart_id, "comprehensive", "2024-06-01", "1", reading))
+        self.assertEqual(self.db.get_cached_reading(chart_id, "comprehensive", "2024-06-01", "1"), reading)
+        # Hits are read-only; the LRU access time is written by the next cache write or prune
+        self.db.connection.execute("UPDATE reading_cache SET accessed_at = 0")
+        self.db.connection.commit()
+        changes = self.db.connection.total_changes
+        self.assertEqual(self.db.get_cached_reading(chart_id, "comprehensive", "2024-06-01", "1"), reading)
+        self.assertEqual(self.db.connection.total_changes, changes)
+        self.assertEqual(self.db.prune_reading_cache(), 0)
+        accessed = self.db.connection.execute(
+            "SELECT accessed_at FROM reading_cache WHERE target_date = '2024-06-01'").fetchone()[0]
+        self.assertGreater(accessed, 0)
+        self.assertEqual(self.db.get_chart_id("Cache Test", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0),
+                         chart_id)
+        
+        # Other dates and engine versions are separate entries
+        self.assertIsNone(self.db.get_cached_reading(chart_id, "comprehensive", "2024-06-02", "1"))
+        self.assertIsNone(self.db.get_cached_reading(chart_id, "comprehensive", "2024-06-01", "2"))
+        
+        # Served from the cache without computing transits
+        cached = AstrologyReadings.generate_comprehensive_reading(
+            {"birth": {}}, "2024-06-01", chart_id=chart_id, db=self.db
+        )
+        self.assertEqual(cached, reading)
+        
+        self.db.cache_reading(chart_id, "comprehensive", "2024-06-02", READING_ENGINE_VERSION, reading, ttl=-1)
+        self.assertIsNone(self.db.get_cached_reading(chart_id, "comprehensive", "2024-06-02",
+                                                     READING_ENGINE_VERSION))
+        
+        for day in range(3, 8):
+            self.db.cache_reading(chart_id, "comprehensive", f"2024-06-0{day}", "1", reading)
+        self.assertEqual(self.db.prune_reading_cache(max_entries=3), 4)
+        self.assertEqual(self.db.get_database_stats()["reading_cache_count"], 3)
+        
+        # Updating the chart invalidates its cached readings
+        self.db.save_chart("Cache Test", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {"changed": True})
+        self.assertEqual(self.db.get_database_stats()["reading_cache_count"], 0)
+    
+    def test_write_behind_queue(self):
+        """Test background writes are grouped, flushed and report failures"""
+        errors = []
+        writer = self.db.write_behind(flush_interval=0.01,
+                                      on_error=lambda error, operation, args: errors.append(operation))
+        
+        futures = [writer.save_chart(f"Queued {i}", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {"i": i})
+                   for i in range(20)]
+        bad = writer.save_reading(None, "comprehensive", "2024-01-01", {})  # chart_id is NOT NULL
+        preference = writer.save_preference("theme", "dark")
+        self.assertTrue(writer.flush(timeout=10))
+        
+        chart_ids = [future.result() for future in futures]
+        self.assertEqual(len(set(chart_ids)), 20)
+        self.assertEqual(self.db.get_chart(chart_ids[5])["chart_data"], {"i": 5})
+        self.assertIsInstance(bad.exception(), sqlite3.IntegrityError)
+        self.assertEqual(errors, ["reading"])
+        self.assertIsNone(preference.result())
+        self.assertEqual(self.db.get_preference("theme"), "dark")
+        
+        writer.shutdown()
+        with self.assertRaises(RuntimeError):
+            writer.save_preference("theme", "light")
+        
+        # In-memory databases share one connection with callers
+        with AstrologyDatabase(":memory:") as memory_db:
+            with self.assertRaises(ValueError):
+                memory_db.write_behind()
+    
+    def test_query_instrumentation(self):
+        """Test method/statement timings and the slow-query log"""
+        chart_id = self.db.save_chart("Timed", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+        for _ in range(3):
+            self.db.get_chart(chart_id)
+        
+        queries = self.db.get_database_stats()["queries"]
+        get_chart = queries["methods"]["get_chart"]
+        self.assertEqual(get_chart["calls"], 3)
+        self.assertEqual(get_chart["rows"], 3)
+        self.assertEqual(sum(get_chart["histogram"].values()), 3)
+        # Schema statements run through Connection.execute are timed as well,
+        # so look past the default top 20
+        rows = list(self.db.connection.execute("SELECT id FROM charts"))
+        statements = {entry["sql"]: entry for entry in self.db.query_stats.snapshot(top=100)["statements"]}
+        self.assertIn("SELECT * FROM charts WHERE id = ?", statements)
+        
+        # Rows read by iterating a cursor are counted too
+        self.assertEqual(statements["SELECT id FROM charts"]["rows"], len(rows))
+        self.assertEqual(queries["slow_queries"], [])
+        
+        # With a zero threshold every statement is logged with its query plan
+        self.db.query_stats.slow_query_ms = 0
+        with self.assertLogs("database", level="WARNING"):
+            self.db.get_chart(chart_id)
+        slow = self.db.get_database_stats()["queries"]["slow_queries"]
+        self.assertTrue(any("SEARCH charts" in line for entry in slow for line in entry["plan"]))
+    
     def test_user_preferences(self):
         """Test user preference storage"""
         self.db.save_preference("theme", "dark")
@@ -237,12 +838,386 @@ class TestDatabase(unittest.TestCase):
         unknown = self.db.get_preference("unknown", "default")
         self.assertEqual(unknown, "default")
     
+    def test_per_thread_connections(self):
+        """Test each thread gets its own WAL connection and saves concurrently"""
+        mode = self.db.connection.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, "wal")
+        
+        connections = []
+        def worker(n):
+            connections.append(self.db.connection)
+            for i in range(10):
+                self.db.save_chart(f"Person {n}-{i}", "2000-01-01", "12:00:00",
+                                   "UTC", 0.0, 0.0, "P", {"bodies": {}})
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len({id(c) for c in connections}), 4)
+        self.assertNotIn(self.db.connection, connections)
+        self.assertEqual(self.db.get_database_stats()["charts_count"], 40)
+        
+        # Connections of exited threads are closed, not kept in the pool
+        self.assertEqual(self.db.pool.size(), 1)
+        threads = [threading.Thread(target=self.db.get_chart, args=(1,)) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        self.assertEqual(self.db.pool.size(), 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connections[0].execute('SELECT 1')
+    
     def test_database_errors(self):
         """Test database error handling"""
         # Test invalid database path
         with self.assertRaises(Exception):
             AstrologyDatabase("/invalid/path/database.db")
 
+class TestCompatibility(unittest.TestCase):
+    """Test cross-chart compatibility calculations"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.calculator = EnhancedCompatibilityCalculator()
+        self.chart1 = {"bodies": {
+            "sun": {"ecliptic_longitude_deg": 10.0},
+            "moon": {"ecliptic_longitude_deg": 100.0},
+            "venus": {"ecliptic_longitude_deg": 355.0}
+        }}
+        self.chart2 = {"bodies": {
+            "sun": {"ecliptic_longitude_deg": 14.0},
+            "mars": {"ecliptic_longitude_deg": 220.0},
+            "moon": {"ecliptic_longitude_deg": 3.0}
+        }}
+    
+    @staticmethod
+    def random_chart(rng):
+        """Chart with every body and house the compatibility analyses read"""
+        signs = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra",
+                 "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+        bodies = {}
+        for name in BODY_NAMES[:-1]:
+            longitude = rng.uniform(0, 360)
+            bodies[name] = {"ecliptic_longitude_deg": longitude, "sign": signs[int(longitude // 30)]}
+        ascendant = bodies["ascendant"]["ecliptic_longitude_deg"]
+        houses = {f"house_{i}": {"ecliptic_longitude_deg": (ascendant + (i - 1) * 30) % 360}
+                  for i in range(1, 13)}
+        return {"bodies": bodies, "houses": houses}
+    
+    def test_rank_matches(self):
+        """Test top-k search agrees with scoring every candidate"""
+        rng = random.Random(5)
+        query = self.random_chart(rng)
+        candidates = [{"id": i, "name": f"Candidate {i}", "chart_data": self.random_chart(rng)}
+                      for i in range(60)]
+        
+        scores = [self.calculator.score_compatibility(query, c["chart_data"])["overall_score"]
+                  for c in candidates]
+        expected = sorted(range(60), key=lambda i: (-scores[i], i))[:5]
+        
+        matches = rank_matches(query, candidates, k=5, workers=1, chunk_size=7)
+        self.assertEqual([m["id"] for m in matches], expected)
+        self.assertEqual([m["rank"] for m in matches], [1, 2, 3, 4, 5])
+        self.assertEqual(matches[0]["score"], scores[expected[0]])
+        
+        # Process pool, exclusions and reports for the winners only
+        matches = rank_matches(query, candidates, k=3, workers=2, chunk_size=7,
+                               exclude_ids={expected[0]}, reports=True, query_name="Query")
+        self.assertEqual([m["id"] for m in matches], expected[1:4])
+        self.assertIn("Query & Candidate", matches[0]["report"])
+        
+        # Cross-chart pattern counts for every candidate scanned
+        matches = rank_matches(query, candidates, k=2, workers=1, patterns=True)
+        self.assertEqual(matches[0]["scores"]["cross_patterns"],
+                         self.calculator.cross_pattern_counts(query, candidates[expected[0]]["chart_data"]))
+        
+        # Streamed from the database page by page
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        temp_db.close()
+        with AstrologyDatabase(temp_db.name) as db:
+            for c in candidates:
+                db.save_chart(c["name"], "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", c["chart_data"])
+            matches = rank_matches(query, db, k=5, workers=1, page_size=16)
+        os.unlink(temp_db.name)
+        self.assertEqual([m["name"] for m in matches], [f"Candidate {i}" for i in expected])
+    
+    def test_cascade_rank(self):
+        """Test the prescreen cascade against the exhaustive search"""
+        rng = random.Random(13)
+        query = self.random_chart(rng)
+        candidates = [{"id": i, "name": f"Candidate {i}", "chart_data": self.random_chart(rng)}
+                      for i in range(80)]
+        exhaustive = rank_matches(query, candidates, k=4, workers=1)
+        
+        # A shortlist holding every candidate reproduces the exhaustive result
+        result = cascade_rank(query, candidates, k=4, shortlist=80, workers=1, check_recall=True)
+        self.assertEqual([m["id"] for m in result["matches"]], [m["id"] for m in exhaustive])
+        self.assertEqual(result["pruning_ratio"], 0.0)
+        self.assertEqual(result["recall"], 1.0)
+        
+        result = cascade_rank(query, candidates, k=4, shortlist=20, workers=1, check_recall=True,
+                              exclude_ids=[0], reports=True, query_name="Query")
+        self.assertEqual((result["screened"], result["shortlisted"]), (79, 20))
+        self.assertAlmostEqual(result["pruning_ratio"], 1 - 20 / 79)
+        self.assertTrue(0.0 <= result["recall"] <= 1.0)
+        self.assertEqual(len(result["matches"]), 4)
+        self.assertNotIn(0, [m["id"] for m in result["matches"]])
+        self.assertIn("Query & Candidate", result["matches"][0]["report"])
+        
+        # Stage one prefers a candidate sharing the query's Sun, Moon, Venus and Mars
+        twin = json.loads(json.dumps(candidates[1]["chart_data"]))
+        for body in ("sun", "moon", "venus", "mars"):
+            twin["bodies"][body] = dict(query["bodies"][body])
+        profiles = [CompatibilityProfile.from_chart(c) for c in (candidates[1]["chart_data"], twin)]
+        scores = prescreen_scores(self.calculator, CompatibilityProfile.from_chart(query), profiles)
+        self.assertGreater(scores[1], scores[0])
+        
+        with self.assertRaises(ValueError):
+            cascade_rank(query, candidates, k=10, shortlist=5)
+    
+    def test_group_matrix(self):
+        """Test the symmetric group matrix matches pairwise scoring"""
+        rng = random.Random(8)
+        charts = [self.random_chart(rng) for _ in range(7)]
+        names = [f"Member {i}" for i in range(7)]
+        
+        result = group_compatibility_matrix(charts, names, workers=1, dtype=np.float64)
+        scores = result["scores"]
+        self.assertEqual(scores.shape, (7, 7))
+        self.assertTrue(np.all(np.isnan(np.diag(scores))))
+        self.assertTrue(np.array_equal(scores, scores.T, equal_nan=True))
+        for i in range(7):
+            for j in range(i + 1, 7):
+                expected = self.calculator.score_compatibility(charts[i], charts[j])["overall_score"]
+                self.assertAlmostEqual(scores[i, j], expected, places=9)
+        
+        pooled = group_compatibility_matrix(charts, names, workers=2, dtype=np.float64)
+        self.assertTrue(np.array_equal(pooled["scores"], scores, equal_nan=True))
+        
+        with tempfile.TemporaryDirectory() as directory:
+            # Stored profiles (as main --db reads them) give the same matrix
+            with AstrologyDatabase(os.path.join(directory, "group.db")) as db:
+                for name, chart in zip(names, charts):
+                    db.save_chart(name, "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", chart)
+                profiles = [(name, profile) for _, name, profile in db.iter_compatibility_profiles()]
+            stored = group_compatibility_matrix([profile for _, profile in profiles],
+                                                [name for name, _ in profiles], workers=1, dtype=np.float64)
+            self.assertEqual(stored["names"], names)
+            self.assertTrue(np.array_equal(stored["scores"], scores, equal_nan=True))
+            
+            npz_path = os.path.join(directory, "group.npz")
+            save_group_matrix(result, npz_path)
+            loaded = load_group_matrix(npz_path)
+            self.assertEqual(loaded["names"], names)
+            self.assertTrue(np.array_equal(loaded["scores"], scores, equal_nan=True))
+            
+            csv_path = os.path.join(directory, "group.csv")
+            save_group_matrix(result, csv_path)
+            with open(csv_path) as f:
+                header = f.readline().strip().split(",")
+            self.assertEqual(header, [""] + names)
+    
+    def test_compatibility_profile(self):
+        """Test profiles give the same analyses as charts and persist with them"""
+        rng = random.Random(11)
+        chart1, chart2 = self.random_chart(rng), self.random_chart(rng)
+        chart2["bodies"]["sun"]["sign"] = "pisces"
+        profile1 = CompatibilityProfile.from_chart(chart1)
+        profile2 = CompatibilityProfile.from_chart(chart2)
+        
+        self.assertEqual(profile1.names, tuple(chart1["bodies"]))
+        self.assertEqual(profile2.sign_name("sun"), "Pisces")
+        self.assertEqual(profile2.elements[profile2.index["sun"]], 3)
+        self.assertEqual(len(profile1.points), len(profile1.names) + 1)
+        self.assertEqual(profile1.points[-1], chart1["houses"]["house_7"]["ecliptic_longitude_deg"])
+        
+        restored = CompatibilityProfile.from_dict(json.loads(json.dumps(profile1.to_dict())))
+        self.assertTrue(np.array_equal(restored.points, profile1.points))
+        self.assertTrue(np.array_equal(restored.signs, profile1.signs))
+        
+        for method in ("analyze_destiny_connections", "analyze_spiritual_connections", "score_compatibility"):
+            from_charts = getattr(self.calculator, method)(chart1, chart2)
+            self.assertEqual(getattr(self.calculator, method)(profile1, profile2), from_charts)
+        
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        temp_db.close()
+        with AstrologyDatabase(temp_db.name) as db:
+            chart_id = db.save_chart("Profiled", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", chart1)
+            incomplete_id = db.save_chart("Incomplete", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", {})
+            stored = db.get_compatibility_profile(chart_id)
+            self.assertTrue(np.array_equal(stored.points, profile1.points))
+            self.assertIsNone(db.get_compatibility_profile(incomplete_id))
+            self.assertEqual([(key, name) for key, name, _ in db.iter_compatibility_profiles()],
+                             [(chart_id, "Profiled")])
+            
+            db.save_chart("Profiled", "1990-01-01", "12:00:00", "UTC", 0.0, 0.0, "P", chart2)
+            self.assertTrue(np.array_equal(db.get_compatibility_profile(chart_id).points, profile2.points))
+            db.delete_chart(chart_id)
+            self.assertIsNone(db.get_compatibility_profile(chart_id))
+        os.unlink(temp_db.name)
+    
+    def test_profile_body_bonus(self):
+        """Test compatibility scoring applies the orb profile's body bonuses"""
+        rng = random.Random(5)
+        chart1, chart2 = self.random_chart(rng), self.random_chart(rng)
+        chart2["bodies"]["sun"]["ecliptic_longitude_deg"] = (chart1["bodies"]["sun"]["ecliptic_longitude_deg"] + 9) % 360
+        modern = EnhancedCompatibilityCalculator("modern")
+        luminary = EnhancedCompatibilityCalculator("luminary")
+
+        self.assertEqual(luminary.point_orbs(("sun",), ("sun", "house_7"))[0, :, 0].tolist(), [10, 10])
+        for calculator, code in ((modern, -1), (luminary, 0)):
+            codes, _ = calculator.first_aspects(np.array([9.0]), calculator.point_orbs(("sun",), ("sun",))[0])
+            self.assertEqual(codes.tolist(), [code])
+        self.assertGreater(luminary.score_compatibility(chart1, chart2)["overall_score"],
+                           modern.score_compatibility(chart1, chart2)["overall_score"])
+
+    def test_score_pairs(self):
+        """Test the batch pairs mode writes one JSONL record per pair"""
+        rng = random.Random(17)
+        charts = [self.random_chart(rng) for _ in range(3)]
+        with tempfile.TemporaryDirectory() as directory:
+            for i, chart in enumerate(charts):
+                with open(os.path.join(directory, f"chart{i}.json"), "w") as f:
+                    json.dump(chart, f)
+            pairs_path = os.path.join(directory, "pairs.csv")
+            with open(pairs_path, "w") as f:
+                f.write("chart1,chart2,name1,name2\n")
+                f.write("chart0.json,chart1.json,Ann,Bob\n")
+                f.write("chart0.json,chart2.json\n")
+                f.write("chart1.json,missing.json\n")
+                f.write("chart2.json,chart1.json,Cy,Bob\n")
+            
+            pairs = load_pairs_csv(pairs_path)
+            self.assertEqual(len(pairs), 4)
+            self.assertEqual((pairs[1]["name1"], pairs[1]["name2"]), ("chart0", "chart2"))
+            
+            output = os.path.join(directory, "scores.jsonl")
+            reports = os.path.join(directory, "reports")
+            self.assertEqual(run_pairs(pairs_path, output, reports, workers=1), 3)
+            with open(output) as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual([r["pair"] for r in records], [0, 1, 2, 3])
+            self.assertIn("error", records[2])
+            expected = self.calculator.score_compatibility(charts[2], charts[1])
+            self.assertAlmostEqual(records[3]["overall_score"], expected["overall_score"])
+            self.assertEqual(records[3]["grade"], expected["grade"])
+            with open(records[0]["report"]) as f:
+                self.assertIn("Ann & Bob", f.read())
+            
+            pooled = list(score_pairs(pairs, workers=2, chunk_size=1))
+            self.assertEqual([r.get("overall_score") for r in pooled],
+                             [r.get("overall_score") for r in records])
+            
+            # An unexpected failure is recorded on its pair and the run goes on
+            with mock.patch.object(EnhancedCompatibilityCalculator, "score_compatibility",
+                                   side_effect=RuntimeError("boom")):
+                failed = list(score_pairs(pairs, workers=1))
+            self.assertEqual([r["pair"] for r in failed], [0, 1, 2, 3])
+            self.assertEqual(failed[0]["error"], "Scoring failed: RuntimeError: boom")
+    
+    def test_report_formats(self):
+        """Test the report renderer streams markdown and also renders JSON and HTML"""
+        rng = random.Random(23)
+        chart1, chart2 = self.random_chart(rng), self.random_chart(rng)
+        report = self.calculator.generate_compatibility_report(chart1, chart2, "Ann", "Bob")
+        stream = io.StringIO()
+        self.assertIsNone(self.calculator.generate_compatibility_report(chart1, chart2, "Ann", "Bob", stream))
+        self.assertEqual(stream.getvalue(), report)
+        self.assertIn("Ann & Bob", report)
+        self.assertIn("Cross-Chart Patterns", report)
+        patterns = detect_cross_chart_patterns([(["sun", "moon"], [0.0, 180.0]), (["venus"], [90.0])],
+                                               ["Ann", "Bob"])
+        self.assertEqual(pattern_lines(patterns),
+                         ["T-square: Bob's Venus squares Ann's Sun - Ann's Moon opposition"])
+        
+        data = json.loads(self.calculator.generate_compatibility_report(
+            chart1, chart2, "Ann", "Bob", fmt="json"))
+        expected = self.calculator.score_compatibility(chart1, chart2)
+        self.assertAlmostEqual(data["scores"]["overall_score"], expected["overall_score"])
+        self.assertEqual(data["highlights"]["total_aspects"], len(data["synastry"]))
+        
+        html = self.calculator.generate_compatibility_report(
+            chart1, chart2, "<Ann>", "Bob", fmt="html")
+        self.assertIn("&lt;Ann&gt;", html)
+        self.assertNotIn("<Ann>", html)
+        
+        with self.assertRaises(ValueError):
+            self.calculator.generate_compatibility_report(chart1, chart2, "Ann", "Bob", fmt="pdf")
+    
+    def test_relationship_charts(self):
+        """Test composites across 0° Aries, group composites and the Davison midpoint"""
+        chart1 = {"bodies": {"sun": {"ecliptic_longitude_deg": 350.0}, "moon": {"ecliptic_longitude_deg": 100.0}}}
+        chart2 = {"bodies": {"sun": {"ecliptic_longitude_deg": 20.0}, "moon": {"ecliptic_longitude_deg": 200.0},
+                             "venus": {"ecliptic_longitude_deg": 5.0}}}
+        composite = self.calculator.calculate_composite_chart(chart1, chart2)
+        self.assertEqual(list(composite), ["sun", "moon"])
+        self.assertAlmostEqual(composite["sun"]["longitude"], 5.0)
+        self.assertEqual(composite["sun"]["sign"], "Aries")
+        self.assertAlmostEqual(composite["moon"]["longitude"], 150.0)
+        
+        chart3 = {"bodies": {"sun": {"ecliptic_longitude_deg": 5.0}, "moon": {"ecliptic_longitude_deg": 150.0}}}
+        group = calculate_composite_chart([chart1, chart2, chart3])
+        self.assertAlmostEqual(group["sun"]["longitude"], 5.0)
+        
+        # Same instant in two time zones; places on the equator either side of 0°
+        births = [
+            {"birth": {"date": "2000-01-01", "time_local": "12:00:00", "timezone": "UTC",
+                       "latitude": 0.0, "longitude": -10.0}},
+            {"birth_info": {"date": "2000-01-01", "time": "14:00", "timezone": "Europe/Athens",
+                            "latitude": 0.0, "longitude": 30.0}},
+        ]
+        moment, latitude, longitude = davison_midpoint(births)
+        self.assertEqual(moment.strftime("%Y-%m-%d %H:%M:%S"), "2000-01-01 12:00:00")
+        self.assertAlmostEqual(latitude, 0.0)
+        self.assertAlmostEqual(longitude, 10.0)
+        
+        births[1]["birth_info"]["date"] = "2000-01-03"
+        self.assertEqual(davison_midpoint(births)[0].strftime("%Y-%m-%d %H:%M"), "2000-01-02 12:00")
+        with self.assertRaises(ValueError):
+            davison_midpoint(births[:1])
+    
+    def test_synastry_matrix(self):
+        """Test the vectorized matrix matches a pair-by-pair scan"""
+        lon1 = [body["ecliptic_longitude_deg"] for body in self.chart1["bodies"].values()]
+        lon2 = [body["ecliptic_longitude_deg"] for body in self.chart2["bodies"].values()]
+        hits = self.calculator.synastry_matrix(lon1, lon2)
+        self.assertEqual(hits.dtype, SYNASTRY_DTYPE)
+        
+        expected = []
+        for i, a in enumerate(lon1):
+            for j, b in enumerate(lon2):
+                aspect, orb = self.calculator.determine_aspect(self.calculator.calculate_angle_difference(a, b))
+                if aspect:
+                    expected.append((i, j, aspect, orb))
+        found = [(int(row["body1"]), int(row["body2"]), ASPECT_NAMES[row["aspect"]], float(row["orb"]))
+                 for row in hits]
+        self.assertEqual(found, expected)
+        
+        # Body names bring in the profile's body bonuses
+        luminary = EnhancedCompatibilityCalculator("luminary")
+        self.assertEqual(len(luminary.synastry_matrix([0.0], [9.0])), 0)
+        hits = luminary.synastry_matrix([0.0], [9.0], ["sun"], ["mars"])
+        self.assertEqual([ASPECT_NAMES[code] for code in hits["aspect"]], ["conjunction"])
+        positive, _ = luminary.synastry_totals([0.0], [[9.0], [20.0]], ["sun"], ["mars"])
+        self.assertEqual(positive.tolist(), [luminary.aspect_weights["conjunction"], 0])
+    
+    def test_synastry_aspects(self):
+        """Test the synastry dictionary built from the matrix"""
+        synastry = self.calculator.calculate_synastry_aspects(self.chart1, self.chart2)
+        
+        self.assertEqual(list(synastry)[0], "sun_sun_conjunction")
+        sun_sun = synastry["sun_sun_conjunction"]
+        self.assertEqual(sun_sun["planets"], ("sun", "sun"))
+        self.assertEqual(sun_sun["orb"], 4.0)
+        self.assertEqual(sun_sun["score"], 15)
+        self.assertAlmostEqual(sun_sun["strength"], 0.5)
+        # Separation wraps across 0 degrees
+        self.assertIn("venus_moon_conjunction", synastry)
+        self.assertEqual(synastry["venus_moon_conjunction"]["angle"], 8.0)
+
 class TestAstrologyReadings(unittest.TestCase):
     """Test astrology readings functionality"""
     
@@ -343,7 +1318,11 @@ def run_tests():
         TestCalculations,
         TestHouses,
         TestAspects,
+        TestOrbProfiles,
+        TestMidpoints,
+        TestHarmonics,
         TestDatabase,
+        TestCompatibility,
         TestAstrologyReadings,
         TestIntegration
     ]